@@ -4,13 +4,32 @@ TMP_DIR='tmp'
 OUT_DIR='.'
 
 show_help() {
-    echo -e "usage: $(basename "$0") [-h] [-t]\n\nOptional arguments:\n\t-h\t\tShow this help message and exit\n\t-t\t\tTemporary directory path [Default: $TMP_DIR]\n\t-o\t\tOutput directory path [Default: $OUT_DIR]"
+    echo -e "usage: $(basename "$0") [-h] [-t] [-o] [-s] [-j] [-e] [-r] [-m] [-a] [-p] [-c] [-x] [-f] [-i] [-n] [-u] [-z] [-k] [-l] [-g] [-w] [-y]\n\nOptional arguments:\n\t-h\t\tShow this help message and exit\n\t-t\t\tTemporary directory path [Default: $TMP_DIR]\n\t-o\t\tOutput directory path [Default: $OUT_DIR]\n\t-s\t\tStream combined lists straight into merging, without temporary files\n\t-j\t\tNumber of build steps run in parallel [Default: 1]\n\t-e\t\tExclusion index used instead of sorting passwords-all.txt (exact, bloom)\n\t-r\t\tRule engine (hashcat, builtin) [Default: hashcat]\n\t-m\t\tExport a recipe manifest (*.recipe.json) next to every merged list\n\t-a\t\tWrite hashcat attack plans to the given directory instead of merging lists\n\t-p\t\tWrite a build report (JSON) of every step to the given directory\n\t-c\t\tRemove temporary files as soon as they are no longer needed\n\t-x\t\tSoft limit for temporary files (e.g. 500G), no new step starts while it is exceeded, implies -c\n\t-f\t\tPassword policy the lists are built for (e.g. length=8:64,classes=3), implies -s\n\t-i\t\tWrite a provenance index (*.provenance) mapping the lines of every merged list to their recipes, implies -s\n\t-n\t\tDry run, print the projected size, temporary space and time of every merge without generating anything\n\t-u\t\tDeduplicate merged lists by hash partitions in parallel (unsorted output) instead of sorting\n\t-z\t\tWrite merged lists as indexed zstd or lz4 frames (*.txt.zst, *.txt.lz4) readable from any line\n\t-k\t\tKeep a build journal in the temporary directory and resume an interrupted build from it\n\t-l\t\tBuild the keyword lists of every language on its own in parallel, then merge these\n\t-g\t\tKey temporary lists by a hash of their inputs, stale ones left by previous runs are rebuilt\n\t-w\t\tLeave self, plural and incompatible pairs out of the HTTP paths\n\t-y\t\tCount the lines of every list and the temporary directory after every step in the build report (-p)"
 }
 
-while getopts "t:o:h" opt; do
+while getopts "t:o:sj:e:r:ma:p:cx:f:inuz:klgwyh" opt; do
     case "$opt" in
         t) TMP_DIR=$OPTARG;;
         o) OUT_DIR=$OPTARG;;
+        s) export BRUTAS_STREAMING=1;;
+        j) export BRUTAS_JOBS=$OPTARG;;
+        e) export BRUTAS_EXCLUSION=$OPTARG;;
+        r) export BRUTAS_RULES=$OPTARG;;
+        m) export BRUTAS_MANIFEST=1;;
+        a) export BRUTAS_PLAN=$OPTARG;;
+        p) export BRUTAS_REPORT=$OPTARG;;
+        c) export BRUTAS_CLEANUP=1;;
+        x) export BRUTAS_MAX_TEMP=$OPTARG;;
+        f) export BRUTAS_POLICY=$OPTARG;;
+        i) export BRUTAS_PROVENANCE=1;;
+        n) export BRUTAS_DRY_RUN=1;;
+        u) export BRUTAS_DEDUP=hash;;
+        z) export BRUTAS_COMPRESS=$OPTARG;;
+        k) export BRUTAS_JOURNAL=1;;
+        l) export BRUTAS_LANGUAGES=all;;
+        g) export BRUTAS_CACHE=1;;
+        w) export BRUTAS_PAIR_FILTER=1;;
+        y) export BRUTAS_REPORT_COUNTS=1;;
         h) show_help; exit 0;;
         ?) show_help; exit 1;;
     esac
@@ -21,7 +40,5 @@ wordz -p src/classes/passwords.py::BasicPasswords -t $TMP_DIR -o $OUT_DIR && \
 wordz -p src/classes/passwords.py::ExtendedPasswords -t $TMP_DIR -o $OUT_DIR && \
 wordz -p src/classes/dns.py::Subdomains -t $TMP_DIR -o $OUT_DIR && \
 wordz -p src/classes/http.py::FileExtensions -t $TMP_DIR -o $OUT_DIR && \
-wordz -p src/classes/http.py::HttpWordsPlainCommon -t $TMP_DIR -o $OUT_DIR && \
-wordz -p src/classes/http.py::HttpWordsObjectsCommon -t $TMP_DIR -o $OUT_DIR && \
-wordz -p src/classes/http.py::HttpWordsSuffixesCommon -t $TMP_DIR -o $OUT_DIR && \
-wordz -p src/classes/http.py::HttpWordsDoubleCommon -t $TMP_DIR -o $OUT_DIR
+wordz -p src/classes/http.py::GithubFileNames -t $TMP_DIR -o $OUT_DIR && \
+wordz -p src/classes/http.py::HttpWordsRenderCommon -t $TMP_DIR -o $OUT_DIR
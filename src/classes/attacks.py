@@ -0,0 +1,88 @@
+from wordz import logs
+
+import mangling
+import plans
+import recipes
+import settings
+
+
+def shortest_words(path):
+    words, size = list(), None
+    for batch in recipes.read_batches(path):
+        for word in batch:
+            if size is None or len(word) < size:
+                words, size = [word], len(word)
+            elif len(word) == size:
+                words.append(word)
+    return words
+
+
+def shortest(path):
+    return min((len(word) for batch in recipes.read_batches(path) for word in batch), default=0)
+
+
+class AttackPlans:
+
+    # NOTE: Merges exported as hashcat attacks over the plain lists instead of being built
+    plan_dir = settings.PLAN
+
+    def export_plan(self, destination, wordlists, compare=None):
+        logs.logger.info(f'Planning: {destination}')
+        steps = list()
+        for words in wordlists:
+            step = self.attack(words, compare)
+            if step:
+                steps.append(step)
+        self.plan.write(destination, f'Attack plan for `{destination.name}` ({type(self).__name__})', steps)
+
+    def attack(self, recipe, compare=None):
+        # NOTE: hashcat combines two lists (`-a 1`) or applies rules (`-r`) by itself, anything nested deeper is written as a list.
+        # What hashcat generates cannot be filtered though, so these steps are only kept when nothing has to be excluded
+        # (no previous tiers to compare with) and none of their candidates is shorter than the minimal length
+        if isinstance(recipe, recipes.Wordlist) and recipe.destination in self.recipes:
+            recipe = self.recipes[recipe.destination]
+        if isinstance(recipe, recipes.Combination) and not compare:
+            if recipe.method == recipes.RIGHT:
+                left, right = recipe.left, recipe.right
+            elif recipe.method == recipes.LEFT:
+                left, right = recipe.right, recipe.left
+            else:
+                left, right = recipes.Combination(recipes.LEFT, recipe.left, recipe.right, self.temp_dir), recipe.right
+            left, right = self.source(left), self.source(right)
+            if shortest(left) + shortest(right) >= int(self.min_length):
+                left, right = self.plan.add(left), self.plan.add(right)
+                return ['hashcat', '-a', '1', plans.ARGUMENTS, left, right], recipes.count(left) * recipes.count(right)
+        elif isinstance(recipe, recipes.Rules) and not compare:
+            wordlist = self.source(recipe.wordlist)
+            compiled = mangling.load(recipe.rule)
+            # NOTE: Rule outputs grow with their word, so the shortest words give the shortest candidates
+            words = shortest_words(wordlist)
+            if min((len(rule(word)) for rule in compiled for word in words), default=0) >= int(self.min_length):
+                wordlist = self.plan.add(wordlist)
+                rule = self.plan.add(recipe.rule, 'rules', recipe.rule.name)
+                return ['hashcat', '-a', '0', '-r', rule, plans.ARGUMENTS, wordlist], recipes.count(wordlist) * len(compiled)
+        wordlist = self.excluded(self.resolve(recipe.destination), compare)
+        candidates = recipes.count(wordlist)
+        if candidates:
+            return ['hashcat', '-a', '0', plans.ARGUMENTS, wordlist], candidates
+
+    def source(self, recipe):
+        if isinstance(recipe, recipes.Wordlist):
+            return self.resolve(recipe.destination)
+        return self.materialize(recipe)
+
+    def excluded(self, path, compare=None):
+        # NOTE: Plain lists are filtered, excluding whatever the previous steps have tried
+        destination = self.plan.path('words', self.plan.name(path))
+        if destination.is_file():
+            return destination
+        cmd = f'awk "length >= {self.min_length}" {path} | {self.sort_snippet} -u'
+        if compare:
+            if not self.plan.exclude.is_file():
+                self.copy(compare, self.plan.exclude)
+            cmd += f' | {self.comm_ver} -23 - {self.plan.exclude}'
+        self.run_shell(f'{cmd} > {destination}', pipefail=True)
+        if compare:
+            self.append(destination, self.plan.exclude)
+            self.sort(self.plan.exclude)
+        return destination
@@ -0,0 +1,195 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import pathlib
+import sys
+import time
+
+import frames
+import recipes
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+TIERS = (
+    'wordlists/passwords/1-xxs.txt',
+    'wordlists/passwords/2-xs.txt',
+    'wordlists/passwords/3-s.txt',
+    'wordlists/passwords/4-m.txt',
+    'wordlists/passwords/5-l.txt',
+    'wordlists/passwords/6-xl.txt',
+    'wordlists/passwords/7-xxl.txt',
+)
+# NOTE: The tiers meant for online bruteforcing, the "(*)" ones in the README
+ONLINE = ('1-xxs', '2-xs', '3-s')
+CHUNK_SIZE = 1 << 24
+
+targets = None
+
+
+def read_samples(paths, unique):
+    # NOTE: One dictionary for all the samples, every password maps to its number of occurrences in each of them
+    passwords = dict()
+    totals = [0] * len(paths)
+    for position, path in enumerate(paths):
+        for batch in recipes.read_batches(path):
+            for password in batch:
+                if not password:
+                    continue
+                counts = passwords.get(password)
+                if counts is None:
+                    counts = passwords[password] = [0] * len(paths)
+                if unique and counts[position]:
+                    continue
+                counts[position] += 1
+                totals[position] += 1
+    return {password: tuple(counts) for password, counts in passwords.items()}, totals
+
+
+def chunks(path):
+    # NOTE: Compressed lists are split by line ranges (whole frames), the others by byte ranges
+    if frames.indexed(path):
+        return [(str(path), start, stop) for start, stop in frames.reader(str(path)).ranges()]
+    size = os.path.getsize(path)
+    return [(path, start, min(start + CHUNK_SIZE, size)) for start in range(0, size, CHUNK_SIZE)]
+
+
+def init(passwords):
+    global targets
+    targets = passwords
+
+
+def scan(task):
+    # NOTE: A chunk holds the lines starting within its range, the one crossing the end is read to its newline
+    path, start, stop = task
+    if frames.indexed(path):
+        lines = [word for words in frames.reader(path).batches(start, stop) for word in words]
+        return len(lines), targets.keys() & lines
+    with open(path, 'rb') as fil:
+        if start:
+            fil.seek(start - 1)
+            fil.readline()
+        data = fil.read(max(stop - fil.tell(), 0))
+        if data and not data.endswith(b'\n'):
+            data += fil.readline()
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n')
+    lines = data.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()
+    return len(lines), targets.keys() & lines
+
+
+class Sample:
+
+    def __init__(self, name, total, first):
+        self.name = name
+        self.total = total
+        self.first = first
+        self.found = 0
+
+    def percent(self, hits):
+        return hits / self.total * 100 if self.total else 0.0
+
+
+def benchmark(paths, passwords, samples, jobs):
+    # NOTE: Lists are scanned one after another (in chunks, in parallel), coverage is cumulative in the given order
+    found = set()
+    rows = list()
+    with multiprocessing.Pool(jobs, initializer=init, initargs=(passwords,)) as pool:
+        for path in paths:
+            started = time.monotonic()
+            candidates = 0
+            hits = [0] * len(samples)
+            new = [0] * len(samples)
+            firsts = [None] * len(samples)
+            seen = set()
+            for count, chunk_hits in pool.imap(scan, chunks(path)):
+                # NOTE: Lists other than the tiers may repeat words, a password is a hit once per list
+                for password in chunk_hits - seen:
+                    seen.add(password)
+                    counts = passwords[password]
+                    fresh = password not in found
+                    found.add(password)
+                    for position, sample in enumerate(samples):
+                        if counts[position]:
+                            hits[position] += counts[position]
+                            if fresh:
+                                new[position] += counts[position]
+                                sample.found += counts[position]
+                            if firsts[position] is None and hits[position] >= sample.first:
+                                firsts[position] = time.monotonic() - started
+                candidates += count
+            elapsed = time.monotonic() - started
+            rows.append((frames.stem(path), candidates, elapsed, hits, new, [sample.found for sample in samples], firsts))
+            print(f'{pathlib.Path(path).name}: {candidates:,} candidates in {elapsed:.1f}s', file=sys.stderr)
+    return rows
+
+
+def table(header, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    lines = [header, ['-' * width for width in widths]] + rows
+    return '\n'.join('| ' + ' | '.join(str(cell).ljust(width) for cell, width in zip(line, widths)) + ' |' for line in lines)
+
+
+def report(rows, samples):
+    # NOTE: The summary follows the README table, the new hits of every list (those not found by the previous ones)
+    summary = list()
+    groups = collections.defaultdict(lambda: [0] * len(samples))
+    for name, candidates, _, _, new, _, _ in rows:
+        summary.append([name, f'{candidates:,}'] + [f'{sample.percent(count):.2f}%' for sample, count in zip(samples, new)])
+        if name in ONLINE:
+            group = 'Suitable for online bruteforcing (*)'
+        else:
+            group = 'To be used for offline cracking'
+        groups[group] = [total + count for total, count in zip(groups[group], new)]
+    for group, counts in list(groups.items()) + [('TOTAL', [sample.found for sample in samples])]:
+        summary.append([group, ''] + [f'{sample.percent(count):.2f}% ({count:,})' for sample, count in zip(samples, counts)])
+    output = [table(['', 'No. of passwords'] + [f'{sample.name} ({sample.total:,})' for sample in samples], summary)]
+    for position, sample in enumerate(samples):
+        details = list()
+        for name, candidates, elapsed, hits, new, cumulative, firsts in rows:
+            per_million = hits[position] / candidates * 1000000 if candidates else 0.0
+            first = f'{firsts[position]:.2f}s' if firsts[position] is not None else '-'
+            details.append([
+                name, f'{candidates:,}', f'{hits[position]:,}', f'{new[position]:,}',
+                f'{sample.percent(cumulative[position]):.2f}%', f'{per_million:,.1f}', first, f'{elapsed:.1f}s',
+            ])
+        header = ['List', 'Candidates', 'Hits', 'New hits', 'Coverage', 'Hits per 1M', f'First {sample.first:,} hits', 'Time']
+        output.append(f'#### {sample.name}\n\n' + table(header, details))
+    return '\n\n'.join(output)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='benchmark',
+        description='Measure the effectiveness of the password tiers against plaintext leak samples',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('samples', nargs='+', help='Leak samples, one plaintext password per line')
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-t', '--tiers', nargs='*', default=TIERS, help='Tiers to scan (the missing ones are skipped), relative to the base directory')
+    parser.add_argument('-w', '--wordlist', action='append', default=[], help='External list (e.g. `rockyou.txt`) scanned after the tiers, may be repeated')
+    parser.add_argument('-u', '--unique', action='store_true', help='Count every password of a sample once')
+    parser.add_argument('-n', '--first', type=int, default=1000, help='Report the time to the first N hits of every list')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of worker processes')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    paths = [path for path in (frames.find(pathlib.Path(parsed.base_dir, tier)) for tier in parsed.tiers) if path.is_file()]
+    for path in parsed.wordlist:
+        if not os.path.isfile(path):
+            raise Exception(f'Path {path} does not exist. Aborting')
+        paths.append(pathlib.Path(path))
+    if not paths:
+        raise Exception('No lists to scan, build the tiers first. Aborting')
+    passwords, totals = read_samples(parsed.samples, parsed.unique)
+    samples = [Sample(pathlib.Path(path).stem, total, parsed.first) for path, total in zip(parsed.samples, totals)]
+    rows = benchmark(paths, passwords, samples, parsed.jobs)
+    print(report(rows, samples))
+
+
+if __name__ == '__main__':
+    main()
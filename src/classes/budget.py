@@ -0,0 +1,183 @@
+import json
+import os
+import pathlib
+import random
+import re
+
+from wordz import logs
+
+import settings
+
+
+# NOTE: Counts and hash rates (per second) take decimal units, e.g. `30G` for 30 billion
+UNITS = {'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9, 'T': 10 ** 12}
+# NOTE: Rule outputs are estimated from that many words of the list, mangled and deduplicated per word
+SAMPLE = 1000
+
+
+def number(value):
+    value = value.strip().upper().rstrip('H/S')
+    if value and value[-1] in UNITS:
+        return float(value[:-1]) * UNITS[value[-1]]
+    return float(value)
+
+
+def spread(path, count=SAMPLE):
+    # NOTE: Lines at evenly spaced offsets, lists are sorted so their beginning says little about the rest
+    size = os.path.getsize(path)
+    words = list()
+    with open(path, 'rb') as fil:
+        for position in range(count):
+            fil.seek(size * position // count)
+            if position:
+                fil.readline()
+            word = fil.readline().rstrip(b'\r\n')
+            if word:
+                words.append(word)
+    return list(dict.fromkeys(words))
+
+
+def pairs(left, right, count=SAMPLE):
+    # NOTE: Random (yet repeatable) pairs, so that a long left side does not leave a single word on the right
+    if len(left) * len(right) <= count:
+        return [head + tail for head in left for tail in right]
+    generator = random.Random(0)
+    return [generator.choice(left) + generator.choice(right) for _ in range(count)]
+
+
+def subset(words, count=SAMPLE):
+    if len(words) <= count:
+        return words
+    return random.Random(0).sample(words, count)
+
+
+def join(left, right):
+    # NOTE: Sizes are `(lines, characters)`, every word on the left is followed by every word on the right
+    return left[0] * right[0], left[1] * right[0] + right[1] * left[0]
+
+
+class Budget:
+
+    def __init__(self, spec, lines=None, size=None, hours=None, hash_rate=None):
+        self.spec = spec
+        self.lines = lines
+        self.size = size
+        self.hours = hours
+        self.hash_rate = hash_rate
+        if hours is not None:
+            if not hash_rate:
+                raise Exception('A budget in hours needs the hash rate (`rate=`). Aborting')
+            limit = int(hours * 3600 * hash_rate)
+            self.lines = limit if self.lines is None else min(self.lines, limit)
+        if self.lines is None and self.size is None:
+            raise Exception(f'Budget `{spec}` sets no limit, use `lines=`, `bytes=` or `hours=` (with `rate=`). Aborting')
+
+    @classmethod
+    def parse(cls, spec):
+        # NOTE: E.g. `lines=500M`, `bytes=10G` or `hours=1,rate=30G` (1 hour at 30 GH/s), these may be combined
+        options = dict()
+        for item in spec.split(','):
+            if item.strip():
+                key, _, value = item.strip().partition('=')
+                options[key] = value
+        unknown = set(options) - {'lines', 'bytes', 'hours', 'rate'}
+        if unknown:
+            raise Exception(f'Unknown budget option(s): {", ".join(sorted(unknown))}. Aborting')
+        lines = int(number(options['lines'])) if 'lines' in options else None
+        size = settings.size(options['bytes']) if 'bytes' in options else None
+        hours = float(options['hours']) if 'hours' in options else None
+        hash_rate = number(options['rate']) if 'rate' in options else None
+        return cls(spec, lines, size, hours, hash_rate)
+
+    @property
+    def slug(self):
+        return 'budget-' + re.sub(r'[^A-Za-z0-9.]+', '-', self.spec).strip('-')
+
+    def __str__(self):
+        limits = list()
+        if self.lines is not None:
+            limits.append(f'{self.lines:,} lines')
+        if self.size is not None:
+            limits.append(f'{self.size:,} bytes')
+        if self.hours is not None:
+            limits.append(f'({self.hours:g} hours at {self.hash_rate:,.0f} H/s)')
+        return ' '.join(limits)
+
+    def fits(self, lines, size):
+        return (self.lines is None or lines <= self.lines) and (self.size is None or size <= self.size)
+
+
+def read_yields(paths):
+    # NOTE: Summaries written by `provenance.py -s`, the hits of an expression are added up over all the lists
+    measured = dict()
+    for path in paths:
+        for row in pathlib.Path(path).read_text().splitlines()[1:]:
+            hits, lines, _, expression = row.split('\t', 3)
+            total_hits, total_lines = measured.get(expression, (0, 0))
+            measured[expression] = (total_hits + int(hits), total_lines + int(lines))
+    return measured
+
+
+class Candidate:
+
+    def __init__(self, expression, recipe, lines, size, position):
+        self.expression = expression
+        self.recipe = recipe
+        self.lines = lines
+        self.size = size
+        self.position = position
+        self.hits = None
+        self.score = 0.0
+
+    def describe(self):
+        return {
+            'expression': self.expression,
+            'lines': self.lines,
+            'bytes': self.size,
+            'yield': self.score,
+            'measured': self.hits is not None,
+        }
+
+
+def select(candidates, measured, budget):
+    # NOTE: Yield is hits per candidate, expressions never measured get the average one, ties keep the order of the tiers
+    hits = sum(found for found, _ in measured.values())
+    lines = sum(total for _, total in measured.values())
+    average = hits / lines if lines else 0.0
+    for candidate in candidates:
+        if candidate.expression in measured:
+            candidate.hits, total = measured[candidate.expression]
+            candidate.score = candidate.hits / total if total else 0.0
+        else:
+            candidate.score = average
+    unmeasured = sum(candidate.hits is None for candidate in candidates)
+    if unmeasured:
+        logs.logger.info(f'{unmeasured} of {len(candidates)} expressions have no measured yield, assuming {average * 1e6:.1f} hits per 1M')
+    chosen, skipped = list(), list()
+    total_lines, total_size = 0, 0
+    for candidate in sorted(candidates, key=lambda item: (-item.score, item.position)):
+        if budget.fits(total_lines + candidate.lines, total_size + candidate.size):
+            chosen.append(candidate)
+            total_lines += candidate.lines
+            total_size += candidate.size
+        else:
+            skipped.append(candidate)
+    return chosen, skipped
+
+
+def write_plan(path, name, destination, budget, chosen, skipped):
+    lines = sum(candidate.lines for candidate in chosen)
+    plan = {
+        'class': name,
+        'output': str(destination),
+        'budget': budget.spec,
+        'limits': {'lines': budget.lines, 'bytes': budget.size},
+        'estimated': {
+            'lines': lines,
+            'bytes': sum(candidate.size for candidate in chosen),
+            'hours': lines / budget.hash_rate / 3600 if budget.hash_rate else None,
+        },
+        'chosen': [candidate.describe() for candidate in chosen],
+        'skipped': [candidate.describe() for candidate in skipped],
+    }
+    pathlib.Path(path).write_text(json.dumps(plan, indent=2) + '\n')
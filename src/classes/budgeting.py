@@ -0,0 +1,51 @@
+import budget
+import mangling
+import recipes
+
+
+class Budgeting:
+
+    def estimate(self, recipe):
+        # NOTE: Lines and characters a recipe generates, before deduplication and the length limits
+        if isinstance(recipe, recipes.Wordlist) and recipe.destination in self.recipes:
+            recipe = self.recipes[recipe.destination]
+        if recipe.destination not in self.sizes:
+            if recipe.destination.is_file():
+                lines, size = recipes.count(recipe.destination), recipe.destination.stat().st_size
+                # NOTE: Every line but an unterminated last one ends with a line break
+                self.sizes[recipe.destination] = (lines, size - lines + (size > 0 and not recipes.terminated(recipe.destination)))
+            elif isinstance(recipe, recipes.Wordlist):
+                raise Exception(f'Path {recipe.destination} does not exist. Aborting')
+            elif isinstance(recipe, recipes.Combination):
+                left, right = self.estimate(recipe.left), self.estimate(recipe.right)
+                if recipe.method == recipes.RIGHT:
+                    self.sizes[recipe.destination] = budget.join(left, right)
+                elif recipe.method == recipes.LEFT:
+                    self.sizes[recipe.destination] = budget.join(right, left)
+                else:
+                    self.sizes[recipe.destination] = budget.join(budget.join(right, left), right)
+            else:
+                # NOTE: Rules are applied to a sample of the list, the distinct outputs per word are extrapolated
+                lines, _ = self.estimate(recipe.wordlist)
+                words = self.sample(recipe.wordlist)
+                compiled = mangling.load(recipe.rule)
+                outputs = [set(rule(word) for rule in compiled) for word in words]
+                ratio = sum(len(found) for found in outputs) / len(words) if words else 0
+                length = sum(len(word) for found in outputs for word in found) / len(words) if words else 0
+                self.sizes[recipe.destination] = (int(lines * ratio), int(lines * length))
+        return self.sizes[recipe.destination]
+
+    def sample(self, recipe):
+        # NOTE: A few words of whatever a recipe generates, taken in memory so nothing gets written (or piped to hashcat)
+        if isinstance(recipe, recipes.Wordlist) and recipe.destination in self.recipes:
+            recipe = self.recipes[recipe.destination]
+        if recipe.destination.is_file():
+            return budget.spread(recipe.destination)
+        if isinstance(recipe, recipes.Combination):
+            left, right = self.sample(recipe.left), self.sample(recipe.right)
+            if recipe.method == recipes.RIGHT:
+                return budget.pairs(left, right)
+            if recipe.method == recipes.LEFT:
+                return budget.pairs(right, left)
+            return budget.pairs(budget.pairs(right, left), right)
+        return budget.subset(mangling.apply(mangling.load(recipe.rule), self.sample(recipe.wordlist)))
@@ -0,0 +1,318 @@
+import datetime
+import pathlib
+import subprocess
+import threading
+import time
+
+from wordz import (
+    Combinator,
+    logs,
+)
+
+import cache
+import frames
+import journal
+import mangling
+import plans
+import policy
+import recipes
+import report
+import settings
+from attacks import AttackPlans
+from budgeting import Budgeting
+from compression import Compression
+from estimation import Estimation
+from excluding import Excluding
+from hashing import Hashing
+from journaling import Journaling
+from manifests import Manifests
+from reporting import Reporting
+from scheduling import Scheduling
+from streaming import Streaming
+
+
+class Builder(Journaling, Estimation, Budgeting, AttackPlans, Manifests, Scheduling, Streaming, Hashing, Compression, Excluding, Reporting, Combinator):
+
+    rules_engine = settings.RULES
+    caching = settings.CACHE
+    policy_spec = settings.POLICY
+    provenance = settings.PROVENANCE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recipes = dict()
+        self.merges = list()
+        self.sizes = dict()
+        self.lock = threading.RLock()
+        self.cache = None
+        self.journal = None
+        self.steps = dict()
+        self.plan = plans.Plan(self.plan_dir) if self.plan_dir else None
+        self.report = report.Report(self.report_dir, type(self).__name__, self.temp_dir, self.report_counts) if self.report_dir else None
+        self.policy = policy.Policy.parse(self.policy_spec) if self.policy_spec else None
+        if self.policy:
+            if self.plan:
+                raise Exception('Attack plans cannot enforce a password policy. Aborting')
+            # NOTE: The policy is enforced while streaming, the lists reused by name are still written as they are
+            self.streaming = True
+            logs.logger.info(f'Password policy: {self.policy}')
+        if self.provenance:
+            if self.plan:
+                raise Exception('Attack plans do not merge anything to track the provenance of. Aborting')
+            # NOTE: Candidates are tagged with their recipe on the way to the merge, so these have to be streamed
+            self.streaming = True
+        if self.dedup not in ('sort', 'hash'):
+            raise Exception(f'Unknown deduplication engine `{self.dedup}`. Aborting')
+        if self.hashed and self.provenance:
+            raise Exception('The provenance index needs sorted lists, use the `sort` deduplication engine. Aborting')
+        if self.compress:
+            # NOTE: Fails right away on an unknown codec, or one neither the bindings nor the tools are installed for
+            frames.Codec(self.compress)
+            if self.provenance:
+                raise Exception('The provenance index needs plain lists, these cannot be compressed. Aborting')
+        if self.dry_run and self.plan:
+            raise Exception('Attack plans are not built in a dry run. Aborting')
+        if self.journaling and not self.dry_run:
+            self.journal = journal.Journal(self.temp('journal.jsonl'))
+        if self.caching:
+            self.cache = cache.Cache(self.temp('cache'), self.recipes, self.bin_combinator, self.bin_hashcat)
+        if self.jobs > 1:
+            # NOTE: Concurrent jobs share the cores and memory meant for a single sort
+            self.sort_snippet = self.sorter(self.jobs)
+        self.dedup_snippet = self.deduper(self.jobs)
+
+    def resources(self, share):
+        cores = max(1, int(self.cores) // share)
+        memory = str(self.memory)
+        if memory.endswith('%'):
+            memory = f'{max(1, int(memory[:-1]) // share)}%'
+        return cores, memory
+
+    def sorter(self, share):
+        cores, memory = self.resources(share)
+        return f'sort -T {self.temp_dir} {self.compress_program} --parallel={cores} -S {memory}'
+
+    def check_which(self, name):
+        # NOTE: The built-in rule engine makes hashcat optional
+        if name == self.bin_hashcat and self.builtin:
+            return
+        super().check_which(name)
+
+    def run_shell(self, cmd, pipefail=False):
+        # NOTE: `wordz` ignores the exit code, a failed step would leave a partial list behind (and journal it as done)
+        logs.logger.debug(f' $ {cmd}')
+        process = subprocess.run(['bash', '-o', 'pipefail', '-c', cmd] if pipefail else cmd, shell=not pipefail)
+        if process.returncode:
+            raise Exception(f'Command `{cmd}` failed with exit code {process.returncode}. Aborting')
+
+    @property
+    def builtin(self):
+        return self.rules_engine == 'builtin'
+
+    @property
+    def deferred(self):
+        return self.jobs > 1 or self.cleanup or self.dry_run
+
+    @property
+    def eager(self):
+        return not self.streaming and not self.deferred and not self.plan
+
+    def register(self, recipe):
+        with self.lock:
+            return self.recipes.setdefault(recipe.destination, recipe)
+
+    def wordlist(self, path):
+        if isinstance(path, recipes.Recipe):
+            return path
+        return recipes.Wordlist(pathlib.Path(path), self.resolve)
+
+    def resolve(self, path):
+        # NOTE: Temporary files referenced by name are the explicitly reused ones, so these get written (once)
+        with self.lock:
+            if path in self.recipes:
+                self.refresh(self.recipes[path])
+            if not path.is_file():
+                if path not in self.recipes:
+                    raise Exception(f'Path {path} does not exist. Aborting')
+                self.materialize(self.recipes[path])
+        return path
+
+    def refresh(self, recipe):
+        # NOTE: Anything left by a previous run (or another class) is reused only if built from the same inputs, and completed
+        if isinstance(recipe, recipes.Wordlist):
+            recipe = self.recipes.get(recipe.destination)
+        if (self.cache or self.journal) and recipe is not None:
+            if self.cache:
+                self.cache.refresh(recipe)
+            if self.journal and recipe.destination.is_file() and self.journal.incomplete(recipe.destination):
+                logs.logger.info(f'`{recipe.name}` was left incomplete by a previous run, rebuilding')
+                recipe.destination.unlink()
+            for item in recipe.inputs:
+                self.refresh(item)
+
+    def materialize(self, recipe):
+        if isinstance(recipe, recipes.Wordlist):
+            return self.resolve(recipe.destination)
+        self.refresh(recipe)
+        kind = recipes.METHODS[recipe.method] if isinstance(recipe, recipes.Combination) else 'rule'
+        if self.journal:
+            key = self.step_key(recipe)
+            if self.journal.done(recipe.destination, key):
+                return recipe.destination
+            if not recipe.destination.is_file():
+                self.journal.write(recipe.destination, kind, key, journal.STARTED)
+        inputs = [self.materialize(item) for item in recipe.inputs]
+        if isinstance(recipe, recipes.Combination):
+            if (self.cache or self.journal) and recipe.method == recipes.BOTH and not recipe.destination.is_file():
+                # NOTE: `wordz` reuses the intermediate list of `both` whenever it exists
+                intermediate = self.temp(f'{recipe.right.stem}+{recipe.left.stem}{self.DEFAULT_EXT}')
+                if intermediate not in self.recipes:
+                    self.delete(intermediate)
+            with self.measure(recipes.METHODS[recipe.method], recipe.name, inputs, recipe.destination):
+                destination = self.combine(recipe.method, *inputs)
+            if self.cleanup and recipe.method == recipes.BOTH:
+                intermediate = self.temp(f'{recipe.right.stem}+{recipe.left.stem}{self.DEFAULT_EXT}')
+                if intermediate not in self.recipes:
+                    self.delete(intermediate)
+        elif self.builtin:
+            destination = recipe.destination
+            if not destination.is_file():
+                logs.logger.info(f'Processing `{recipe.wordlist}` with rule `{recipe.rule}`')
+                # NOTE: The shell creates the redirect target right away, the recipe would then read it back instead of generating
+                temporary = destination.with_name(destination.name + '.tmp')
+                with self.measure('rule', recipe.name, inputs, destination):
+                    self.stream([recipe], f'{self.sort_snippet} | uniq > {temporary}', min_length=0)
+                    self.move(temporary, destination)
+        else:
+            with self.measure('rule', recipe.name, inputs, recipe.destination):
+                destination = super().rule(*inputs, recipe.rule, recipe.destination.parent)
+        if self.cache:
+            self.cache.store(recipe)
+        if self.journal:
+            self.journal.write(recipe.destination, kind, key, journal.DONE)
+        return destination
+
+    def combination(self, method, left, right):
+        recipe = self.register(recipes.Combination(method, self.wordlist(left), self.wordlist(right), self.temp_dir))
+        if self.eager:
+            self.materialize(recipe)
+        return recipe
+
+    def right(self, left, right):
+        return self.combination(recipes.RIGHT, left, right)
+
+    def left(self, left, right):
+        return self.combination(recipes.LEFT, left, right)
+
+    def both(self, left, right):
+        return self.combination(recipes.BOTH, left, right)
+
+    def rule(self, wordlist, rule, dest_dir=None):
+        if dest_dir is None:
+            dest_dir = self.temp_dir
+        recipe = self.register(recipes.Rules(self.wordlist(wordlist), pathlib.Path(rule), dest_dir, self.bin_hashcat, self.builtin))
+        if self.eager:
+            self.materialize(recipe)
+        return recipe
+
+    def merge(self, destination, wordlists, compare=None):
+        wordlists = [self.wordlist(words) for words in wordlists if words is not None]
+        if self.manifest:
+            self.export(destination, wordlists, compare)
+        if self.plan:
+            self.export_plan(destination, wordlists, compare)
+        elif self.deferred:
+            self.merges.append((destination, wordlists, compare))
+        else:
+            self.merge_step(destination, wordlists, compare)
+
+    def relative(self, path):
+        try:
+            return str(pathlib.Path(path).relative_to(self.base_dir))
+        except ValueError:
+            return str(path)
+
+    def expression(self, recipe):
+        # NOTE: The same expressions as in `process()`, e.g. `right(hax0r-lang-int-basic, extra-basic)`
+        if isinstance(recipe, recipes.Wordlist):
+            if recipe.destination not in self.recipes:
+                if recipe.destination.parent == self.temp_dir:
+                    return recipe.stem
+                return str(pathlib.Path(self.relative(recipe.destination)).with_suffix(''))
+            recipe = self.recipes[recipe.destination]
+        if isinstance(recipe, recipes.Combination):
+            return f'{recipes.METHODS[recipe.method]}({self.expression(recipe.left)}, {self.expression(recipe.right)})'
+        return f'rule({self.expression(recipe.wordlist)}, {recipe.rule.name})'
+
+    def merge_now(self, destination, wordlists, compare=None):
+        # NOTE: Streamed inputs have no files to measure, these are counted while being streamed instead
+        with self.measure('merge', destination.name, () if self.streaming else wordlists, self.stored(destination)) as record:
+            if compare and self.exclusion:
+                # NOTE: Merge as a standalone list and probe the index in a single pass, the compare set is never sorted again
+                self.merge_now(destination, wordlists)
+                record['removed_by_compare'] = self.exclude(destination, compare)
+            elif not self.streaming and self.hashed:
+                self.merge_hashed(destination, [self.materialize(words) for words in wordlists], compare)
+            elif not self.streaming:
+                super().merge(destination, [self.materialize(words) for words in wordlists], compare)
+                # NOTE: `wordz` leaves the merged list as it was before the comparison in the temporary directory
+                merged = self.temp(destination.stem + self.DEFAULT_EXT)
+                if compare and self.report:
+                    record['removed_by_compare'] = self.report.count(merged)[0] - self.report.count(destination)[0]
+                if compare and self.cleanup and merged not in self.recipes:
+                    self.delete(merged)
+                # NOTE: `wordz` writes plain text, so this is the one case compressed afterwards
+                if self.compress:
+                    self.pack(destination)
+            else:
+                if self.policy:
+                    self.policy.stats.clear()
+                started = time.monotonic()
+                record['lines_in'], record['bytes_in'] = self.merge_streaming(destination, wordlists, compare)
+                if self.policy:
+                    self.saved(destination, record, time.monotonic() - started)
+
+    def merge_sorted(self, destination, wordlists):
+        # NOTE: A k-way merge of lists already sorted, streamed by `sort -m`, written again only when older than these
+        if destination.is_file() and all(destination.stat().st_mtime_ns >= path.stat().st_mtime_ns for path in wordlists):
+            return destination
+        logs.logger.info(f'Merging sorted lists into `{destination.name}`')
+        temporary = destination.with_name(destination.name + '.tmp')
+        with self.measure('merge', destination.name, wordlists, destination):
+            self.run_shell(f'{self.sort_snippet} -m -u {" ".join(str(path) for path in wordlists)} > {temporary}')
+            self.move(temporary, destination)
+        return destination
+
+    def expand(self, wordlist, rule, destination):
+        # NOTE: Appends `hashcat --stdout -r` output as is, in the order of generation
+        with self.measure('expand', destination.name, [wordlist], destination):
+            if not self.builtin:
+                # NOTE: hashcat reports a finished run as exhausted (1) in its exit code
+                return self.run_shell(f'{self.bin_hashcat} --stdout -r {rule} {wordlist} >> {destination} || [ $? -eq 1 ]')
+            compiled = mangling.load(rule)
+            with open(destination, 'ab') as output:
+                for batch in recipes.read_batches(wordlist):
+                    output.write(b'\n'.join(mangling.apply(compiled, batch)) + b'\n')
+
+    def run(self):
+        time_start = datetime.datetime.now()
+        logs.logger.info(f'Processing with class: {type(self).__name__}')
+        logs.logger.info(f'Base directory: {self.base_dir}')
+        logs.logger.info(f'Temporary directory: {self.temp_dir}')
+        logs.logger.info(f'Output directory: {self.output_dir}')
+        logs.logger.info(f'Using {self.cores} cores')
+        logs.logger.info(f'Using {self.memory} of memory')
+        try:
+            self.setup()
+            self.process()
+            if self.dry_run:
+                self.project()
+            elif self.deferred and not self.plan:
+                self.execute()
+        finally:
+            if self.report:
+                self.report.write()
+        time_total = datetime.datetime.now() - time_start
+        logs.logger.info(f'Total time: {time_total}')
+        logs.logger.info(f'Done! You may want to clean up the temporary directory yourself: {self.temp_dir}')
+        logs.logger.info('Make sure to remove the temporary files used for comparing if you plan to re-run the process.')
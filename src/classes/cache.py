@@ -0,0 +1,62 @@
+import hashlib
+import pathlib
+
+from wordz import logs
+
+import recipes
+
+
+class Cache:
+
+    def __init__(self, directory, registry, bin_combinator, bin_hashcat):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.registry = registry
+        self.bin_combinator = bin_combinator
+        self.bin_hashcat = bin_hashcat
+        self.digests = dict()
+        self.keys = dict()
+
+    def digest(self, path):
+        stat = pathlib.Path(path).stat()
+        memo = (str(path), stat.st_size, stat.st_mtime_ns)
+        if memo not in self.digests:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as fil:
+                for chunk in iter(lambda: fil.read(1 << 20), b''):
+                    sha.update(chunk)
+            self.digests[memo] = sha.hexdigest()
+        return self.digests[memo]
+
+    def key(self, recipe):
+        # NOTE: Temporary files referenced by name are keyed by the recipe producing them, everything else by content
+        if isinstance(recipe, recipes.Wordlist):
+            if recipe.destination in self.registry:
+                return self.key(self.registry[recipe.destination])
+            return self.digest(recipe.destination)
+        if recipe.destination not in self.keys:
+            if isinstance(recipe, recipes.Combination):
+                parts = ['combination', str(recipe.method), self.bin_combinator]
+            else:
+                parts = ['rule', self.digest(recipe.rule), self.bin_hashcat]
+            parts.extend(self.key(item) for item in recipe.inputs)
+            self.keys[recipe.destination] = hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+        return self.keys[recipe.destination]
+
+    def entry(self, recipe):
+        return pathlib.Path(self.directory, recipe.name + '.key')
+
+    def valid(self, recipe):
+        entry = self.entry(recipe)
+        return recipe.destination.is_file() and entry.is_file() and entry.read_text() == self.key(recipe)
+
+    def refresh(self, recipe):
+        if recipe.destination.is_file() and not self.valid(recipe):
+            logs.logger.info(f'Inputs of `{recipe.name}` have changed, rebuilding')
+            recipe.destination.unlink()
+
+    def store(self, recipe):
+        entry = self.entry(recipe)
+        temp = entry.with_suffix('.tmp')
+        temp.write_text(self.key(recipe))
+        temp.replace(entry)
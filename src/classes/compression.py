@@ -0,0 +1,47 @@
+import pathlib
+import sys
+
+from wordz import logs
+
+import frames
+import settings
+
+
+class Compression:
+
+    # NOTE: Either empty (plain lists) or one of `frames.CODECS`, the lists are then written as indexed frames
+    compress = settings.COMPRESS
+
+    @property
+    def frames_snippet(self):
+        return f'{sys.executable} {pathlib.Path(__file__).with_name("frames.py")} -f {self.compress}'
+
+    def stored(self, destination):
+        return frames.path(destination, self.compress) if self.compress else destination
+
+    def sink(self, destination):
+        if self.compress:
+            return f' | {self.frames_snippet} {self.stored(destination)}'
+        return f' > {destination}'
+
+    def pack(self, destination):
+        logs.logger.info(f'Compressing `{destination}`')
+        try:
+            self.run_shell(f'{self.frames_snippet} {self.stored(destination)} < {destination}')
+        except Exception:
+            # NOTE: The plain list is kept, only what was compressed of it goes away
+            self.drop(destination)
+            raise
+        self.delete(destination)
+
+    def drop(self, destination):
+        # NOTE: What a failed command wrote of a list, with its index
+        self.delete(self.stored(destination))
+        if self.compress:
+            self.delete(frames.index(self.stored(destination)))
+
+    def append_merged(self, destination, compare):
+        if destination.is_file():
+            self.append(destination, compare)
+        else:
+            self.run_shell(f'{self.frames_snippet} -d {self.stored(destination)} >> {compare}')
@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import pathlib
+import struct
+import sys
+import time
+
+import expander
+import frames
+import recipes
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+TIERS = (
+    'wordlists/passwords/1-xxs.txt',
+    'wordlists/passwords/2-xs.txt',
+    'wordlists/passwords/3-s.txt',
+    'wordlists/passwords/4-m.txt',
+)
+BATCH_WORDS = 1 << 16
+MASK = 0xffffffff
+
+
+def rotate(value, bits):
+    value &= MASK
+    return ((value << bits) | (value >> (32 - bits))) & MASK
+
+
+def md4(data):
+    # NOTE: Only used when OpenSSL does not provide MD4 anymore (it is a legacy algorithm since 3.0)
+    size = len(data) * 8
+    data += b'\x80' + b'\0' * ((55 - len(data)) % 64) + struct.pack('<Q', size)
+    a, b, c, d = 0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476
+    for offset in range(0, len(data), 64):
+        x = struct.unpack_from('<16I', data, offset)
+        aa, bb, cc, dd = a, b, c, d
+        for i in range(16):
+            k, s = i, (3, 7, 11, 19)[i % 4]
+            f = (b & c) | (~b & d)
+            a, b, c, d = d, rotate(a + f + x[k], s), b, c
+        for i in range(16):
+            k, s = (i % 4) * 4 + i // 4, (3, 5, 9, 13)[i % 4]
+            g = (b & c) | (b & d) | (c & d)
+            a, b, c, d = d, rotate(a + g + x[k] + 0x5a827999, s), b, c
+        for i in range(16):
+            k, s = (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)[i], (3, 9, 11, 15)[i % 4]
+            h = b ^ c ^ d
+            a, b, c, d = d, rotate(a + h + x[k] + 0x6ed9eba1, s), b, c
+        a, b, c, d = (a + aa) & MASK, (b + bb) & MASK, (c + cc) & MASK, (d + dd) & MASK
+    return struct.pack('<4I', a, b, c, d)
+
+
+def utf16(word):
+    # NOTE: Windows hashes the password as text, bytes that are not UTF-8 are taken one character each
+    try:
+        return word.decode().encode('utf-16le')
+    except UnicodeDecodeError:
+        return word.decode('latin-1').encode('utf-16le')
+
+
+def ntlm_function():
+    try:
+        hashlib.new('md4')
+    except ValueError:
+        return lambda word: md4(utf16(word))
+    return lambda word: hashlib.new('md4', utf16(word)).digest()
+
+
+# NOTE: Digest sizes (in bytes) and the functions hashing a candidate, NTLM is MD4 over the UTF-16LE of the password
+MODES = {
+    'md5': (16, lambda word: hashlib.md5(word).digest()),
+    'sha1': (20, lambda word: hashlib.sha1(word).digest()),
+    'sha256': (32, lambda word: hashlib.sha256(word).digest()),
+    'ntlm': (16, None),
+}
+
+targets = None
+function = None
+
+
+def read_hashes(path, mode):
+    # NOTE: The last field of the right length is taken, e.g. `user:hash` or pwdump output (LM hash comes before NT)
+    size = MODES[mode][0] * 2
+    found = set()
+    for line in pathlib.Path(path).read_text(errors='replace').splitlines():
+        for field in reversed(line.strip().split(':')):
+            if len(field) == size:
+                try:
+                    found.add(bytes.fromhex(field))
+                except ValueError:
+                    continue
+                break
+    return found
+
+
+def init(mode, hashes):
+    global targets, function
+    targets = hashes
+    function = ntlm_function() if mode == 'ntlm' else MODES[mode][1]
+
+
+def work(task):
+    tier, batch = task
+    if isinstance(batch, tuple):
+        # NOTE: A line range of a compressed list, read (and decompressed) by the worker itself
+        path, start, stop = batch
+        batch = [word for words in frames.reader(path).batches(start, stop) for word in words]
+    started = time.process_time()
+    hits = [(digest.hex(), word) for word, digest in zip(batch, map(function, batch)) if digest in targets]
+    return tier, len(batch), hits, time.process_time() - started, os.getpid()
+
+
+def files(paths):
+    for path in paths:
+        tier = frames.stem(path)
+        if frames.indexed(path):
+            for start, stop in frames.reader(str(path)).ranges():
+                yield tier, (str(path), start, stop)
+            continue
+        batch = list()
+        for lines in recipes.read_batches(path):
+            batch.extend(lines)
+            while len(batch) >= BATCH_WORDS:
+                yield tier, batch[:BATCH_WORDS]
+                batch = batch[BATCH_WORDS:]
+        if batch:
+            yield tier, batch
+
+
+def manifests(paths, base_dir):
+    # NOTE: Candidates of a tier straight from its recipes, without the list itself
+    for path in paths:
+        manifest = json.loads(pathlib.Path(path).read_text())
+        tier = pathlib.Path(manifest['output']).stem
+        keyspace = expander.Expander(manifest, base_dir)
+        batch = list()
+        for word in keyspace.candidates(0, len(keyspace)):
+            batch.append(word)
+            if len(batch) >= BATCH_WORDS:
+                yield tier, batch
+                batch = list()
+        if batch:
+            yield tier, batch
+
+
+def crack(tasks, mode, hashes, jobs, output):
+    started = time.monotonic()
+    remaining = set(hashes)
+    tried = dict()
+    workers = dict()
+    with multiprocessing.Pool(jobs, initializer=init, initargs=(mode, hashes)) as pool:
+        for tier, count, hits, used, pid in pool.imap_unordered(work, tasks):
+            tried[tier] = tried.get(tier, 0) + count
+            done, busy = workers.get(pid, (0, 0.0))
+            workers[pid] = (done + count, busy + used)
+            for digest, word in hits:
+                if bytes.fromhex(digest) in remaining:
+                    remaining.discard(bytes.fromhex(digest))
+                    output.write(f'{tier}\t{digest}:'.encode() + recipes.hexify(word) + b'\n')
+                    output.flush()
+            if not remaining:
+                pool.terminate()
+                break
+    return tried, workers, time.monotonic() - started, len(hashes) - len(remaining)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='crack',
+        description='Crack fast hashes on the CPU with the password tiers, hits are written as `tier<TAB>hash:password`',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('hashes', help='Hashes file, one per line (hex, `user:hash` and alike work too)')
+    parser.add_argument('-m', '--mode', choices=MODES, default='md5', help='Hash type')
+    parser.add_argument('-w', '--wordlist', action='append', help=f'Wordlist (tier) to try, may be repeated [Default: {", ".join(TIERS)}]')
+    parser.add_argument('-r', '--recipe', action='append', default=[], help='Recipe manifest (`*.recipe.json`) to stream candidates from, may be repeated')
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('-o', '--output', help='Write the hits to the given path instead of stdout')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    hashes = read_hashes(parsed.hashes, parsed.mode)
+    if not hashes:
+        raise Exception(f'No {parsed.mode} hashes found in `{parsed.hashes}`. Aborting')
+    wordlists = parsed.wordlist
+    if wordlists is None:
+        wordlists = [] if parsed.recipe else [pathlib.Path(parsed.base_dir, tier) for tier in TIERS]
+    wordlists = [frames.find(path) for path in wordlists]
+    tasks = (task for source in (files(wordlists), manifests(parsed.recipe, parsed.base_dir)) for task in source)
+    with open(parsed.output, 'ab') if parsed.output else contextlib.nullcontext(sys.stdout.buffer) as output:
+        tried, workers, elapsed, cracked = crack(tasks, parsed.mode, hashes, parsed.jobs, output)
+    total = sum(tried.values())
+    for tier, count in tried.items():
+        print(f'{tier}: {count:,} candidates', file=sys.stderr)
+    for pid, (count, used) in sorted(workers.items()):
+        print(f'Worker {pid}: {count:,} hashes, {count / used if used else 0:,.0f} H/s', file=sys.stderr)
+    print(f'Cracked {cracked} of {len(hashes)} in {elapsed:.1f}s, {total:,} candidates, {total / elapsed if elapsed else 0:,.0f} H/s overall', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import collections
+import contextlib
+import multiprocessing
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import zlib
+
+
+BLOCK_SIZE = 1 << 24
+# NOTE: Every level splits a bucket by 8 more bits of the CRC32 of a word, four levels at most
+BITS = 8
+BUCKETS = 1 << BITS
+# NOTE: A dictionary of (short) words takes about that many times their size in memory
+MEMORY_FACTOR = 10
+# NOTE: Marks a phase finished in a work directory kept between runs
+COMPLETE = 'complete'
+
+
+def memory(value):
+    # NOTE: Same as `sort -S`, a percentage of the physical memory or a size (`K` by default)
+    value = str(value).strip().upper()
+    if value.endswith('%'):
+        return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') * float(value[:-1]) / 100)
+    units = 'KMGT'
+    if value[-1:] == 'B':
+        return int(value[:-1])
+    if value[-1:] in units:
+        return int(float(value[:-1]) * 1024 ** (units.index(value[-1]) + 1))
+    return int(float(value) * 1024)
+
+
+def blocks(fil):
+    # NOTE: Blocks of whole lines, the last one gets its newline if missing
+    while True:
+        data = fil.read(BLOCK_SIZE)
+        if not data:
+            return
+        if not data.endswith(b'\n'):
+            data += fil.readline()
+            if not data.endswith(b'\n'):
+                data += b'\n'
+        yield data
+
+
+def split(task):
+    data, shift, min_length = task
+    parts = [[] for _ in range(BUCKETS)]
+    crc32 = zlib.crc32
+    lines = data.split(b'\n')
+    lines.pop()
+    for line in lines:
+        if len(line) >= min_length:
+            parts[crc32(line) >> shift & (BUCKETS - 1)].append(line)
+    return [b'\n'.join(part) + b'\n' if part else b'' for part in parts]
+
+
+def partition(sources, directory, shift, min_length=0, pool=None, window=1):
+    # NOTE: Blocks are split in parallel, yet written in their order, so a bucket keeps the order of its words
+    directory.mkdir(parents=True, exist_ok=True)
+    outputs = [open(pathlib.Path(directory, f'{number:02x}.txt'), 'wb') for number in range(BUCKETS)]
+    pending = collections.deque()
+
+    def write(parts):
+        for output, part in zip(outputs, parts):
+            if part:
+                output.write(part)
+
+    try:
+        for source in sources:
+            with (open(source, 'rb') if isinstance(source, (str, pathlib.Path)) else contextlib.nullcontext(source)) as fil:
+                for data in blocks(fil):
+                    if pool is None:
+                        write(split((data, shift, min_length)))
+                        continue
+                    pending.append(pool.apply_async(split, ((data, shift, min_length),)))
+                    if len(pending) >= window:
+                        write(pending.popleft().get())
+        while pending:
+            write(pending.popleft().get())
+    finally:
+        for output in outputs:
+            output.close()
+    return [pathlib.Path(directory, f'{number:02x}.txt') for number in range(BUCKETS)]
+
+
+def dedup(task):
+    # NOTE: The first occurrence of every word is kept (in order), buckets too big for the budget are split once more
+    source, compared, output, shift, budget = task
+    lines_in, excluded = 0, 0
+    if source.stat().st_size * MEMORY_FACTOR > budget and shift < 32:
+        directory = source.with_suffix('.d')
+        parts = partition([source], directory, shift)
+        compared_parts = partition([compared], directory / 'compare', shift) if compared else [None] * BUCKETS
+        for part, compared_part in zip(parts, compared_parts):
+            found = consume((part, compared_part, output, shift + BITS, budget))
+            lines_in += found[0]
+            excluded += found[1]
+        shutil.rmtree(directory)
+        return lines_in, excluded
+    words = dict()
+    with open(source, 'rb') as fil:
+        for data in blocks(fil):
+            lines = data.split(b'\n')
+            lines.pop()
+            lines_in += len(lines)
+            words.update(dict.fromkeys(lines))
+    if compared:
+        with open(compared, 'rb') as fil:
+            for data in blocks(fil):
+                lines = data.split(b'\n')
+                lines.pop()
+                for line in lines:
+                    if line in words:
+                        del words[line]
+                        excluded += 1
+    if words:
+        with open(output, 'ab') as fil:
+            fil.write(b'\n'.join(words) + b'\n')
+    return lines_in, excluded
+
+
+def consume(task):
+    # NOTE: A bucket is removed once deduplicated, to free its space early
+    found = dedup(task)
+    task[0].unlink()
+    return found
+
+
+def resume(task):
+    # NOTE: Buckets finished by a previous run are kept as they are, the others are done again from their input (which is
+    # only removed once the bucket is marked as finished)
+    source, compared, output, shift, budget = task
+    done = output.with_suffix('.done')
+    if done.is_file():
+        source.unlink(missing_ok=True)
+        return tuple(int(value) for value in done.read_text().split())
+    output.unlink(missing_ok=True)
+    shutil.rmtree(source.with_suffix('.d'), ignore_errors=True)
+    found = dedup(task)
+    marker = done.with_suffix('.tmp')
+    marker.write_text(f'{found[0]} {found[1]}\n')
+    marker.replace(done)
+    source.unlink()
+    return found
+
+
+def partitioned(work):
+    # NOTE: Whether the candidates have been read in full by a previous run, these are not needed again then
+    return pathlib.Path(work, 'words', COMPLETE).is_file()
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='dedup',
+        description='Deduplicate lists by hash partitions, the first occurrences are kept in a stable (not lexical) order',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('wordlists', nargs='*', help='Lists to merge, standard input if none')
+    parser.add_argument('-c', '--compare', help='Leave out the words of this list (e.g. `passwords-all.txt`)')
+    parser.add_argument('-n', '--min-length', type=int, default=0, help='Leave out the words shorter than that')
+    parser.add_argument('-t', '--temp-dir', default=tempfile.gettempdir(), help='Temporary directory path')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('-m', '--memory', default='50%', help='Memory budget shared by the workers (as for `sort -S`)')
+    parser.add_argument('-w', '--work-dir', help='Work directory kept when interrupted, a run with the same one resumes from the finished buckets')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    if parsed.compare and not os.path.isfile(parsed.compare):
+        raise Exception(f'Path {parsed.compare} does not exist. Aborting')
+    budget = memory(parsed.memory) // max(parsed.jobs, 1)
+    if parsed.work_dir:
+        work = pathlib.Path(parsed.work_dir)
+        work.mkdir(parents=True, exist_ok=True)
+    else:
+        work = pathlib.Path(tempfile.mkdtemp(prefix='dedup-', dir=parsed.temp_dir))
+    completed = False
+    try:
+        with multiprocessing.Pool(parsed.jobs) as pool:
+            phases = list()
+            for name, sources, min_length in (('words', parsed.wordlists or [sys.stdin.buffer], parsed.min_length), ('compare', [parsed.compare], 0)):
+                directory = work / name
+                if name == 'compare' and not parsed.compare:
+                    phases.append([None] * BUCKETS)
+                elif pathlib.Path(directory, COMPLETE).is_file():
+                    print(f'Resuming with the {name} partitioned by a previous run', file=sys.stderr)
+                    phases.append([pathlib.Path(directory, f'{number:02x}.txt') for number in range(BUCKETS)])
+                else:
+                    phases.append(partition(sources, directory, 0, min_length, pool, parsed.jobs * 2))
+                    pathlib.Path(directory, COMPLETE).touch()
+            tasks = [(part, compared_part, work / f'{number:02x}.out', BITS, budget) for number, (part, compared_part) in enumerate(zip(*phases))]
+            lines_in, excluded = 0, 0
+            for task, (count, removed) in zip(tasks, pool.imap(resume if parsed.work_dir else consume, tasks)):
+                lines_in += count
+                excluded += removed
+                output = task[2]
+                if output.is_file():
+                    with open(output, 'rb') as fil:
+                        shutil.copyfileobj(fil, sys.stdout.buffer)
+                    # NOTE: Kept for a resumed run until everything is written
+                    if not parsed.work_dir:
+                        output.unlink()
+        sys.stdout.buffer.flush()
+        print(f'Deduplicated {lines_in:,} lines, {excluded:,} found in the compare list', file=sys.stderr)
+        completed = True
+    finally:
+        if completed or not parsed.work_dir:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
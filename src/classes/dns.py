@@ -1,10 +1,17 @@
-from wordz import (
-    Combinator,
-    logs,
-)
+import pathlib
+import sys
 
+from wordz import logs
 
-class Subdomains(Combinator):
+# NOTE: `wordz` loads this file by its path, appended so that `http.py` does not shadow the standard library
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import permutations  # noqa: E402
+import settings  # noqa: E402
+from builder import Builder  # noqa: E402
+
+
+class Subdomains(Builder):
 
     def process(self):
         logs.logger.info('Generating subdomains')
@@ -13,4 +20,27 @@ class Subdomains(Combinator):
         self.copy(self.temp('subdomains-basic.txt'), self.base('wordlists/dns/basic.txt'))
         self.compare(self.temp('subdomains-basic.txt'), self.temp('subdomains-extended.txt'), self.base('wordlists/dns/basic.txt'), append=True)
         self.copy(self.base('wordlists/dns/basic.txt'), self.base('wordlists/dns/extended.txt'))
-        self.run_shell(f'{self.bin_hashcat} --stdout -r {self.base_dir}/src/rules/subdomains.rule {self.temp_dir}/subdomains-basic.txt >> {self.base_dir}/wordlists/dns/extended.txt')
+        self.expand(self.temp('subdomains-basic.txt'), self.base('src/rules/subdomains.rule'), self.base('wordlists/dns/extended.txt'))
+
+
+class SubdomainPermutations(Subdomains):
+
+    targets = settings.TARGETS
+    domain = settings.DOMAIN
+    limit = settings.PERMUTATIONS
+
+    def process(self):
+        # NOTE: Permutations of the hostnames known for a target (`BRUTAS_TARGETS`), the most likely first
+        if not self.targets:
+            raise Exception('Set BRUTAS_TARGETS to a file of known hostnames. Aborting')
+        logs.logger.info(f'Generating permutations of `{self.targets}`')
+        try:
+            target = permutations.Target(permutations.read_hosts(self.targets), self.domain.encode() if self.domain else None)
+        except ValueError as e:
+            raise Exception(f'{e}. Aborting')
+        destination = self.output(f'wordlists/dns/permutations-{target.domain.decode()}.txt')
+        self.ensure_path(destination)
+        with self.measure('permute', destination.name, [self.targets], destination):
+            with open(destination, 'wb') as output:
+                permutations.write(permutations.load(self.base_dir, target).generate(self.limit), output)
+        logs.logger.info(f'Permutations written: {destination}')
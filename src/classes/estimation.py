@@ -0,0 +1,61 @@
+from wordz import logs
+
+import exclusion
+import planner
+import recipes
+import report
+import settings
+
+
+class Estimation:
+
+    # NOTE: Merges estimated (sizes, temporary space and time) instead of being built
+    dry_run = settings.DRY_RUN
+
+    def project(self):
+        # NOTE: Exact sizes of the expressions from the line counts, the rest estimated from samples, nothing is written
+        estimator = planner.Planner(self.base_dir, int(self.min_length), self.searchable)
+        estimates = list()
+        for destination, wordlists, compare in self.merges:
+            logs.logger.info(f'Estimating `{destination.name}`')
+            for words in wordlists:
+                logs.logger.debug(f' {self.expression(words)}')
+            estimates.append(estimator.merge(self.relative(destination), [self.describe(words) for words in wordlists], compare))
+        generation, sorting = planner.calibrate(self.sort_snippet, self.temp_dir, estimator.words())
+        logs.logger.info(f'Generating {report.human(generation)}B/s, sorting {report.human(sorting)}B/s')
+        # NOTE: Temporary files are charged to the first merge reading them, each merge also spills what it sorts
+        written = {recipe.destination: recipe for recipe in self.written() if not recipe.destination.is_file()}
+        compared = {compare: 0 for _, _, compare in self.merges if compare}
+        kept, peak = 0, 0
+        for (_, wordlists, compare), estimate in zip(self.merges, estimates):
+            needed = [written.pop(recipe.destination) for recipe in self.reads(wordlists) if recipe.destination in written]
+            files = sum(estimator.measure(self.describe(recipe))[2] for recipe in needed)
+            estimate.temp = int(files + estimate.kept_bytes)
+            estimate.seconds = (files + estimate.raw_bytes) / generation + estimate.kept_bytes / sorting
+            peak = max(peak, kept + sum(compared.values()) + estimate.temp)
+            if not self.cleanup:
+                kept += files
+            if compare:
+                compared[compare] += estimate.size
+        planner.summary(estimates, peak)
+
+    def searchable(self, compare):
+        # NOTE: Merges sorted into the compare set keep it sorted, otherwise it is only searched through its exclusion index
+        if self.exclusion and exclusion.index_path(self.exclusion, compare).exists():
+            return self.exclusion_index(compare)
+        if self.hashed and not self.exclusion:
+            return None
+        return planner.Sorted(compare)
+
+    def reads(self, wordlists):
+        # NOTE: Every recipe behind the given lists, in the order these are needed
+        found = dict()
+        queue = list(wordlists)
+        while queue:
+            recipe = queue.pop()
+            if isinstance(recipe, recipes.Wordlist):
+                recipe = self.recipes.get(recipe.destination)
+            if recipe is not None and recipe.destination not in found:
+                found[recipe.destination] = recipe
+                queue.extend(recipe.inputs)
+        return list(found.values())
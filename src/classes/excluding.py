@@ -0,0 +1,59 @@
+import itertools
+
+from wordz import logs
+
+import exclusion
+import frames
+import provenance
+import recipes
+import settings
+
+
+class Excluding:
+
+    # NOTE: Merges excluding the words of the compare set through its index, the compare set itself is left as it is
+    exclusion = settings.EXCLUSION
+    exclusion_capacity = settings.EXCLUSION_CAPACITY
+    exclusion_error = settings.EXCLUSION_ERROR
+
+    def exclusion_index(self, compare):
+        return exclusion.open_index(self.exclusion, compare, self.exclusion_capacity, self.exclusion_error)
+
+    def exclude(self, destination, compare):
+        logs.logger.info(f'Excluding previously generated words from `{destination}`')
+        index = self.exclusion_index(compare)
+        source = self.stored(destination)
+        filtered = source.with_name(source.name + '.tmp')
+        remap = provenance.Remap(provenance.Runs.load(provenance.path(destination))) if self.provenance else None
+        excluded = 0
+        if self.compress:
+            batches = frames.Reader(source).batches()
+            output = frames.Writer(filtered, frames.Codec(self.compress))
+        else:
+            batches = recipes.read_batches(source)
+            output = open(filtered, 'wb')
+        try:
+            for batch in batches:
+                size = len(batch)
+                if remap:
+                    kept = [word not in index for word in batch]
+                    remap.add(batch, kept)
+                    batch = list(itertools.compress(batch, kept))
+                else:
+                    batch = [word for word in batch if word not in index]
+                excluded += size - len(batch)
+                for word in batch:
+                    index.add(word)
+                if batch:
+                    output.write([word + b'\n' for word in batch] if self.compress else b'\n'.join(batch) + b'\n')
+        finally:
+            output.close()
+        self.move(filtered, source)
+        if self.compress:
+            self.move(frames.index(filtered), frames.index(source))
+        # NOTE: Committed only once the list is complete, an interrupted merge is then resumed from the journal
+        self.checkpoint(destination)
+        index.commit()
+        if remap:
+            remap.finish().write(provenance.path(destination))
+        return excluded
@@ -0,0 +1,132 @@
+import array
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import pathlib
+
+from wordz import logs
+
+
+class ExactIndex:
+
+    # NOTE: 12 bits pick the shard and 64 more are stored, so collisions stay unlikely even for 10^10 lines
+    SHARD_BITS = 12
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.exists = self.path.is_dir()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shards = dict()
+        self.pending = dict()
+
+    def locate(self, word):
+        digest = int.from_bytes(hashlib.blake2b(word, digest_size=10).digest(), 'big')
+        return digest >> 64 >> (16 - self.SHARD_BITS), digest & 0xFFFFFFFFFFFFFFFF
+
+    def shard(self, number):
+        if number not in self.shards:
+            path = pathlib.Path(self.path, f'{number:03x}.bin')
+            values = ()
+            if path.is_file() and path.stat().st_size:
+                with open(path, 'rb') as fil:
+                    values = memoryview(mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)).cast('Q')
+            self.shards[number] = values
+        return self.shards[number]
+
+    def __contains__(self, word):
+        number, value = self.locate(word)
+        values = self.shard(number)
+        position = bisect.bisect_left(values, value)
+        return position < len(values) and values[position] == value
+
+    def add(self, word):
+        number, value = self.locate(word)
+        self.pending.setdefault(number, array.array('Q')).append(value)
+        # NOTE: Spill to the shard's side file, the lookups only need the committed state as merges are unique
+        if len(self.pending[number]) >= 1 << 16:
+            self.spill(number)
+
+    def spill(self, number):
+        with open(pathlib.Path(self.path, f'{number:03x}.new'), 'ab') as fil:
+            self.pending.pop(number).tofile(fil)
+
+    def commit(self):
+        for number in list(self.pending):
+            self.spill(number)
+        self.shards.clear()
+        for new in sorted(self.path.glob('*.new')):
+            path = new.with_suffix('.bin')
+            values = array.array('Q')
+            for source in (path, new):
+                if source.is_file():
+                    values.frombytes(source.read_bytes())
+            temp = path.with_suffix('.tmp')
+            with open(temp, 'wb') as fil:
+                array.array('Q', sorted(set(values))).tofile(fil)
+            temp.replace(path)
+            new.unlink()
+
+
+class BloomIndex:
+
+    def __init__(self, path, capacity, error_rate):
+        self.path = pathlib.Path(path)
+        self.meta = self.path.with_name(self.path.name + '.json')
+        self.exists = self.path.is_file() and self.meta.is_file()
+        if self.exists:
+            params = json.loads(self.meta.read_text())
+        else:
+            bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+            params = {'bits': bits, 'hashes': max(1, round(bits / capacity * math.log(2)))}
+            with open(self.path, 'wb') as fil:
+                fil.truncate((bits + 7) // 8)
+            self.meta.write_text(json.dumps(params))
+        self.bits = params['bits']
+        self.hashes = params['hashes']
+        with open(self.path, 'r+b') as fil:
+            self.filter = mmap.mmap(fil.fileno(), 0)
+
+    def positions(self, word):
+        digest = hashlib.blake2b(word, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, word):
+        return all(self.filter[position >> 3] & (1 << (position & 7)) for position in self.positions(word))
+
+    def add(self, word):
+        for position in self.positions(word):
+            self.filter[position >> 3] |= 1 << (position & 7)
+
+    def commit(self):
+        self.filter.flush()
+
+
+def index_path(mode, compare):
+    return pathlib.Path(compare).with_suffix(f'.{mode}')
+
+
+def rollback(mode, compare):
+    # NOTE: Words spilled by an interrupted merge were never committed, the committed shards are left as they are
+    for new in index_path(mode, compare).glob('*.new'):
+        new.unlink()
+
+
+def open_index(mode, compare, capacity, error_rate):
+    path = index_path(mode, compare)
+    if mode == 'exact':
+        index = ExactIndex(path)
+    elif mode == 'bloom':
+        index = BloomIndex(path, capacity, error_rate)
+    else:
+        raise Exception(f'Unknown exclusion index `{mode}`. Aborting')
+    if not index.exists and pathlib.Path(compare).is_file():
+        logs.logger.info(f'Initializing exclusion index `{path}` with `{compare}`')
+        with open(compare, 'rb') as fil:
+            for line in fil:
+                index.add(line.rstrip(b'\r\n'))
+        index.commit()
+    return index
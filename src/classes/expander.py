@@ -0,0 +1,181 @@
+import argparse
+import bisect
+import json
+import pathlib
+import sys
+
+import mangling
+import recipes
+
+
+class Lines:
+
+    def __init__(self, words):
+        self.words = words
+
+    def __len__(self):
+        return len(self.words)
+
+    def iterate(self, start, stop):
+        for position in range(start, min(stop, len(self.words))):
+            yield self.words[position]
+
+
+class Product:
+
+    # NOTE: Mixed-radix numbering, candidate `i` is head `i // len(tails)` followed by tail `i % len(tails)`
+    def __init__(self, heads, tails):
+        self.heads = heads
+        self.tails = tails
+        self.size = len(heads) * len(tails)
+
+    def __len__(self):
+        return self.size
+
+    def iterate(self, start, stop):
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        radix = len(self.tails)
+        first = start // radix
+        position = first * radix
+        for head in self.heads.iterate(first, (stop - 1) // radix + 1):
+            for tail in self.tails.iterate(max(start - position, 0), min(stop - position, radix)):
+                # NOTE: Skipped words keep their numbers, so the ranges stay the same whatever is filtered out
+                if head is None or tail is None or len(head) > recipes.LEN_MAX or len(tail) > recipes.LEN_MAX:
+                    yield None
+                else:
+                    yield head + tail
+            position += radix
+
+
+class Concat:
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.offsets = [0]
+        for part in parts:
+            self.offsets.append(self.offsets[-1] + len(part))
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def iterate(self, start, stop):
+        number = max(bisect.bisect_right(self.offsets, start) - 1, 0)
+        for part, offset in zip(self.parts[number:], self.offsets[number:]):
+            if offset >= stop:
+                break
+            yield from part.iterate(max(start - offset, 0), stop - offset)
+
+
+class Expander:
+
+    def __init__(self, manifest, base_dir):
+        self.manifest = manifest
+        self.base_dir = pathlib.Path(base_dir)
+        self.loaded = dict()
+        self.keyspace = Concat([self.node(item) for item in manifest['inputs']])
+
+    def path(self, name):
+        return pathlib.Path(self.base_dir, name)
+
+    def load(self, name):
+        if name not in self.loaded:
+            path = self.path(name)
+            if not path.is_file():
+                raise Exception(f'Path {path} does not exist. Aborting')
+            self.loaded[name] = Lines([word for batch in recipes.read_batches(path) for word in batch])
+        return self.loaded[name]
+
+    def rules(self, name):
+        return mangling.load(self.path(name))
+
+    def node(self, item):
+        if 'rules' in item:
+            # NOTE: Rule outputs are deduplicated (like `sort | uniq` does when building), hence held in memory
+            key = json.dumps(item, sort_keys=True)
+            if key not in self.loaded:
+                wordlist = self.node(item['wordlist'])
+                compiled = self.rules(item['rules'])
+                words = (word for word in wordlist.iterate(0, len(wordlist)) if word is not None)
+                self.loaded[key] = Lines(sorted(set(mangling.apply(compiled, list(words)))))
+            return self.loaded[key]
+        if 'wordlist' in item:
+            return self.load(item['wordlist'])
+        left = self.node(item['left'])
+        right = self.node(item['right'])
+        if item['combination'] == 'right':
+            return Product(left, right)
+        if item['combination'] == 'left':
+            return Product(right, left)
+        return Product(Product(right, left), right)
+
+    def __len__(self):
+        return len(self.keyspace)
+
+    def candidates(self, start, stop):
+        min_length = self.manifest['min_length']
+        for word in self.keyspace.iterate(start, stop):
+            if word is not None and len(word) >= min_length:
+                yield word
+
+
+def get_range(size, skip, limit, shard):
+    # NOTE: Positions, not the lines written, so that the ranges of every machine are known up front
+    if skip < 0 or (limit is not None and limit < 0):
+        raise ValueError('Skip and limit cannot be negative')
+    start, stop = 0, size
+    if shard:
+        try:
+            number, count = (int(value) for value in shard.split('/'))
+        except ValueError:
+            raise ValueError(f'Invalid shard `{shard}`, expected e.g. `2/8`')
+        if not 1 <= number <= count:
+            raise ValueError(f'Invalid shard `{shard}`, expected e.g. `2/8`')
+        start, stop = size * (number - 1) // count, size * number // count
+    start = min(start + skip, stop)
+    if limit is not None:
+        stop = min(start + limit, stop)
+    return start, stop
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='expander',
+        description='Write the candidates of a tier to stdout using its recipe manifest (`*.recipe.json`)',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('manifest', help='Recipe manifest path')
+    parser.add_argument('-b', '--base-dir', default=pathlib.Path(__file__).parents[2], help='Base directory path')
+    # NOTE: Words shorter than the minimal length are left out but keep their positions, so fewer lines may be written
+    parser.add_argument('-s', '--keyspace-skip', dest='skip', metavar='POSITIONS', type=int, default=0, help='Number of keyspace positions to skip (as for `--shard`)')
+    parser.add_argument('-l', '--keyspace-limit', dest='limit', metavar='POSITIONS', type=int, help='Maximal number of keyspace positions to go through (as for `--shard`)')
+    parser.add_argument('--shard', help='Write only the given part of the keyspace (e.g. `2/8`)')
+    parser.add_argument('--keyspace', action='store_true', help='Print the keyspace size and exit')
+    return parser
+
+
+def main():
+    parser = get_parser()
+    parsed = parser.parse_args()
+    expander = Expander(json.loads(pathlib.Path(parsed.manifest).read_text()), parsed.base_dir)
+    if parsed.keyspace:
+        print(len(expander))
+        return
+    try:
+        start, stop = get_range(len(expander), parsed.skip, parsed.limit, parsed.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    output = sys.stdout.buffer
+    batch = list()
+    for word in expander.candidates(start, stop):
+        batch.append(word)
+        if len(batch) >= recipes.BATCH_SIZE:
+            output.write(b'\n'.join(batch) + b'\n')
+            batch.clear()
+    if batch:
+        output.write(b'\n'.join(batch) + b'\n')
+
+
+if __name__ == '__main__':
+    main()
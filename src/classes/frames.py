@@ -0,0 +1,224 @@
+import argparse
+import functools
+import pathlib
+import shutil
+import subprocess
+import sys
+
+import expander
+import recipes
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+CODECS = {'zstd': '.zst', 'lz4': '.lz4'}
+INDEX = '.frames'
+# NOTE: Every frame holds that many lines (the last one fewer), so the frame of a line is known without searching
+FRAME_LINES = 1 << 20
+
+
+class Codec:
+
+    # NOTE: The Python bindings when installed, the command line tools otherwise (one process per frame)
+    def __init__(self, name, level=3):
+        if name not in CODECS:
+            raise Exception(f'Unknown compression `{name}`, use one of: {", ".join(CODECS)}. Aborting')
+        if not (zstandard if name == 'zstd' else lz4) and not shutil.which(name):
+            raise Exception(f'Neither the Python bindings nor the `{name}` command found for `{name}` compression. Aborting')
+        self.name = name
+        self.level = level
+
+    def compress(self, data):
+        if self.name == 'zstd' and zstandard:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        if self.name == 'lz4' and lz4:
+            return lz4.frame.compress(data, compression_level=self.level)
+        return self.run([self.name, '-q', '-c', f'-{self.level}'], data)
+
+    def decompress(self, data):
+        if self.name == 'zstd' and zstandard:
+            return zstandard.ZstdDecompressor().decompress(data)
+        if self.name == 'lz4' and lz4:
+            return lz4.frame.decompress(data)
+        return self.run([self.name, '-q', '-d', '-c'], data)
+
+    def run(self, cmd, data):
+        process = subprocess.run(cmd, input=data, stdout=subprocess.PIPE)
+        if process.returncode:
+            raise Exception(f'Command `{" ".join(cmd)}` failed with exit code {process.returncode}. Aborting')
+        return process.stdout
+
+
+def path(destination, codec):
+    # NOTE: E.g. `wordlists/passwords/7-xxl.txt.zst`, with the index in `7-xxl.txt.zst.frames`
+    return pathlib.Path(str(destination) + CODECS[codec])
+
+
+def index(compressed):
+    return pathlib.Path(str(compressed) + INDEX)
+
+
+def find(plain):
+    # NOTE: The list as it is if found, otherwise its compressed version (if any)
+    plain = pathlib.Path(plain)
+    if not plain.is_file():
+        for codec in CODECS:
+            if index(path(plain, codec)).is_file():
+                return path(plain, codec)
+    return plain
+
+
+def indexed(compressed):
+    return index(compressed).is_file()
+
+
+def stem(wordlist):
+    # NOTE: The name of a list whether compressed or not, e.g. `7-xxl` for `7-xxl.txt.zst`
+    wordlist = pathlib.Path(wordlist)
+    if indexed(wordlist):
+        wordlist = wordlist.with_suffix('')
+    return wordlist.stem
+
+
+class Writer:
+
+    def __init__(self, destination, codec, frame_lines=FRAME_LINES):
+        self.destination = pathlib.Path(destination)
+        self.codec = codec
+        self.frame_lines = frame_lines
+        self.output = open(self.destination, 'wb')
+        self.pending = list()
+        self.lines = 0
+        self.size = 0
+        self.frames = list()
+
+    def write(self, lines):
+        # NOTE: Lines as read from a file, each with its newline
+        self.pending.extend(lines)
+        while len(self.pending) >= self.frame_lines:
+            self.flush(self.pending[:self.frame_lines])
+            del self.pending[:self.frame_lines]
+
+    def flush(self, lines):
+        data = b''.join(lines)
+        if not data.endswith(b'\n'):
+            data += b'\n'
+        self.frames.append((self.lines, self.output.tell(), self.size))
+        self.output.write(self.codec.compress(data))
+        self.lines += len(lines)
+        self.size += len(data)
+
+    def close(self):
+        if self.pending:
+            self.flush(self.pending)
+            self.pending.clear()
+        self.frames.append((self.lines, self.output.tell(), self.size))
+        self.output.close()
+        # NOTE: `#codec<TAB>lines per frame`, then `line<TAB>compressed offset<TAB>offset` per frame and once more at the end
+        with open(index(self.destination), 'w') as fil:
+            fil.write(f'#{self.codec.name}\t{self.frame_lines}\n')
+            for line, offset, plain in self.frames:
+                fil.write(f'{line}\t{offset}\t{plain}\n')
+
+
+class Reader:
+
+    def __init__(self, compressed):
+        self.path = pathlib.Path(compressed)
+        self.lines, self.offsets, self.sizes = list(), list(), list()
+        with open(index(self.path)) as fil:
+            name, frame_lines = fil.readline().lstrip('#').split()
+            for row in fil:
+                line, offset, plain = row.split()
+                self.lines.append(int(line))
+                self.offsets.append(int(offset))
+                self.sizes.append(int(plain))
+        self.codec = Codec(name)
+        self.frame_lines = int(frame_lines)
+
+    def __len__(self):
+        return self.lines[-1]
+
+    @property
+    def size(self):
+        return self.sizes[-1]
+
+    def frame(self, fil, number):
+        fil.seek(self.offsets[number])
+        return self.codec.decompress(fil.read(self.offsets[number + 1] - self.offsets[number]))
+
+    def batches(self, start=0, stop=None):
+        # NOTE: A single seek to the frame of the first line, the lines before it within the frame are skipped
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        with open(self.path, 'rb') as fil:
+            for number in range(start // self.frame_lines, (stop - 1) // self.frame_lines + 1):
+                first = self.lines[number]
+                lines = self.frame(fil, number).split(b'\n')
+                lines.pop()
+                yield [line.rstrip(b'\r') for line in lines[max(start - first, 0):stop - first]]
+
+    def ranges(self, count=1):
+        # NOTE: Line ranges aligned to the frames, for workers reading their part on their own
+        step = self.frame_lines * count
+        return [(start, min(start + step, len(self))) for start in range(0, len(self), step)]
+
+
+@functools.lru_cache(maxsize=None)
+def reader(compressed):
+    return Reader(compressed)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='frames',
+        description='Write a list (from stdin) as independently compressed frames of lines with an index, or read it back from any line',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('path', help='Compressed list path, e.g. `wordlists/passwords/7-xxl.txt.zst`')
+    parser.add_argument('-d', '--decompress', action='store_true', help='Write the lines of the list to stdout')
+    parser.add_argument('-f', '--format', choices=CODECS, default='zstd', help='Compression format')
+    parser.add_argument('-L', '--level', type=int, default=3, help='Compression level')
+    parser.add_argument('-n', '--frame-lines', type=int, default=FRAME_LINES, help='Number of lines per frame')
+    parser.add_argument('-s', '--skip', type=int, default=0, help='Number of lines to skip')
+    parser.add_argument('-l', '--limit', type=int, help='Maximal number of lines to write')
+    parser.add_argument('--shard', help='Write only the given part of the list (e.g. `2/8`)')
+    parser.add_argument('--count', action='store_true', help='Print the number of lines and exit')
+    return parser
+
+
+def main():
+    parser = get_parser()
+    parsed = parser.parse_args()
+    if parsed.decompress or parsed.count:
+        compressed = Reader(parsed.path)
+        if parsed.count:
+            print(len(compressed))
+            return
+        try:
+            start, stop = expander.get_range(len(compressed), parsed.skip, parsed.limit, parsed.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        for batch in compressed.batches(start, stop):
+            if batch:
+                sys.stdout.buffer.write(b'\n'.join(batch) + b'\n')
+        return
+    writer = Writer(parsed.path, Codec(parsed.format, parsed.level), parsed.frame_lines)
+    while True:
+        lines = sys.stdin.buffer.readlines(recipes.BATCH_SIZE)
+        if not lines:
+            break
+        writer.write(lines)
+    writer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import pathlib
+import sys
+
+from wordz import logs
+
+import settings
+
+
+class Hashing:
+
+    # NOTE: Either `sort` or `hash`, the latter deduplicates by hash partitions and leaves the lists unsorted
+    dedup = settings.DEDUP
+
+    def deduper(self, share):
+        cores, memory = self.resources(share)
+        return f'{sys.executable} {pathlib.Path(__file__).with_name("dedup.py")} -t {self.temp_dir} -j {cores} -m {memory}'
+
+    @property
+    def hashed(self):
+        return self.dedup == 'hash'
+
+    def deduplicate(self, destination):
+        if destination not in self.steps:
+            return self.dedup_snippet
+        return f'{self.dedup_snippet} -w {self.work_dir(destination, self.steps[destination][0])}'
+
+    def merge_hashed(self, destination, wordlists, compare=None):
+        # NOTE: Deduplicated by hash partitions, the compare set is only appended to (it needs no order either)
+        logs.logger.info(f'Merging: {destination}')
+        self.ensure_path(destination)
+        for wordlist in wordlists:
+            if wordlist.stat().st_size == 0:
+                raise Exception(f'Wordlist {wordlist} is empty, something is not right. Aborting')
+        self.delete(destination)
+        cmd = f'{self.deduplicate(destination)} -n {self.min_length} {" ".join(str(wordlist) for wordlist in wordlists)}'
+        if compare:
+            cmd += f' -c {compare}'
+        try:
+            self.run_shell(cmd + self.sink(destination), pipefail=True)
+        except Exception:
+            # NOTE: The buckets already deduplicated stay in the work directory (if any), the partial list goes away
+            self.drop(destination)
+            raise
+        if compare:
+            self.checkpoint(destination)
+            self.append_merged(destination, compare)
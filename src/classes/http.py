@@ -1,10 +1,21 @@
-from wordz import (
-    Combinator,
-    logs,
-)
+import pathlib
+import subprocess
+import sys
 
+from wordz import logs
 
-class FileExtensions(Combinator):
+# NOTE: `wordz` loads this file by its path, appended so that `http.py` does not shadow the standard library
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import lemmas  # noqa: E402
+import recipes  # noqa: E402
+import settings  # noqa: E402
+import shortnames  # noqa: E402
+import styles  # noqa: E402
+from builder import Builder  # noqa: E402
+
+
+class FileExtensions(Builder):
 
     def process(self):
         basic = self.base('wordlists/http/files/extensions/basic.txt')
@@ -16,7 +27,19 @@ class FileExtensions(Combinator):
         self.copy(self.temp('extensions-basic.txt'), basic)
 
 
-class HttpWords(Combinator):
+class GithubFileNames(Builder):
+
+    def process(self):
+        # NOTE: Short name (8.3) index of the BigQuery GitHub file names, queried with `src/classes/shortnames.py`
+        sources = shortnames.sources(self.base_dir)
+        index = self.output(shortnames.SOURCES)
+        logs.logger.info(f'Indexing {len(sources)} file name lists')
+        with self.measure('index', index.name, sources, index.with_suffix('.names')):
+            total = shortnames.build(sources, index)
+        logs.logger.info(f'{total:,} file names indexed: {index.with_suffix(".idx")}')
+
+
+class HttpWords(Builder):
 
     wordlists = (
         'src/keywords/http/paths/adj-adv-det-all.txt',
@@ -358,3 +381,101 @@ class HttpWordsSuffixesAll(HttpWordsSuffixes):
 class HttpWordsDoubleAll(HttpWordsDouble):
 
     group_name = 'all'
+
+
+class HttpWordsRender(HttpWords):
+
+    groups = ('basic', 'all')
+    pair_filter = settings.PAIR_FILTER
+    # NOTE: The structures of `HttpWordsPlain`, `HttpWordsObjects`, `HttpWordsSuffixes` and `HttpWordsDouble`
+    families = {
+        'plain': (
+            ('verbs',),
+            ('nouns',),
+            ('adj-adv-det',),
+            ('verbs', 'nouns'),
+            ('nouns', 'verbs'),
+            ('adj-adv-det', 'nouns'),
+            ('verbs', 'adj-adv-det'),
+            ('nouns', 'adj-adv-det'),
+        ),
+        'objects': (
+            ('nouns',),
+            ('nouns', 'nouns'),
+        ),
+        'suffixes': (
+            (('adj-adv-det', 'nouns'), 'suffixes'),
+        ),
+        'double': (
+            ('verbs', ('adj-adv-det', 'nouns')),
+        ),
+    }
+
+    def words(self, case, part, group):
+        name = f'{case}-paths-{part}.txt' if part == 'suffixes' else f'{case}-paths-{part}-{group}.txt'
+        path = self.resolve(self.temp(name))
+        if path.stat().st_size == 0:
+            raise Exception(f'Wordlist {path} is empty, something is not right. Aborting')
+        return [word for batch in recipes.read_batches(path) for word in batch]
+
+    def load_styles(self, group):
+        parts = ('verbs', 'nouns', 'adj-adv-det', 'suffixes')
+        cases = {case: {part: self.words(case, part, group) for part in parts} for case in ('lowercase', 'capitalize')}
+        index = lemmas.Index.load(self.base_dir) if self.pair_filter else None
+        rendered = list()
+        for name, (first, rest, separators) in styles.STYLES.items():
+            if separators:
+                separators = self.base(separators).read_bytes().splitlines()
+            rendered.append(styles.Style(name, cases[first], cases[rest], separators, index))
+        return rendered
+
+    def render(self, family, group, rendered, record):
+        # NOTE: One sort per style, fed side by side and sharing the cores and memory meant for a single one
+        sorter = self.sorter(len(rendered))
+        pipes = dict()
+        dropped = dict.fromkeys(rendered, 0)
+        try:
+            for style in rendered:
+                destination = self.output(f'wordlists/http/paths/{style.name}/{family}-{group}.txt')
+                logs.logger.info(f'Merging: {destination}')
+                self.ensure_path(destination)
+                self.delete(destination)
+                pipes[style] = subprocess.Popen(f'{sorter} | uniq > {destination}', shell=True, stdin=subprocess.PIPE)
+            for style, data, count in styles.render(rendered, self.families[family], int(self.min_length)):
+                pipes[style].stdin.write(data)
+                dropped[style] += count
+        finally:
+            for pipe in pipes.values():
+                pipe.stdin.close()
+            for pipe in pipes.values():
+                pipe.wait()
+        for style, pipe in pipes.items():
+            if pipe.returncode:
+                raise Exception(f'Sorting `{family}-{group}` ({style.name}) failed with exit code {pipe.returncode}. Aborting')
+        if self.pair_filter:
+            # NOTE: Counted before deduplication, i.e. the requests these candidates would have cost
+            record['removed_by_filter'] = dict()
+            for style, count in dropped.items():
+                logs.logger.info(f'Filtered {count:,} incompatible pairs out of `{style.name}/{family}-{group}.txt`')
+                record['removed_by_filter'][f'{style.name}/{family}-{group}.txt'] = count
+
+    def process(self):
+        if self.dry_run:
+            # NOTE: Nothing goes through `merge()` here, the plain classes give the same lists (without the pair filter)
+            logs.logger.warning(f'{type(self).__name__} is not estimated in a dry run, use HttpWordsPlain, HttpWordsObjects, HttpWordsSuffixes and HttpWordsDouble instead')
+            return
+        for group in self.groups:
+            rendered = self.load_styles(group)
+            for family in self.families:
+                with self.measure('render', f'{family}-{group}', (), self.output(f'wordlists/http/paths/*/{family}-{group}.txt')) as record:
+                    self.render(family, group, rendered, record)
+
+
+class HttpWordsRenderCommon(HttpWordsRender):
+
+    groups = ('basic',)
+
+
+class HttpWordsRenderAll(HttpWordsRender):
+
+    groups = ('all',)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import pathlib
+
+from wordz import logs
+
+
+# NOTE: A step is `started` before anything is written, merges are `merged` once their list is complete (the compare set
+# is still to be updated) and every step is `done` at last
+STARTED = 'started'
+MERGED = 'merged'
+DONE = 'done'
+
+
+def checksum(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fil:
+        for chunk in iter(lambda: fil.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stamp(path):
+    # NOTE: Size and modification time, what tells cheaply whether a file has been touched since
+    path = pathlib.Path(path)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Journal:
+
+    # NOTE: Records are appended (one write each, synced) by the build and by the processes of its parallel steps alike,
+    # so the entries are read again from where they were left before every lookup
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.entries = dict()
+        self.position = 0
+
+    def load(self):
+        with open(self.path, 'rb') as fil:
+            fil.seek(self.position)
+            for line in fil:
+                # NOTE: A record cut short by a crash is the last one, it is ignored (and its step considered incomplete)
+                if not line.endswith(b'\n'):
+                    break
+                self.position += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.entries[record['output']] = record
+
+    def get(self, output, key):
+        self.load()
+        record = self.entries.get(str(output))
+        if record is None or record['key'] != key:
+            return None
+        return record
+
+    def write(self, output, kind, key, state, **extra):
+        record = {'output': str(output), 'kind': kind, 'key': key, 'state': state, **extra}
+        if state in (MERGED, DONE) and pathlib.Path(output).is_file():
+            record['stamp'] = stamp(output)
+            record['checksum'] = checksum(output)
+        os.write(self.fd, (json.dumps(record) + '\n').encode())
+        os.fsync(self.fd)
+        self.entries[record['output']] = record
+        return record
+
+    def verify(self, record):
+        # NOTE: Untouched files are trusted as they are, the others have to match the checksum
+        output = pathlib.Path(record['output'])
+        if 'checksum' not in record or not output.is_file():
+            return False
+        if stamp(output) == record['stamp']:
+            return True
+        valid = checksum(output) == record['checksum']
+        if not valid:
+            logs.logger.warning(f'`{output}` does not match the build journal')
+        return valid
+
+    def done(self, output, key):
+        record = self.get(output, key)
+        return record is not None and record['state'] == DONE and self.verify(record)
+
+    def incomplete(self, output):
+        # NOTE: Left by a step that never finished (or changed since), whatever its inputs were
+        self.load()
+        record = self.entries.get(str(output))
+        return record is not None and not (record['state'] == DONE and self.verify(record))
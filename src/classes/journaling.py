@@ -0,0 +1,100 @@
+import hashlib
+import os
+import shutil
+
+from wordz import logs
+
+import exclusion
+import frames
+import journal
+import recipes
+import settings
+
+
+class Journaling:
+
+    # NOTE: Merges journaled in `journal.jsonl`, a killed build is resumed from the first merge not completed
+    journaling = settings.JOURNAL
+
+    def step_key(self, recipe):
+        return self.cache.key(recipe) if self.cache else self.expression(recipe)
+
+    def merge_key(self, destination, wordlists, compare=None):
+        # NOTE: Anything changing what a merge writes, a journal entry with another key is stale
+        parts = [str(self.stored(destination)), str(compare), self.dedup, self.compress, str(self.min_length), self.exclusion, str(self.policy)]
+        parts.extend(self.step_key(words) for words in wordlists)
+        return hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+
+    def compare_stamp(self, compare):
+        # NOTE: The exact index is only committed once the list is complete (and checkpointed), so it tells nothing
+        if not compare or self.exclusion == 'exact':
+            return None
+        return journal.stamp(exclusion.index_path(self.exclusion, compare) if self.exclusion else compare)
+
+    def merge_step(self, destination, wordlists, compare=None):
+        # NOTE: Without a journal every merge is done again, otherwise from the first one not completed by a previous run
+        if not self.journal:
+            return self.merge_now(destination, wordlists, compare)
+        output = self.stored(destination)
+        key = self.merge_key(destination, wordlists, compare)
+        record = self.journal.get(output, key)
+        state = record['state'] if record else None
+        if state == journal.DONE and self.journal.verify(record):
+            logs.logger.info(f'Skipping `{destination.name}`, merged by a previous run')
+            return
+        if record and compare and self.exclusion:
+            exclusion.rollback(self.exclusion, compare)
+        if state == journal.MERGED and self.journal.verify(record):
+            return self.complete(destination, compare, key, record['compare'])
+        if state in (journal.MERGED, journal.DONE) and compare:
+            raise Exception(f'`{output}` has changed since it was merged, `{compare}` cannot be updated with it again. Aborting')
+        if state == journal.STARTED and compare and self.compare_stamp(compare) != record['compare']:
+            # NOTE: The compare set is only touched once the list is complete, unless the Bloom filter was being updated
+            if self.exclusion == 'bloom':
+                raise Exception(
+                    f'`{destination.name}` cannot be resumed, `{exclusion.index_path(self.exclusion, compare)}` already holds part of it. Aborting'
+                )
+            return self.complete(destination, compare, key, record['compare'])
+        if not record:
+            shutil.rmtree(self.work_dir(destination, key), ignore_errors=True)
+        self.steps[destination] = (key, self.compare_stamp(compare))
+        self.journal.write(output, 'merge', key, journal.STARTED, compare=self.steps[destination][1])
+        self.merge_now(destination, wordlists, compare)
+        self.journal.write(output, 'merge', key, journal.DONE, compare=self.steps[destination][1])
+
+    def checkpoint(self, destination):
+        # NOTE: The list is complete, only the compare set is left to update
+        if self.journal and destination in self.steps:
+            key, compared = self.steps[destination]
+            self.journal.write(self.stored(destination), 'merge', key, journal.MERGED, compare=compared)
+
+    def complete(self, destination, compare, key, compared):
+        # NOTE: Adding a list to its compare set once more does no harm, or is undone first when only appended to
+        logs.logger.info(f'Resuming `{destination.name}`, the list is complete, updating `{compare.name}`')
+        if self.compress and destination.is_file():
+            self.pack(destination)
+        output = self.stored(destination)
+        if self.exclusion:
+            index = self.exclusion_index(compare)
+            for batch in frames.Reader(output).batches() if self.compress else recipes.read_batches(output):
+                for word in batch:
+                    index.add(word)
+            index.commit()
+        elif self.hashed:
+            if compare.is_file():
+                os.truncate(compare, compared[0] if compared else 0)
+            self.append_merged(destination, compare)
+        else:
+            # NOTE: `wordz` sorts the compare set to a temporary file, then replaces it
+            replaced = self.temp(compare.stem + '-sort-tmp-replace' + self.DEFAULT_EXT)
+            if not compare.is_file() and replaced.is_file():
+                self.move(replaced, compare)
+            words = '-' if self.compress else str(output)
+            cmd = f'{self.sort_snippet} -u -o {compare} {compare if compare.is_file() else ""} {words}'
+            self.run_shell(f'{self.frames_snippet} -d {output} | {cmd}' if self.compress else cmd, pipefail=True)
+        shutil.rmtree(self.work_dir(destination, key), ignore_errors=True)
+        self.journal.write(output, 'merge', key, journal.DONE, compare=compared)
+
+    def work_dir(self, destination, key):
+        # NOTE: Kept by the hash engine when interrupted, so the buckets already deduplicated are not done again
+        return self.temp(f'dedup-{destination.stem}-{key[:12]}')
@@ -0,0 +1,130 @@
+import argparse
+import pathlib
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+SOURCES = (
+    'src/keywords/http/paths/adj-adv-det-all.txt',
+    'src/keywords/http/paths/nouns-all.txt',
+    'src/keywords/http/paths/verbs-all.txt',
+    'src/keywords/http/paths/suffixes.txt',
+)
+LEMMAS = 'src/keywords/http/paths/lemmas.txt'
+INCOMPATIBLE = 'src/keywords/http/paths/incompatible.txt'
+STEM_MIN = 3
+# NOTE: Words which only look inflected (or mean something else than their stem)
+EXCEPTIONS = {
+    'advertising': 'advertising',
+    'booking': 'booking',
+    'encoding': 'encoding',
+    'heading': 'heading',
+    'https': 'https',
+    'listing': 'listing',
+    'logging': 'logging',
+    'mapping': 'mapping',
+    'monitoring': 'monitoring',
+    'news': 'news',
+    'rating': 'rating',
+    'ratings': 'rating',
+    'recording': 'recording',
+    'recordings': 'recording',
+    'setting': 'setting',
+    'settings': 'setting',
+    'staging': 'staging',
+    'string': 'string',
+    'terms': 'terms',
+    'tracking': 'tracking',
+    'windows': 'windows',
+}
+
+
+def candidates(word):
+    # NOTE: Regular inflections only (plurals, 3rd person, -ing and -ed forms), most specific first
+    if word.endswith('ies'):
+        yield word[:-3] + 'y'
+    if word.endswith(('ches', 'shes', 'sses', 'ses', 'xes', 'zes')):
+        yield word[:-2]
+    if word.endswith('s') and not word.endswith('ss'):
+        yield word[:-1]
+    if word.endswith('es'):
+        yield word[:-2]
+    if word.endswith('ing'):
+        yield word[:-3]
+        yield word[:-3] + 'e'
+        yield word[:-4]
+    if word.endswith('ied'):
+        yield word[:-3] + 'y'
+    if word.endswith('ed'):
+        yield word[:-2]
+        yield word[:-1]
+        yield word[:-3]
+
+
+def build(vocabulary):
+    # NOTE: A word is folded only into a base form found in the lists themselves, which keeps the guesses safe
+    lemmas = {word: lemma for word, lemma in EXCEPTIONS.items() if word in vocabulary and word != lemma}
+    for word in sorted(vocabulary - set(EXCEPTIONS)):
+        for candidate in candidates(word):
+            if len(candidate) >= STEM_MIN and candidate != word and candidate in vocabulary:
+                lemmas[word] = candidate
+                break
+    for word in lemmas:
+        while lemmas[word] in lemmas:
+            lemmas[word] = lemmas[lemmas[word]]
+    return lemmas
+
+
+def read_words(path):
+    return {line.strip().lower() for line in pathlib.Path(path).read_text().splitlines() if line.strip()}
+
+
+def read_pairs(path):
+    return [tuple(line.lower().split()) for line in pathlib.Path(path).read_text().splitlines() if len(line.split()) == 2]
+
+
+class Index:
+
+    def __init__(self, lemmas, incompatible):
+        self.lemmas = lemmas
+        self.conflicting = dict()
+        for left, right in incompatible:
+            left, right = self.lemma(left), self.lemma(right)
+            self.conflicting.setdefault(left, {left}).add(right)
+            self.conflicting.setdefault(right, {right}).add(left)
+
+    @classmethod
+    def load(cls, base_dir):
+        lemmas = dict(read_pairs(pathlib.Path(base_dir, LEMMAS)))
+        return cls(lemmas, read_pairs(pathlib.Path(base_dir, INCOMPATIBLE)))
+
+    def lemma(self, word):
+        word = word.lower()
+        return self.lemmas.get(word, word)
+
+    def conflicts(self, lemma):
+        # NOTE: A lemma always conflicts with itself, so self-pairs and singular/plural pairs are dropped
+        return self.conflicting.get(lemma, {lemma})
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='lemmas',
+        description='Build the lemma/plural index used to filter HTTP path pairs',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-o', '--output', default=LEMMAS, help='Index path, relative to the base directory')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    vocabulary = set().union(*(read_words(pathlib.Path(parsed.base_dir, source)) for source in SOURCES))
+    lemmas = build(vocabulary)
+    output = pathlib.Path(parsed.base_dir, parsed.output)
+    output.write_text(''.join(f'{word} {lemma}\n' for word, lemma in sorted(lemmas.items())))
+    print(f'{len(lemmas)} of {len(vocabulary)} words folded into their base forms: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import pathlib
+import sys
+
+
+# NOTE: Mirrors hashcat's RP_PASSWORD_SIZE, functions which would grow a word beyond it leave the word as it is
+SIZE = 256
+POSITIONS = b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def toggle(word, n):
+    if n >= len(word):
+        return word
+    return word[:n] + word[n:n + 1].swapcase() + word[n + 1:]
+
+
+def title(word, separator):
+    return separator.join(part[:1].upper() + part[1:] for part in word.lower().split(separator))
+
+
+# NOTE: Argument specs - `N` is a position (0-9, A-Z), `X` and `Y` are characters
+FUNCTIONS = {
+    ':': ('', lambda word: word),
+    'l': ('', lambda word: word.lower()),
+    'u': ('', lambda word: word.upper()),
+    'c': ('', lambda word: word.capitalize()),
+    'C': ('', lambda word: word[:1].lower() + word[1:].upper()),
+    't': ('', lambda word: word.swapcase()),
+    'T': ('N', toggle),
+    'r': ('', lambda word: word[::-1]),
+    'd': ('', lambda word: word if len(word) * 2 >= SIZE else word * 2),
+    'p': ('N', lambda word, n: word if len(word) * (n + 1) >= SIZE else word * (n + 1)),
+    'f': ('', lambda word: word if len(word) * 2 >= SIZE else word + word[::-1]),
+    '{': ('', lambda word: word[1:] + word[:1]),
+    '}': ('', lambda word: word[-1:] + word[:-1]),
+    '$': ('X', lambda word, x: word if len(word) + 1 >= SIZE else word + x),
+    '^': ('X', lambda word, x: word if len(word) + 1 >= SIZE else x + word),
+    '[': ('', lambda word: word[1:]),
+    ']': ('', lambda word: word[:-1]),
+    'D': ('N', lambda word, n: word if n >= len(word) else word[:n] + word[n + 1:]),
+    'x': ('NN', lambda word, n, m: word if n >= len(word) or n + m > len(word) else word[n:n + m]),
+    'O': ('NN', lambda word, n, m: word if n >= len(word) or n + m > len(word) else word[:n] + word[n + m:]),
+    'i': ('NX', lambda word, n, x: word if n > len(word) or len(word) + 1 >= SIZE else word[:n] + x + word[n:]),
+    'o': ('NX', lambda word, n, x: word if n >= len(word) else word[:n] + x + word[n + 1:]),
+    "'": ('N', lambda word, n: word if n >= len(word) else word[:n]),
+    's': ('XY', lambda word, x, y: word.replace(x, y)),
+    '@': ('X', lambda word, x: word.replace(x, b'')),
+    'z': ('N', lambda word, n: word if not word or len(word) + n >= SIZE else word[:1] * n + word),
+    'Z': ('N', lambda word, n: word if not word or len(word) + n >= SIZE else word + word[-1:] * n),
+    'q': ('', lambda word: word if len(word) * 2 >= SIZE else bytes(char for char in word for _ in range(2))),
+    'k': ('', lambda word: word if len(word) < 2 else word[1:2] + word[:1] + word[2:]),
+    'K': ('', lambda word: word if len(word) < 2 else word[:-2] + word[-1:] + word[-2:-1]),
+    'E': ('', lambda word: title(word, b' ')),
+    'e': ('X', title),
+}
+
+
+class Rule:
+
+    def __init__(self, text):
+        self.text = text
+        self.functions = list()
+        pos = 0
+        while pos < len(text):
+            name = chr(text[pos])
+            pos += 1
+            # NOTE: Spaces between the functions are ignored, just like hashcat does
+            if name == ' ':
+                continue
+            if name not in FUNCTIONS:
+                raise ValueError(f'Unsupported rule function `{name}` in `{self}`')
+            spec, function = FUNCTIONS[name]
+            args = list()
+            for kind in spec:
+                if pos >= len(text):
+                    raise ValueError(f'Missing arguments of `{name}` in `{self}`')
+                if kind == 'N':
+                    if text[pos] not in POSITIONS:
+                        raise ValueError(f'Invalid position `{chr(text[pos])}` in `{self}`')
+                    args.append(POSITIONS.index(text[pos]))
+                else:
+                    args.append(text[pos:pos + 1])
+                pos += 1
+            self.functions.append((function, args))
+
+    def __str__(self):
+        return self.text.decode(errors='replace')
+
+    def __call__(self, word):
+        for function, args in self.functions:
+            word = function(word, *args)
+        return word
+
+
+def load(path):
+    compiled = list()
+    with open(path, 'rb') as fil:
+        for line in fil:
+            line = line.rstrip(b'\r\n')
+            if line and not line.startswith(b'#'):
+                compiled.append(Rule(line))
+    return compiled
+
+
+def apply(compiled, batch):
+    # NOTE: Same order as `hashcat --stdout`, all rules for a word before moving to the next one
+    return [rule(word) for word in batch for rule in compiled]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='mangling',
+        description='Apply hashcat rules (`hashcat --stdout -r`) without hashcat',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('-r', '--rules', required=True, help='Rules file')
+    parser.add_argument('wordlist', nargs='?', help='Wordlist path, reads from stdin if omitted')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    compiled = load(pathlib.Path(parsed.rules))
+    source = open(parsed.wordlist, 'rb') if parsed.wordlist else sys.stdin.buffer
+    output = sys.stdout.buffer
+    with source:
+        while True:
+            lines = source.readlines(1 << 20)
+            if not lines:
+                break
+            output.write(b'\n'.join(apply(compiled, [line.rstrip(b'\r\n') for line in lines])) + b'\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import json
+
+from wordz import logs
+
+import recipes
+import settings
+
+
+class Manifests:
+
+    # NOTE: Each merge also exported as a `.recipe.json` manifest, expanded again by `expander.py`
+    manifest = settings.MANIFEST
+
+    def describe(self, recipe):
+        # NOTE: Lists referenced by name are described by the recipe writing them, so the manifest needs no temporary files
+        if isinstance(recipe, recipes.Wordlist):
+            if recipe.destination not in self.recipes:
+                return {'wordlist': self.relative(recipe.destination)}
+            recipe = self.recipes[recipe.destination]
+        if isinstance(recipe, recipes.Combination):
+            return {'combination': recipes.METHODS[recipe.method], 'left': self.describe(recipe.left), 'right': self.describe(recipe.right)}
+        return {'rules': self.relative(recipe.rule), 'wordlist': self.describe(recipe.wordlist)}
+
+    def manifest_of(self, destination, wordlists, compare=None):
+        return {
+            'class': type(self).__name__,
+            'output': self.relative(destination),
+            'min_length': int(self.min_length),
+            'compare': self.relative(compare) if compare else None,
+            'inputs': [self.describe(words) for words in wordlists],
+        }
+
+    def export(self, destination, wordlists, compare=None):
+        path = destination.with_suffix('.recipe.json')
+        logs.logger.info(f'Exporting recipe: {path}')
+        self.ensure_path(path)
+        path.write_text(json.dumps(self.manifest_of(destination, wordlists, compare), indent=2) + '\n')
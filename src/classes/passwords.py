@@ -1,12 +1,24 @@
-from wordz import (
-    Combinator,
-    logs,
-)
+import pathlib
+import sys
 
+from wordz import logs
 
-class Passwords(Combinator):
+# NOTE: `wordz` loads this file by its path, appended so that `http.py` does not shadow the standard library
+sys.path.append(str(pathlib.Path(__file__).parent))
+
+import budget  # noqa: E402
+import recipes  # noqa: E402
+import scheduler  # noqa: E402
+import settings  # noqa: E402
+from builder import Builder  # noqa: E402
+
+
+class Passwords(Builder):
 
     passwords_all = 'passwords-all.txt'
+    lang_dir = 'src/keywords/lang'
+    # NOTE: Either `all` or some of the languages (e.g. `de,pl`), the tiers then build every language on its own
+    languages = settings.LANGUAGES
     wordlists = (
         'wordlists/passwords/classics.txt',
         'wordlists/passwords/patterns.txt',
@@ -26,6 +38,63 @@ class Passwords(Combinator):
         'src/rules/simple.rule',
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.policy:
+            # NOTE: Lists built for a policy are only excluded against each other
+            self.passwords_all = f'passwords-all-{self.policy.slug}.txt'
+        # NOTE: The combined keywords get no rules of their own then, their lists are merged from the ones of every language.
+        # A dry run estimates these from the combined keywords, the same words either way
+        self.partitioned = bool(self.languages) and not self.dry_run and f'{self.lang_dir}/all.txt' in self.wordlists
+        if self.partitioned:
+            self.wordlists = tuple(wordlist for wordlist in self.wordlists if wordlist != f'{self.lang_dir}/all.txt')
+
+    def found_languages(self):
+        return sorted(path.stem for path in self.base(self.lang_dir).glob('*.txt') if path.stem != 'all')
+
+    def partition(self, language):
+        # NOTE: The lists of a single language, in a directory of their own (e.g. `tmp/lang/pl/simple-lang-pl.txt`), unless
+        # built anyway as one of the wordlists (e.g. `simple-lang-int-basic.txt`)
+        wordlist = f'{self.lang_dir}/{language}.txt'
+        directory = self.temp_dir if wordlist in self.wordlists else self.temp(f'lang/{language}')
+        directory.mkdir(parents=True, exist_ok=True)
+        keywords = self.wordlist(self.base(wordlist))
+        return {
+            pathlib.Path(rule).stem: self.register(recipes.Rules(keywords, self.base(rule), directory, self.bin_hashcat, self.builtin))
+            for rule in self.rules
+        }
+
+    def languages_process(self):
+        # NOTE: Every language gets the rules in a process of its own, then the lists of all of them are merged (`sort -m`)
+        # into the ones the combined keywords would give (e.g. `simple-lang-all.txt`), without sorting anything again
+        languages = self.found_languages()
+        jobs = self.jobs if self.jobs > 1 else max(1, int(self.cores))
+        logs.logger.info(f'Processing {len(languages)} languages with {jobs} jobs')
+        partitions = {language: self.partition(language) for language in languages}
+        graph = scheduler.Scheduler(jobs)
+        tasks = [
+            graph.add(f'lang-{language}', lambda parts=tuple(parts.values()): self.partition_process(parts, jobs))
+            for language, parts in partitions.items()
+        ]
+        for rule in self.rules:
+            stem = pathlib.Path(rule).stem
+            destination = self.temp(f'{stem}-lang-all.txt')
+            wordlists = [parts[stem].destination for parts in partitions.values()]
+            task = graph.add(destination.name, lambda args=(destination, wordlists): self.merge_sorted(*args))
+            task.dependencies.update(tasks)
+        graph.run()
+        if self.cleanup:
+            for parts in partitions.values():
+                for recipe in parts.values():
+                    if recipe.destination.parent != self.temp_dir:
+                        self.delete(recipe.destination)
+
+    def partition_process(self, partition, jobs):
+        # NOTE: The cores and memory of a single sort are shared by the languages built at the same time
+        self.sort_snippet = self.sorter(jobs)
+        for recipe in partition:
+            self.materialize(recipe)
+
     def setup(self):
         logs.logger.info('Preparing bits')
         for lst in ['extra', 'numbers']:
@@ -52,6 +121,8 @@ class Passwords(Combinator):
 
         # NOTE: Process keywords
         self.wordlists_process()
+        if self.partitioned:
+            self.languages_process()
 
         # NOTE: Prepare some lists beforehand
         separators = self.base('src/bits/separators.txt')
@@ -302,6 +373,62 @@ class BigPasswords(Passwords):
         )
 
 
+class BudgetPasswords(Passwords):
+
+    # NOTE: The merges of the tiers only nominate their expressions, the ones yielding the most per candidate
+    # (measured with `provenance.py -s`) that fit the budget are merged into a single list
+    tiers = (BasicPasswords, ExtendedPasswords)
+    budget_spec = settings.BUDGET
+    yields = settings.YIELDS
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.budget_spec:
+            raise Exception('Set the budget first (`BRUTAS_BUDGET`, e.g. `hours=1,rate=30G`). Aborting')
+        self.budget = budget.Budget.parse(self.budget_spec)
+        self.nominated = list()
+        # NOTE: Nothing is combined until the expressions are chosen, only the chosen ones are streamed into the merge
+        self.streaming = True
+
+    def merge(self, destination, wordlists, compare=None):
+        self.nominated.extend(self.wordlist(words) for words in wordlists if words is not None)
+
+    def missing(self, recipe):
+        if isinstance(recipe, recipes.Wordlist) and recipe.destination in self.recipes:
+            recipe = self.recipes[recipe.destination]
+        if recipe.destination.is_file():
+            return None
+        if isinstance(recipe, recipes.Wordlist):
+            return recipe.destination
+        return next((path for path in map(self.missing, recipe.inputs) if path), None)
+
+    def process(self):
+        for tier in self.tiers:
+            tier.process(self)
+        destination = self.output(f'wordlists/passwords/{self.budget.slug}.txt')
+        candidates = dict()
+        for words in self.nominated:
+            expression = self.expression(words)
+            missing = self.missing(words)
+            if missing:
+                logs.logger.warning(f'Skipping `{expression}`, `{missing.name}` does not exist')
+            elif expression not in candidates:
+                lines, characters = self.estimate(words)
+                candidates[expression] = budget.Candidate(expression, words, lines, lines + characters, len(candidates))
+        measured = budget.read_yields(path for path in self.yields.split(',') if path)
+        chosen, skipped = budget.select(list(candidates.values()), measured, self.budget)
+        if not chosen:
+            raise Exception(f'No expression fits the budget of {self.budget}. Aborting')
+        plan = destination.with_suffix('.budget.json')
+        self.ensure_path(plan)
+        budget.write_plan(plan, type(self).__name__, self.relative(destination), self.budget, chosen, skipped)
+        logs.logger.info(
+            f'Budget {self.budget}: {len(chosen)} of {len(candidates)} expressions chosen, '
+            f'~{sum(candidate.lines for candidate in chosen):,} candidates (plan: {plan})'
+        )
+        super().merge(destination, [candidate.recipe for candidate in chosen])
+
+
 class CustomPasswords(Passwords):
 
     wordlists = (
@@ -517,7 +644,48 @@ class OrganizationKeywordsPasswords(Passwords):
         )
 
 
-class MergeAll(Combinator):
+class LanguagePasswords(Passwords):
+
+    # NOTE: A standalone tier per language (`BRUTAS_LANGUAGES`, every country by default), e.g. `wordlists/passwords/lang/pl.txt`
+    # for an engagement in Poland, deduplicated on its own
+    wordlists = ()
+    rules = (
+        'src/rules/complex.rule',
+        'src/rules/hax0r.rule',
+        'src/rules/simple.rule',
+    )
+
+    def setup(self):
+        # NOTE: Only the keywords of the chosen languages are needed, none of the lists shared by the tiers
+        found = self.found_languages()
+        if self.languages in ('', 'all'):
+            # NOTE: The international keywords are part of the tiers already
+            self.chosen = [language for language in found if not language.startswith('int-')]
+            return
+        self.chosen = self.languages.split(',')
+        unknown = [language for language in self.chosen if language not in found]
+        if unknown:
+            raise Exception(f'Unknown languages: {", ".join(unknown)}, use some of: {", ".join(found)}. Aborting')
+
+    def process(self):
+        for language in self.chosen:
+            parts = self.partition(language)
+            self.merge(
+                self.output(f'wordlists/passwords/lang/{language}.txt'),
+                (
+                    self.right(parts['hax0r'], self.base('src/bits/extra-basic.txt')),
+                    self.right(parts['simple'], self.base('src/bits/extra-basic.txt')),
+                    self.right(parts['simple'], self.base('src/bits/months.txt')),
+                    self.right(parts['simple'], self.base('src/bits/numbers-basic.txt')),
+                    self.right(parts['simple'], self.base('src/bits/years-all.txt')),
+                    parts['complex'],
+                    parts['hax0r'],
+                    parts['simple'],
+                )
+            )
+
+
+class MergeAll(Builder):
 
     def process(self):
         self.concat(
@@ -0,0 +1,211 @@
+import argparse
+import collections
+import heapq
+import pathlib
+import re
+import sys
+
+import mangling
+import recipes
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+# NOTE: Static lists with the prior of their words, the tokens of the known hostnames get up to 1.0
+WORDS = (
+    ('src/keywords/dns/basic.txt', 0.5),
+    ('src/keywords/dns/extended.txt', 0.25),
+)
+RULES = 'src/rules/subdomains.rule'
+# NOTE: Rules adding a word (`-dev`, `.stg`) come before the word permutations, the ones adding a single character or a
+# number (`^e`, `$-$1`) after every one of these
+RULES_PRIOR = 0.9
+CHARACTERS_PRIOR = 0.1
+# NOTE: Put through every rule to tell what it adds
+PROBE = b'\0'
+# NOTE: How likely each kind of permutation is, relative to the others
+PATTERNS = {
+    'sibling': 1.0,
+    'token': 0.8,
+    'prepend': 0.6,
+    'join': 0.5,
+}
+NUMBERS = 3
+NUMBERS_PRIOR = 0.7
+SEPARATORS = re.compile(rb'([-_])')
+LETTERS = re.compile(rb'[a-z]+')
+DIGITS = re.compile(rb'\d+')
+LABEL = re.compile(rb'[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?')
+
+
+def read_hosts(path):
+    # NOTE: Deduplicated in the order of the file
+    hosts = dict()
+    for line in pathlib.Path(path).read_bytes().splitlines():
+        host = line.strip().lower().rstrip(b'.')
+        if host.startswith(b'*.'):
+            host = host[2:]
+        if host:
+            hosts[host] = None
+    return list(hosts)
+
+
+def apex(hosts):
+    # NOTE: The longest suffix shared by all hostnames, at least two labels long, which leaves a label of every hostname
+    # out when possible (a single hostname or hostnames of a single subdomain would be the domain themselves otherwise)
+    common = None
+    shortest = None
+    for host in hosts:
+        labels = host.split(b'.')[::-1]
+        shortest = len(labels) if shortest is None else min(shortest, len(labels))
+        if common is None:
+            common = labels
+        else:
+            size = 0
+            while size < min(len(common), len(labels)) and common[size] == labels[size]:
+                size += 1
+            common = common[:size]
+    if not common or len(common) < 2:
+        raise ValueError('Known hostnames do not share a domain, set it explicitly')
+    return b'.'.join(common[:max(min(len(common), shortest - 1), 2)][::-1])
+
+
+def rule_prior(rule):
+    added = rule(PROBE).replace(PROBE, b'', 1)
+    if sum(character.isalnum() for character in added.decode(errors='replace')) > 1 and not added.strip(b'-_.').isdigit():
+        return RULES_PRIOR
+    return CHARACTERS_PRIOR
+
+
+def tokens(label):
+    # NOTE: Parts between separators, as well as the runs of letters within these (`web01` gives `web`)
+    return set(SEPARATORS.split(label)[::2] + LETTERS.findall(label)) - {b''}
+
+
+class Target:
+
+    def __init__(self, hosts, domain=None):
+        self.domain = domain.lower().rstrip(b'.') if domain else apex(hosts)
+        suffix = b'.' + self.domain
+        self.known = set(hosts)
+        self.names = [host[:-len(suffix)].split(b'.') for host in hosts if host.endswith(suffix)]
+        if not self.names:
+            raise ValueError(f'None of the known hostnames is a subdomain of `{self.domain.decode()}`')
+        self.tokens = collections.Counter()
+        for labels in self.names:
+            self.tokens.update(set().union(*(tokens(label) for label in labels)))
+
+
+class Permutations:
+
+    def __init__(self, target, words, rules):
+        self.target = target
+        # NOTE: The rules of a kind keep their order in the file, decreasing from the prior of the kind
+        priors = [rule_prior(rule) * (1 - position / len(rules)) for position, rule in enumerate(rules)]
+        self.rules = sorted(zip(priors, rules), key=lambda item: -item[0])
+        # NOTE: Tokens seen on the target first, by how many hosts use them, then the static lists
+        self.words = dict()
+        most = max(target.tokens.values()) if target.tokens else 1
+        for token, count in sorted(target.tokens.items(), key=lambda item: (-item[1], item[0])):
+            self.words[token] = count / most
+        for batch, prior in words:
+            for word in batch:
+                self.words.setdefault(word, prior)
+        self.ranked = sorted(self.words.items(), key=lambda item: -item[1])
+
+    def sibling(self, word, labels):
+        yield [word] + labels[1:]
+
+    def token(self, word, labels):
+        # NOTE: Separators are kept, so `api-dev` gives `api-stg` and `stg-dev`
+        parts = SEPARATORS.split(labels[0])
+        if len(parts) > 1:
+            for position in range(0, len(parts), 2):
+                if parts[position] != word:
+                    yield [b''.join(parts[:position] + [word] + parts[position + 1:])] + labels[1:]
+
+    def prepend(self, word, labels):
+        yield [word] + labels
+
+    def join(self, word, labels):
+        if word != labels[0]:
+            yield [labels[0] + b'-' + word] + labels[1:]
+            yield [word + b'-' + labels[0]] + labels[1:]
+
+    def by_words(self, pattern):
+        weight = PATTERNS[pattern]
+        method = getattr(self, pattern)
+        for word, prior in self.ranked:
+            for labels in self.target.names:
+                for name in method(word, labels):
+                    yield -weight * prior, name
+
+    def by_rules(self):
+        for prior, rule in self.rules:
+            for labels in self.target.names:
+                yield -prior, rule(labels[0]).split(b'.') + labels[1:]
+
+    def by_numbers(self):
+        for distance in range(1, NUMBERS + 1):
+            prior = NUMBERS_PRIOR / distance
+            for labels in self.target.names:
+                for match in DIGITS.finditer(labels[0]):
+                    for number in (int(match.group()) - distance, int(match.group()) + distance):
+                        if number >= 0:
+                            label = labels[0][:match.start()] + str(number).zfill(len(match.group())).encode() + labels[0][match.end():]
+                            yield -prior, [label] + labels[1:]
+
+    def generate(self, limit=None, relative=False):
+        # NOTE: Every generator yields by a decreasing prior, so merging them streams the most likely names first
+        generators = [self.by_words(pattern) for pattern in PATTERNS] + [self.by_rules(), self.by_numbers()]
+        seen = set(self.target.known)
+        written = 0
+        for _, labels in heapq.merge(*generators, key=lambda item: item[0]):
+            if not all(LABEL.fullmatch(label) for label in labels):
+                continue
+            name = b'.'.join(labels + [self.target.domain])
+            if name in seen:
+                continue
+            seen.add(name)
+            yield name[:-len(self.target.domain) - 1] if relative else name
+            written += 1
+            if limit and written >= limit:
+                return
+
+
+def load(base_dir, target):
+    words = [([word.lower() for batch in recipes.read_batches(pathlib.Path(base_dir, path)) for word in batch], prior) for path, prior in WORDS]
+    return Permutations(target, words, mangling.load(pathlib.Path(base_dir, RULES)))
+
+
+def write(names, output):
+    # NOTE: Line by line through the buffer of the output, so a resolver reading from a pipe gets the first names right away
+    for name in names:
+        output.write(name + b'\n')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='permutations',
+        description='Write subdomain permutations of known hostnames to stdout, the most likely first',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('hosts', help='Known hostnames, one per line')
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-d', '--domain', help='Domain of the target, the longest one shared by the hostnames if omitted')
+    parser.add_argument('-l', '--limit', type=int, help='Maximal number of names to write')
+    parser.add_argument('-r', '--relative', action='store_true', help='Write the names without the domain')
+    return parser
+
+
+def main():
+    parser = get_parser()
+    parsed = parser.parse_args()
+    try:
+        target = Target(read_hosts(parsed.hosts), parsed.domain.encode() if parsed.domain else None)
+    except ValueError as e:
+        parser.error(str(e))
+    write(load(parsed.base_dir, target).generate(parsed.limit, parsed.relative), sys.stdout.buffer)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import mmap
+import os
+import pathlib
+import random
+import subprocess
+import time
+
+from wordz import logs
+
+import expander
+import mangling
+import provenance
+import recipes
+import report
+
+
+# NOTE: Expressions with more candidates than that are sampled (uniformly, by their numbers), the others enumerated
+SAMPLE = 20000
+# NOTE: Rule outputs up to that size are deduplicated in memory (like the build does), bigger ones are counted as they come
+MANGLED_MAX = 5000000
+# NOTE: Sampled words searched for in the other expressions, per expression
+PROBE = 2000
+
+
+class Sorted:
+
+    # NOTE: Membership by binary search over a sorted (`LC_ALL=C`) list mapped in place, as the provenance lookups do
+    def __init__(self, path):
+        self.words = b''
+        if os.path.getsize(path):
+            with open(path, 'rb') as fil:
+                self.words = mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, word):
+        return provenance.search(self.words, word) is not None
+
+
+class Mangled:
+
+    # NOTE: Rules applied lazily, candidate `i` is rule `i % len(rules)` applied to word `i // len(rules)`
+    def __init__(self, words, rules):
+        self.words = words
+        self.rules = rules
+        self.size = len(words) * len(rules)
+
+    def __len__(self):
+        return self.size
+
+    def iterate(self, start, stop):
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        radix = len(self.rules)
+        first = start // radix
+        position = first * radix
+        for word in self.words.iterate(first, (stop - 1) // radix + 1):
+            for rule in self.rules[max(start - position, 0):min(stop - position, radix)]:
+                yield None if word is None else rule(word)
+            position += radix
+
+
+class Keyspace(expander.Expander):
+
+    def __init__(self, base_dir):
+        super().__init__({'inputs': [], 'min_length': 0}, base_dir)
+
+    def node(self, item):
+        if 'rules' in item:
+            wordlist = self.node(item['wordlist'])
+            compiled = mangling.load(self.path(item['rules']))
+            if len(wordlist) * len(compiled) > MANGLED_MAX:
+                return Mangled(wordlist, compiled)
+        return super().node(item)
+
+
+def sample(node, generator, count=SAMPLE):
+    size = len(node)
+    if size <= count:
+        return list(node.iterate(0, size))
+    return [next(node.iterate(number, number + 1)) for number in sorted(generator.sample(range(size), count))]
+
+
+class Estimate:
+
+    def __init__(self, name):
+        self.name = name
+        self.raw = 0
+        self.raw_bytes = 0
+        self.kept = 0.0
+        self.kept_bytes = 0.0
+        self.distinct = 0
+        self.new = 0
+        self.size = 0
+        self.temp = 0
+        self.seconds = 0.0
+
+
+class Planner:
+
+    def __init__(self, base_dir, min_length, lookup=None):
+        self.keyspace = Keyspace(base_dir)
+        self.min_length = min_length
+        self.lookup = lookup
+        self.generator = random.Random(0)
+        self.sizes = dict()
+        self.matchers = dict()
+        self.compared = dict()
+        self.previous = dict()
+
+    def measure(self, item):
+        # NOTE: Candidates (exact), their bytes and the words that pass the length limits (scaled from the sample)
+        key = repr(item)
+        if key not in self.sizes:
+            node = self.keyspace.node(item)
+            words = sample(node, self.generator)
+            size = len(node)
+            scale = size / len(words) if words else 0
+            found = [word for word in words if word is not None]
+            kept = [word for word in found if len(word) >= self.min_length]
+            self.sizes[key] = (node, size, sum(len(word) + 1 for word in found) * scale, kept, scale)
+        return self.sizes[key]
+
+    def words(self):
+        return [word for _, _, _, kept, _ in self.sizes.values() for word in kept][:SAMPLE]
+
+    def matcher(self, node):
+        # NOTE: A membership test and the word lengths a node generates, only the splits matching these are tried.
+        # Rule outputs counted as they come are never searched, what these share with the rest goes unnoticed
+        if id(node) not in self.matchers:
+            if isinstance(node, expander.Lines):
+                words = set(node.words)
+                self.matchers[id(node)] = (words.__contains__, {len(word) for word in words})
+            elif isinstance(node, expander.Product):
+                heads, head_lengths = self.matcher(node.heads)
+                tails, tail_lengths = self.matcher(node.tails)
+                head_lengths = sorted(length for length in head_lengths if length <= recipes.LEN_MAX)
+                tail_lengths = {length for length in tail_lengths if length <= recipes.LEN_MAX}
+
+                def contains(word):
+                    return any(
+                        len(word) - split in tail_lengths and heads(word[:split]) and tails(word[split:])
+                        for split in head_lengths
+                    )
+
+                self.matchers[id(node)] = (contains, {head + tail for head in head_lengths for tail in tail_lengths})
+            else:
+                self.matchers[id(node)] = (lambda word: False, set())
+        return self.matchers[id(node)]
+
+    def contains(self, nodes, word):
+        for node in nodes:
+            contains, lengths = self.matcher(node)
+            if len(word) in lengths and contains(word):
+                return True
+        return False
+
+    def known(self, compare, words):
+        # NOTE: How many of the sampled words the compare set holds already, looked up in it (or in its exclusion index)
+        # when it can be searched, otherwise found in a single pass over it
+        if not pathlib.Path(compare).is_file():
+            return 0
+        if compare not in self.compared:
+            self.compared[compare] = self.lookup(compare) if self.lookup else None
+        found = self.compared[compare]
+        if found is None:
+            logs.logger.info(f'Searching `{compare}`')
+            probe = set(words)
+            found = set()
+            for batch in recipes.read_batches(compare):
+                found.update(probe.intersection(batch))
+        return sum(word in found for word in words)
+
+    def merge(self, name, items, compare=None):
+        # NOTE: A sampled word is a duplicate when an earlier expression (or merge into the same compare set) generates it too
+        estimate = Estimate(name)
+        nodes = list()
+        previous = self.previous.setdefault(compare, list()) if compare else list()
+        fresh = list()
+        for item in items:
+            node, size, size_bytes, kept, scale = self.measure(item)
+            estimate.raw += size
+            estimate.raw_bytes += size_bytes
+            estimate.kept += len(kept) * scale
+            estimate.kept_bytes += sum(len(word) + 1 for word in kept) * scale
+            probe = kept if len(kept) <= PROBE else self.generator.sample(kept, PROBE)
+            unique = [word for word in probe if not self.contains(nodes, word)]
+            new = [word for word in unique if not self.contains(previous, word)]
+            if probe:
+                estimate.distinct += len(kept) * scale * len(unique) / len(probe)
+                estimate.new += len(kept) * scale * len(new) / len(probe)
+            fresh.extend(new)
+            nodes.append(node)
+        previous.extend(nodes)
+        if compare and fresh:
+            estimate.new *= 1 - self.known(compare, fresh) / len(fresh)
+        average = estimate.kept_bytes / estimate.kept if estimate.kept else 0
+        estimate.distinct = int(estimate.distinct)
+        estimate.new = int(estimate.new)
+        estimate.size = int(estimate.new * average)
+        return estimate
+
+
+def calibrate(sort_snippet, temp_dir, words):
+    # NOTE: How fast candidates are generated and sorted here, timed on the sampled words
+    words = [word for word in words if word] or [b'password']
+    heads = words[:1000]
+    started = time.monotonic()
+    generated = sum(len(batch) for batch in recipes.combine([heads], words[:2000]))
+    generated_bytes = generated * (sum(len(word) for word in heads) / len(heads) + sum(len(word) for word in words[:2000]) / len(words[:2000]) + 1)
+    generation = generated_bytes / max(time.monotonic() - started, 1e-6)
+    path = pathlib.Path(temp_dir, 'calibration.txt')
+    data = b'\n'.join(words) + b'\n'
+    with open(path, 'wb') as fil:
+        for _ in range(max(1, (16 << 20) // len(data))):
+            fil.write(data)
+    started = time.monotonic()
+    subprocess.run(f'{sort_snippet} -u {path} > /dev/null', shell=True)
+    sorting = path.stat().st_size / max(time.monotonic() - started, 1e-6)
+    path.unlink()
+    return generation, sorting
+
+
+def summary(estimates, total_temp):
+    logs.logger.info(f'{"Merge":<48} {"Candidates":>16} {"Distinct":>16} {"New":>16} {"Out":>8} {"Temp":>8} {"Time":>10}')
+    for estimate in estimates:
+        logs.logger.info(
+            f'{estimate.name[-48:]:<48} {estimate.raw:>16,} {estimate.distinct:>16,} {estimate.new:>16,} '
+            f'{report.human(estimate.size):>8} {report.human(estimate.temp):>8} {duration(estimate.seconds):>10}'
+        )
+    logs.logger.info(
+        f'Projected output {report.human(sum(estimate.size for estimate in estimates))}B, peak temp {report.human(total_temp)}B, '
+        f'runtime {duration(sum(estimate.seconds for estimate in estimates))}'
+    )
+
+
+def duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f'{hours}:{rest // 60:02d}:{rest % 60:02d}'
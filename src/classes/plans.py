@@ -0,0 +1,73 @@
+import pathlib
+import shlex
+import shutil
+import stat
+
+from wordz import logs
+
+
+# NOTE: Hash type, hashes and any other options given to the plan script
+ARGUMENTS = '"$@"'
+
+
+class Plan:
+
+    # NOTE: Steps are recorded across the tiers (and classes) exported to the same directory, so each one runs once
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.registry = pathlib.Path(self.directory, 'steps.txt')
+        self.emitted = dict()
+        if self.registry.is_file():
+            for line in self.registry.read_text().splitlines():
+                script, command = line.split('\t', 1)
+                self.emitted[command] = script
+        self.exclude = pathlib.Path(self.directory, 'exclude.txt')
+
+    def name(self, path):
+        path = pathlib.Path(path)
+        return f'{path.parent.name}-{path.name}'
+
+    def add(self, path, kind='lists', name=None):
+        destination = pathlib.Path(self.directory, kind, name or self.name(path))
+        if not destination.is_file():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, destination)
+        return destination
+
+    def path(self, kind, name):
+        destination = pathlib.Path(self.directory, kind, name)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        return destination
+
+    def quote(self, arg):
+        if arg == ARGUMENTS:
+            return arg
+        if isinstance(arg, pathlib.Path):
+            arg = arg.relative_to(self.directory)
+        return shlex.quote(str(arg))
+
+    def write(self, tier, header, steps):
+        script = pathlib.Path(self.directory, pathlib.Path(tier).stem + '.sh')
+        # NOTE: hashcat exits with 1 once a step is exhausted, so the steps are not chained
+        lines = [
+            '#!/usr/bin/env bash',
+            f'# {header}',
+            f'# usage: {script.name} -m <hash type> <hashes> [hashcat options]',
+            'cd "$(dirname "$0")" || exit 1',
+        ]
+        added = list()
+        for args, candidates in steps:
+            command = ' '.join(self.quote(arg) for arg in args)
+            if command in self.emitted:
+                lines.append(f'# Already in {self.emitted[command]}: {command}')
+                continue
+            self.emitted[command] = script.name
+            added.append(f'{script.name}\t{command}')
+            lines.append(f'# {candidates:,} candidates')
+            lines.append(command)
+        script.write_text('\n'.join(lines) + '\n')
+        script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        with open(self.registry, 'a') as fil:
+            fil.writelines(line + '\n' for line in added)
+        logs.logger.info(f'Attack plan written: {script}')
@@ -0,0 +1,109 @@
+import collections
+import hashlib
+import re
+
+import recipes
+
+
+# NOTE: Character classes as bits of a mask, anything else than a letter or a digit is special
+CLASSES = {
+    'lower': (1, re.compile(rb'[a-z]')),
+    'upper': (2, re.compile(rb'[A-Z]')),
+    'digit': (4, re.compile(rb'[0-9]')),
+    'special': (8, re.compile(rb'[^a-zA-Z0-9]')),
+}
+
+
+class Policy:
+
+    def __init__(self, min_length=0, max_length=None, classes=0, required=(), banned=b''):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.classes = classes
+        self.required = 0
+        for name in required:
+            if name not in CLASSES:
+                raise Exception(f'Unknown character class `{name}`, use one of: {", ".join(CLASSES)}. Aborting')
+            self.required |= CLASSES[name][0]
+        self.banned = banned
+        self.banned_re = re.compile(b'[' + re.escape(banned) + b']') if banned else None
+        self.stats = collections.Counter()
+
+    @classmethod
+    def parse(cls, spec):
+        # NOTE: E.g. `length=8:64,classes=3,required=upper+digit,banned= :`, whatever follows `banned=` is taken as is
+        spec, _, banned = spec.partition('banned=')
+        options = dict()
+        for item in spec.split(','):
+            if item.strip():
+                key, _, value = item.strip().partition('=')
+                options[key] = value
+        unknown = set(options) - {'length', 'classes', 'required'}
+        if unknown:
+            raise Exception(f'Unknown policy option(s): {", ".join(sorted(unknown))}. Aborting')
+        low, _, high = options.get('length', '').partition(':')
+        required = [name for name in options.get('required', '').split('+') if name]
+        return cls(int(low or 0), int(high) if high else None, int(options.get('classes') or 0), required, banned.encode())
+
+    @property
+    def slug(self):
+        spec = f'{self.min_length}:{self.max_length}:{self.classes}:{self.required}:{self.banned.hex()}'
+        return 'policy-' + hashlib.md5(spec.encode()).hexdigest()[:8]
+
+    def __str__(self):
+        required = '+'.join(name for name, (bit, _) in CLASSES.items() if self.required & bit)
+        return f'length {self.min_length}-{self.max_length or "any"}, {self.classes} classes, required: {required or "none"}, banned: {self.banned!r}'
+
+    def mask(self, word):
+        mask = 0
+        for bit, pattern in CLASSES.values():
+            if pattern.search(word):
+                mask |= bit
+        return mask
+
+    def allowed(self, word):
+        return self.banned_re is None or not self.banned_re.search(word)
+
+    def fits(self, length, mask, final=True):
+        if self.max_length is not None and length > self.max_length:
+            return False
+        if not final:
+            return True
+        return length >= self.min_length and bin(mask).count('1') >= self.classes and mask & self.required == self.required
+
+    def check(self, word):
+        return self.allowed(word) and self.fits(len(word), self.mask(word))
+
+    def filter(self, batches):
+        for batch in batches:
+            selected = [word for word in batch if self.check(word)]
+            self.stats['filtered'] += len(batch) - len(selected)
+            self.stats['filtered_bytes'] += sum(len(word) + 1 for word in batch) - sum(len(word) + 1 for word in selected)
+            yield selected
+
+    def product(self, heads, tails, final=True):
+        # NOTE: Tails are grouped by length and character classes, a head is only combined with the groups that can
+        # satisfy the policy together with it, whatever else would be filtered out afterwards is never generated
+        buckets = collections.defaultdict(list)
+        for tail in tails:
+            if self.allowed(tail):
+                buckets[(len(tail), self.mask(tail))].append(tail)
+        total, total_size = len(tails), sum(len(tail) for tail in tails)
+        selections = dict()
+        for batch in heads:
+            for head in batch:
+                if len(head) > recipes.LEN_MAX:
+                    continue
+                if not self.allowed(head):
+                    selected, count, size = (), 0, 0
+                else:
+                    key = (len(head), self.mask(head))
+                    if key not in selections:
+                        groups = [words for (length, mask), words in buckets.items() if self.fits(key[0] + length, key[1] | mask, final)]
+                        selections[key] = (groups, sum(len(words) for words in groups), sum(len(word) for words in groups for word in words))
+                    selected, count, size = selections[key]
+                if final:
+                    self.stats['pruned'] += total - count
+                    self.stats['pruned_bytes'] += (total_size - size) + (total - count) * (len(head) + 1)
+                if count:
+                    yield [head + tail for words in selected for tail in words]
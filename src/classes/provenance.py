@@ -0,0 +1,205 @@
+import argparse
+import array
+import bisect
+import collections
+import mmap
+import os
+import pathlib
+import sys
+
+import recipes
+
+
+SUFFIX = '.provenance'
+# NOTE: Put between a candidate and the ID of its recipe while merging, passwords do not contain it
+SEPARATOR = '\x01'
+# NOTE: The last run marks the end of the list, it has no recipe
+END = '-'
+
+
+def path(destination):
+    return pathlib.Path(destination).with_suffix(SUFFIX)
+
+
+def write_header(index, expressions):
+    # NOTE: Recipes are listed as `#ID<TAB>expression`, the runs follow as `lines<TAB>bytes<TAB>ID`, both counted from the
+    # start of the previous run, which keeps the rows short (there is about a run per 6 lines of a merged tier)
+    with open(index, 'w') as fil:
+        for position, expression in enumerate(expressions):
+            fil.write(f'#{position}\t{expression}\n')
+
+
+def splitter(destination, index):
+    # NOTE: The merged (tagged) candidates are written without the tags, a run is recorded whenever the recipe changes
+    return (
+        f"awk -F'{SEPARATOR}' -v words={destination} -v runs={index} 'BEGIN {{ OFS = \"\\t\"; offset = 0; line = 0; start = 0 }} "
+        f"{{ print $1 > words; if (NR == 1 || $2 != id) {{ print NR - 1 - line, offset - start, $2 >> runs; line = NR - 1; start = offset; id = $2 }} "
+        f"offset += length($1) + 1 }} "
+        f"END {{ print NR - line, offset - start, \"{END}\" >> runs }}'"
+    )
+
+
+class Runs:
+
+    # NOTE: Kept in memory as absolute positions, packed, the IDs are shared
+    def __init__(self, expressions, lines=None, offsets=None, ids=None):
+        self.expressions = expressions
+        self.lines = lines or array.array('q')
+        self.offsets = offsets or array.array('q')
+        self.ids = ids or list()
+
+    @classmethod
+    def load(cls, index):
+        expressions = list()
+        lines, offsets, ids = array.array('q'), array.array('q'), list()
+        names = dict()
+        line, offset = 0, 0
+        with open(index) as fil:
+            for row in fil:
+                if row.startswith('#'):
+                    expressions.append(row.rstrip('\n').partition('\t')[2])
+                else:
+                    count, size, position = row.split()
+                    line += int(count)
+                    offset += int(size)
+                    lines.append(line)
+                    offsets.append(offset)
+                    ids.append(names.setdefault(position, position))
+        return cls(expressions, lines, offsets, ids)
+
+    def write(self, index):
+        write_header(index, self.expressions)
+        line, offset = 0, 0
+        with open(index, 'a') as fil:
+            for start, size, position in zip(self.lines, self.offsets, self.ids):
+                fil.write(f'{start - line}\t{size - offset}\t{position}\n')
+                line, offset = start, size
+
+    def add(self, line, offset, position):
+        if not self.ids or self.ids[-1] != position:
+            self.lines.append(line)
+            self.offsets.append(offset)
+            self.ids.append(position)
+
+    def expression(self, position):
+        return self.expressions[int(position)]
+
+    def sizes(self):
+        sizes = collections.Counter()
+        for start, stop, position in zip(self.lines, self.lines[1:], self.ids):
+            sizes[position] += stop - start
+        return sizes
+
+    def find(self, offset):
+        return self.ids[bisect.bisect_right(self.offsets, offset) - 1]
+
+
+class Remap:
+
+    # NOTE: Follows a list being filtered in place, the runs are recorded again for the lines that are kept
+    def __init__(self, runs):
+        self.runs = runs
+        self.result = Runs(runs.expressions)
+        self.run = 0
+        self.line = 0
+        self.kept = 0
+        self.offset = 0
+
+    def add(self, words, kept):
+        for word, keep in zip(words, kept):
+            while self.runs.lines[self.run + 1] <= self.line:
+                self.run += 1
+            self.line += 1
+            if keep:
+                self.result.add(self.kept, self.offset, self.runs.ids[self.run])
+                self.kept += 1
+                self.offset += len(word) + 1
+
+    def finish(self):
+        self.result.lines.append(self.kept)
+        self.result.offsets.append(self.offset)
+        self.result.ids.append(END)
+        return self.result
+
+
+def search(words, word):
+    # NOTE: Binary search over the lines of a sorted (`LC_ALL=C`) list, the offset of the word if found
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high) // 2
+        start = words.rfind(b'\n', 0, middle) + 1
+        stop = words.find(b'\n', start)
+        if stop < 0:
+            stop = len(words)
+        if words[start:stop] < word:
+            low = stop + 1
+        else:
+            high = start
+    stop = words.find(b'\n', low)
+    if low < len(words) and words[low:stop if stop >= 0 else len(words)] == word:
+        return low
+    return None
+
+
+class Index:
+
+    def __init__(self, wordlist):
+        self.runs = Runs.load(path(wordlist))
+        self.words = b''
+        if os.path.getsize(wordlist):
+            with open(wordlist, 'rb') as fil:
+                self.words = mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def lookup(self, word):
+        offset = search(self.words, word)
+        if offset is None:
+            return None
+        return self.runs.find(offset)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='provenance',
+        description='Attribute cracked passwords to the recipes of a merged list (built with `BRUTAS_PROVENANCE=1`)',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('wordlist', help='Merged list, e.g. `wordlists/passwords/5-l.txt` (its `.provenance` index is read too)')
+    parser.add_argument('passwords', help='Cracked passwords, one per line')
+    parser.add_argument('-s', '--summary', action='store_true', help='Print the yield of every recipe only')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    try:
+        report(parsed)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # NOTE: The reader is gone (e.g. `| head`), nothing is left to write the rest of the output to
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def report(parsed):
+    index = Index(parsed.wordlist)
+    hits = collections.Counter()
+    with open(parsed.passwords, 'rb') as fil:
+        for line in fil:
+            word = line.rstrip(b'\r\n')
+            position = index.lookup(word)
+            if position is None:
+                continue
+            hits[position] += 1
+            if not parsed.summary:
+                sys.stdout.buffer.write(recipes.hexify(word) + f'\t{index.runs.expression(position)}\n'.encode())
+    if parsed.summary:
+        print('hits\tlines\thits per 1M\trecipe')
+        sizes = index.runs.sizes()
+        for position, count in sorted(sizes.items(), key=lambda item: (-hits[item[0]], -item[1])):
+            per_million = hits[position] / count * 1000000 if count else 0.0
+            print(f'{hits[position]}\t{count}\t{per_million:.1f}\t{index.runs.expression(position)}')
+
+
+if __name__ == '__main__':
+    main()
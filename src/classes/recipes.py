@@ -0,0 +1,194 @@
+import pathlib
+import subprocess
+import threading
+import uuid
+
+import mangling
+
+
+DEFAULT_EXT = '.txt'
+BATCH_SIZE = 1 << 20
+# NOTE: The same limit as in hashcat-utils `combinator`, longer words are skipped
+LEN_MAX = 32
+
+LEFT = 1
+BOTH = 2
+RIGHT = 3
+METHODS = {LEFT: 'left', BOTH: 'both', RIGHT: 'right'}
+
+
+def read_batches(path):
+    with open(path, 'rb') as fil:
+        while True:
+            lines = fil.readlines(BATCH_SIZE)
+            if not lines:
+                break
+            yield [line.rstrip(b'\r\n') for line in lines]
+
+
+def count(path):
+    # NOTE: The last line counts even without a line break, as it is read
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as fil:
+        for chunk in iter(lambda: fil.read(BATCH_SIZE), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    return lines + (last != b'\n')
+
+
+def terminated(path):
+    with open(path, 'rb') as fil:
+        fil.seek(-1, 2)
+        return fil.read(1) == b'\n'
+
+
+def hexify(word):
+    # NOTE: Printable UTF-8 as it is, anything else (or what would be taken for it) as `$HEX[...]` like hashcat does
+    try:
+        printable = word.decode().isprintable() and not word.startswith(b'$HEX[')
+    except UnicodeDecodeError:
+        printable = False
+    return word if printable else b'$HEX[' + word.hex().encode() + b']'
+
+
+def product(heads, tails, policy=None, final=True):
+    tails = [tail for batch in tails for tail in batch if len(tail) <= LEN_MAX]
+    if policy is not None:
+        return policy.product(heads, tails, final)
+    return combine(heads, tails)
+
+
+def combine(heads, tails):
+    for batch in heads:
+        for head in batch:
+            if len(head) <= LEN_MAX:
+                yield [head + tail for tail in tails]
+
+
+def select(batches, policy=None):
+    if policy is None:
+        return batches
+    return policy.filter(batches)
+
+
+class Recipe:
+
+    def __init__(self, destination):
+        self.destination = pathlib.Path(destination)
+
+    def __fspath__(self):
+        return str(self.destination)
+
+    def __str__(self):
+        return str(self.destination)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.destination.name})'
+
+    @property
+    def name(self):
+        return self.destination.name
+
+    @property
+    def stem(self):
+        return self.destination.stem
+
+    @property
+    def parts(self):
+        return self.destination.parts
+
+    @property
+    def inputs(self):
+        return ()
+
+    def batches(self, policy=None):
+        # NOTE: Anything that was already written (e.g. by a previous run) is read back instead of being generated again
+        if self.destination.is_file():
+            return select(read_batches(self.destination), policy)
+        return self.generate(policy)
+
+    def generate(self, policy=None):
+        raise NotImplementedError
+
+
+class Wordlist(Recipe):
+
+    def __init__(self, destination, resolve):
+        super().__init__(destination)
+        self.resolve = resolve
+
+    def batches(self, policy=None):
+        return select(read_batches(self.resolve(self.destination)), policy)
+
+
+class Combination(Recipe):
+
+    def __init__(self, method, left, right, temp_dir):
+        if method == RIGHT:
+            name = f'{left.stem}+{right.stem}'
+        elif method == LEFT:
+            name = f'{right.stem}+{left.stem}'
+        elif method == BOTH:
+            name = f'{right.stem}+{left.stem}+{right.stem}'
+        else:
+            raise NotImplementedError
+        super().__init__(pathlib.Path(temp_dir, name + DEFAULT_EXT))
+        self.method = method
+        self.left = left
+        self.right = right
+
+    @property
+    def inputs(self):
+        return (self.left, self.right)
+
+    def generate(self, policy=None):
+        # NOTE: A policy is enforced while combining, the inner part of `both` can only be bound by the maximal length
+        if self.method == RIGHT:
+            return product(self.left.batches(), self.right.batches(), policy)
+        elif self.method == LEFT:
+            return product(self.right.batches(), self.left.batches(), policy)
+        return product(product(self.right.batches(), self.left.batches(), policy, final=False), self.right.batches(), policy)
+
+
+class Rules(Recipe):
+
+    def __init__(self, wordlist, rule, temp_dir, bin_hashcat, builtin=False):
+        super().__init__(pathlib.Path(temp_dir, f'{rule.stem}-{wordlist.parts[-2]}-{wordlist.stem}{DEFAULT_EXT}'))
+        self.wordlist = wordlist
+        self.rule = rule
+        self.bin_hashcat = bin_hashcat
+        self.builtin = builtin
+
+    @property
+    def inputs(self):
+        return (self.wordlist,)
+
+    def feed(self, stream):
+        try:
+            for batch in self.wordlist.batches():
+                if batch:
+                    stream.write(b'\n'.join(batch) + b'\n')
+        finally:
+            stream.close()
+
+    def generate(self, policy=None):
+        if self.builtin:
+            return select(self.mangle(), policy)
+        return select(self.pipe(), policy)
+
+    def mangle(self):
+        compiled = mangling.load(self.rule)
+        for batch in self.wordlist.batches():
+            yield mangling.apply(compiled, batch)
+
+    def pipe(self):
+        cmd = (self.bin_hashcat, '--stdout', f'--session={uuid.uuid4()}', '-r', str(self.rule))
+        with subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE) as process:
+            feeder = threading.Thread(target=self.feed, args=(process.stdin,), daemon=True)
+            feeder.start()
+            while True:
+                lines = process.stdout.readlines(BATCH_SIZE)
+                if not lines:
+                    break
+                yield [line.rstrip(b'\r\n') for line in lines]
+            feeder.join()
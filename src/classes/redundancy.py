@@ -0,0 +1,111 @@
+import argparse
+import collections
+import csv
+import pathlib
+
+import mangling
+import recipes
+
+
+def outputs(compiled, wordlists):
+    # NOTE: Hashes instead of the words themselves, only set operations are needed here
+    produced = [set() for _ in compiled]
+    for wordlist in wordlists:
+        for batch in recipes.read_batches(wordlist):
+            for number, rule in enumerate(compiled):
+                produced[number].update(hash(rule(word)) for word in batch)
+    return produced
+
+
+def prune(produced):
+    # NOTE: Drop the smallest rules first as long as everything they produce is still produced by another rule kept
+    counts = collections.Counter()
+    for words in produced:
+        counts.update(words)
+    kept = set(range(len(produced)))
+    for number in sorted(kept, key=lambda number: len(produced[number])):
+        if all(counts[word] > 1 for word in produced[number]):
+            kept.remove(number)
+            counts.subtract(produced[number])
+    return kept
+
+
+def analyze(compiled, produced):
+    counts = collections.Counter()
+    for words in produced:
+        counts.update(words)
+    rows = list()
+    for number, words in enumerate(produced):
+        subsumed_by = [
+            str(compiled[other]) for other, others in enumerate(produced)
+            if other != number and len(others) >= len(words) and words <= others
+        ]
+        rows.append({
+            'rule': str(compiled[number]),
+            'distinct': len(words),
+            'unique': sum(1 for word in words if counts[word] == 1),
+            'subsumed_by': subsumed_by,
+        })
+    return rows, len(counts)
+
+
+def write_matrix(path, compiled, produced):
+    with open(path, 'w', newline='') as fil:
+        writer = csv.writer(fil)
+        writer.writerow([''] + [str(rule) for rule in compiled])
+        for number, words in enumerate(produced):
+            writer.writerow([str(compiled[number])] + [len(words & others) for others in produced])
+
+
+def write_pruned(path, source, compiled, kept):
+    kept_rules = {compiled[number].text for number in kept}
+    with open(source, 'rb') as fil, open(path, 'wb') as output:
+        for line in fil:
+            rule = line.rstrip(b'\r\n')
+            if not rule or rule.startswith(b'#') or rule in kept_rules:
+                output.write(line)
+                kept_rules.discard(rule)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='redundancy',
+        description='Report rules producing the same candidates on the given wordlists and optionally prune them',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('-r', '--rules', required=True, help='Rules file')
+    parser.add_argument('-w', '--wordlist', required=True, action='append', help='Wordlist the rules are applied to, may be repeated')
+    parser.add_argument('-m', '--matrix', help='Write the overlap matrix (CSV) to the given path')
+    parser.add_argument('-p', '--prune', help='Write the rules file without redundant rules to the given path')
+    parser.add_argument('--top', type=int, default=20, help='Number of the least productive rules to show')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    compiled = mangling.load(pathlib.Path(parsed.rules))
+    produced = outputs(compiled, [pathlib.Path(path) for path in parsed.wordlist])
+    rows, total = analyze(compiled, produced)
+    generated = sum(len(words) for words in produced)
+    print(f'Rules: {len(compiled)}, candidates (distinct per rule): {generated:,}, distinct overall: {total:,}')
+    print(f'Duplicate work: {generated - total:,} ({(generated - total) / max(generated, 1):.2%})')
+    print()
+    print(f'{"Rule":<40} {"Distinct":>10} {"Unique":>10}  Subsumed by')
+    for row in sorted(rows, key=lambda row: (row['unique'], row['distinct']))[:parsed.top]:
+        print(f'{row["rule"]:<40} {row["distinct"]:>10,} {row["unique"]:>10,}  {", ".join(row["subsumed_by"][:3])}')
+    subsumed = [row for row in rows if row['subsumed_by']]
+    print()
+    print(f'Rules fully subsumed by another single rule: {len(subsumed)}')
+    if parsed.matrix:
+        write_matrix(parsed.matrix, compiled, produced)
+        print(f'Overlap matrix written to `{parsed.matrix}`')
+    kept = prune(produced)
+    work = sum(len(produced[number]) for number in kept)
+    print(f'Irredundant subset: {len(kept)} of {len(compiled)} rules, {work:,} candidates for the same {total:,} distinct ones')
+    if parsed.prune:
+        write_pruned(parsed.prune, parsed.rules, compiled, kept)
+        print(f'Pruned rules written to `{parsed.prune}`')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import contextlib
+import datetime
+import glob
+import json
+import os
+import pathlib
+import resource
+import time
+
+from wordz import logs
+
+import frames
+import recipes
+
+
+def usage(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def cpu():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss():
+    # NOTE: High-water mark of this process and the commands it has waited for, in bytes (Linux reports kilobytes)
+    return 1024 * max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def human(size):
+    for unit in ('', 'K', 'M', 'G', 'T'):
+        if abs(size) < 1024:
+            break
+        size /= 1024
+    return f'{size:.1f}{unit}'
+
+
+class Report:
+
+    # NOTE: Steps are appended to a JSON lines file as they finish, so the ones run by forked jobs are collected too
+    def __init__(self, directory, name, temp_dir, counts=False):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.temp_dir = temp_dir
+        # NOTE: Reading every list and walking the temporary directory after each step is opt-in, only the lines of the merged
+        # lists are counted otherwise
+        self.counts = counts
+        self.started = datetime.datetime.now()
+        self.path = pathlib.Path(self.directory, f'{name}-{self.started:%Y%m%d-%H%M%S}.json')
+        self.journal = self.path.with_suffix('.jsonl')
+        self.lines = dict()
+        self.stack = list()
+
+    def count(self, path):
+        stat = path.stat()
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in self.lines:
+            # NOTE: Compressed lists are counted by their index
+            self.lines[key] = len(frames.Reader(path)) if frames.indexed(path) else recipes.count(path)
+        return self.lines[key], stat.st_size
+
+    def measure(self, paths, lines=True):
+        counted, size = 0, 0
+        for path in paths:
+            for name in glob.glob(str(path)):
+                name = pathlib.Path(name)
+                if name.is_file():
+                    if lines:
+                        counted += self.count(name)[0]
+                    size += name.stat().st_size
+        return counted if lines else None, size
+
+    @contextlib.contextmanager
+    def step(self, kind, name, inputs=(), output=None):
+        record = {
+            'kind': kind,
+            'name': str(name),
+            'depth': len(self.stack),
+            'pid': os.getpid(),
+            'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        record['lines_in'], record['bytes_in'] = self.measure(inputs, self.counts)
+        self.stack.append(record)
+        wall, used = time.monotonic(), cpu()
+        try:
+            yield record
+        finally:
+            self.stack.pop()
+        record['wall'] = round(time.monotonic() - wall, 3)
+        record['cpu'] = round(cpu() - used, 3)
+        record['lines_out'], record['bytes_out'] = self.measure([output] if output else (), self.counts or kind == 'merge')
+        record['peak_rss'] = peak_rss()
+        record['temp'] = usage(self.temp_dir) if self.counts else None
+        with open(self.journal, 'a') as fil:
+            fil.write(json.dumps(record) + '\n')
+
+    def write(self):
+        steps = list()
+        if self.journal.is_file():
+            steps = [json.loads(line) for line in self.journal.read_text().splitlines()]
+        top = [step for step in steps if step['depth'] == 0]
+        finished = datetime.datetime.now()
+        report = {
+            'class': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': finished.isoformat(timespec='seconds'),
+            'wall': round((finished - self.started).total_seconds(), 3),
+            'cpu': round(sum(step['cpu'] for step in top), 3),
+            'peak_rss': max([step['peak_rss'] for step in steps] or [0]),
+            'peak_temp': max([step['temp'] for step in steps if step['temp'] is not None], default=None),
+            'steps': steps,
+        }
+        for key in ('policy_pruned', 'policy_filtered', 'policy_saved_bytes', 'policy_saved_seconds'):
+            values = [step[key] for step in steps if key in step]
+            if values:
+                report[key] = round(sum(values), 3)
+        self.path.write_text(json.dumps(report, indent=2) + '\n')
+        self.journal.unlink(missing_ok=True)
+        self.summary(report, top)
+        logs.logger.info(f'Build report written: {self.path}')
+
+    def summary(self, report, top, limit=20):
+        logs.logger.info(f'{"Step":<8} {"Name":<56} {"Wall":>10} {"CPU":>10} {"Lines out":>14} {"Out":>8} {"Temp":>8} {"Excluded":>12}')
+        for step in sorted(top, key=lambda step: step['wall'], reverse=True)[:limit]:
+            excluded, lines, temp = step.get('removed_by_compare'), step['lines_out'], step['temp']
+            logs.logger.info(
+                f'{step["kind"]:<8} {step["name"][-56:]:<56} {step["wall"]:>10.1f} {step["cpu"]:>10.1f} {"-" if lines is None else f"{lines:,}":>14} '
+                f'{human(step["bytes_out"]):>8} {"-" if temp is None else human(temp):>8} {"-" if excluded is None else f"{excluded:,}":>12}'
+            )
+        peak_temp = '-' if report['peak_temp'] is None else human(report['peak_temp'])
+        logs.logger.info(f'{len(top)} steps, {report["wall"]:.1f}s wall, {report["cpu"]:.1f}s CPU, peak RSS {human(report["peak_rss"])}, peak temp {peak_temp}')
+        if 'policy_saved_bytes' in report:
+            logs.logger.info(f'Password policy saved {human(report["policy_saved_bytes"])}B and ~{report["policy_saved_seconds"]:.1f}s, {report["policy_pruned"]:,} candidates never generated')
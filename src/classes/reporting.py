@@ -0,0 +1,32 @@
+import contextlib
+import pathlib
+
+import settings
+
+
+class Reporting:
+
+    # NOTE: Every step timed and measured into a JSON build report, including the ones `wordz` does by itself
+    report_dir = settings.REPORT
+    report_counts = settings.REPORT_COUNTS
+
+    def sort(self, source, output=None, unique=False):
+        with self.measure('sort', pathlib.Path(source).name, [source], output or source):
+            super().sort(source, output, unique)
+
+    def compare(self, left, right, output, append=False):
+        with self.measure('compare', pathlib.Path(output).name, [left, right], output):
+            super().compare(left, right, output, append)
+
+    def concat(self, destination, wordlists):
+        with self.measure('concat', pathlib.Path(destination).name, wordlists, destination):
+            super().concat(destination, wordlists)
+
+    def diff(self, path, list_prefix, left='basic', right='extended', output='all'):
+        with self.measure('diff', f'{path}/{list_prefix}'):
+            super().diff(path, list_prefix, left, right, output)
+
+    def measure(self, kind, name, inputs=(), output=None):
+        if not self.report:
+            return contextlib.nullcontext(dict())
+        return self.report.step(kind, name, inputs, output)
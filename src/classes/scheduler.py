@@ -0,0 +1,112 @@
+import contextlib
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+
+from wordz import logs
+
+
+def work(action):
+    # NOTE: A process group of its own, so the commands it runs (e.g. `sort`) are stopped along with it, and stopped as
+    # an exception, so the pipelines streamed into (in sessions of their own) are killed on the way out too
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(-signal.SIGTERM))
+    action()
+
+
+def stop(worker):
+    try:
+        os.killpg(worker.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        worker.terminate()
+
+
+class Task:
+
+    def __init__(self, name, action):
+        self.name = name
+        self.action = action
+        self.dependencies = set()
+        # NOTE: The dependencies whose outputs this task reads, as opposed to the ones only ordering it
+        self.reads = set()
+
+    def __repr__(self):
+        return f'Task({self.name})'
+
+
+class Scheduler:
+
+    def __init__(self, jobs, budget=0, usage=None, finished=None):
+        self.jobs = jobs
+        self.budget = budget
+        self.usage = usage
+        self.finished = finished
+        self.tasks = list()
+        # NOTE: Forked workers inherit the builder as is, nothing has to be pickled
+        self.context = multiprocessing.get_context('fork')
+
+    def add(self, name, action):
+        task = Task(name, action)
+        self.tasks.append(task)
+        return task
+
+    def ordered(self, roots):
+        # NOTE: Depth-first from the given tasks, so whatever a task needs is done right before it and not all at once
+        position = {task: number for number, task in enumerate(self.tasks)}
+        ordered = list()
+        visited = set()
+
+        def visit(task):
+            if task in visited:
+                return
+            visited.add(task)
+            for dependency in sorted(task.dependencies, key=position.get):
+                visit(dependency)
+            ordered.append(task)
+
+        for task in list(roots) + self.tasks:
+            visit(task)
+        return ordered
+
+    def over_budget(self, running):
+        # NOTE: A soft limit, the steps are not sized beforehand, so one running on its own is never held back
+        if not self.budget or not running:
+            return False
+        return self.usage() >= self.budget
+
+    def run(self, roots=()):
+        pending = self.ordered(roots)
+        running = dict()
+        done = set()
+        while pending or running:
+            if pending and not running and self.budget and self.usage() >= self.budget:
+                logs.logger.warning(f'Temporary files exceed the budget of {self.budget} bytes, continuing with a single job')
+            for task in list(pending):
+                if len(running) >= self.jobs or self.over_budget(running):
+                    break
+                if task.dependencies <= done:
+                    pending.remove(task)
+                    logs.logger.info(f'Starting `{task.name}` ({len(running) + 1}/{self.jobs} jobs)')
+                    worker = self.context.Process(target=work, args=(task.action,), name=task.name)
+                    worker.start()
+                    # NOTE: Set on both sides, so the group exists whichever of these runs first
+                    with contextlib.suppress(OSError):
+                        os.setpgid(worker.pid, worker.pid)
+                    running[worker.sentinel] = (task, worker)
+            if not running:
+                raise Exception(f'Unresolvable dependencies: {", ".join(task.name for task in pending)}. Aborting')
+            for sentinel in multiprocessing.connection.wait(list(running)):
+                task, worker = running.pop(sentinel)
+                worker.join()
+                if worker.exitcode:
+                    for _, other in running.values():
+                        stop(other)
+                    for _, other in running.values():
+                        other.join()
+                    raise Exception(f'Task `{task.name}` failed with exit code {worker.exitcode}. Aborting')
+                logs.logger.info(f'Finished `{task.name}`')
+                done.add(task)
+                if self.finished:
+                    self.finished(task)
@@ -0,0 +1,75 @@
+from wordz import logs
+
+import recipes
+import report
+import scheduler
+import settings
+
+
+class Scheduling:
+
+    jobs = settings.JOBS
+    cleanup = settings.CLEANUP
+    max_temp = settings.MAX_TEMP
+    # NOTE: Temporary files kept even when no longer needed by the class (compare sets are always kept)
+    protected = ()
+
+    def requires(self, recipe, tasks):
+        # NOTE: The tasks writing the files a recipe reads, either directly or through the recipes streamed inline
+        if isinstance(recipe, recipes.Wordlist) or recipe.destination in tasks:
+            task = tasks.get(recipe.destination)
+            return {task} if task else set()
+        return set().union(*(self.requires(item, tasks) for item in recipe.inputs))
+
+    def execute(self):
+        logs.logger.info(f'Scheduling {len(self.merges)} merges with {self.jobs} jobs')
+        graph = scheduler.Scheduler(self.jobs, self.max_temp, lambda: report.usage(self.temp_dir), self.release)
+        tasks = dict()
+        written = self.written()
+        for recipe in written:
+            tasks[recipe.destination] = graph.add(recipe.name, lambda recipe=recipe: self.materialize(recipe))
+        for recipe in written:
+            for item in recipe.inputs:
+                tasks[recipe.destination].reads |= self.requires(item, tasks)
+        compared = dict()
+        merges = list()
+        for destination, wordlists, compare in self.merges:
+            task = graph.add(destination.name, lambda args=(destination, wordlists, compare): self.merge_step(*args))
+            for words in wordlists:
+                task.reads |= self.requires(words, tasks)
+            # NOTE: Each merge excludes whatever the previous ones have appended to the same compare set
+            if compare:
+                if compare in compared:
+                    task.dependencies.add(compared[compare])
+                compared[compare] = task
+            tasks[destination] = task
+            merges.append(task)
+        for task in graph.tasks:
+            task.dependencies |= task.reads
+        self.track(tasks, {compare for _, _, compare in self.merges if compare})
+        graph.run(merges)
+
+    def track(self, tasks, compared):
+        # NOTE: Count the readers of every temporary file written here, these go away once the last one is done
+        self.outputs = {task: destination for destination, task in tasks.items()}
+        self.keep = set(compared) | {self.temp(name) for name in self.protected}
+        self.readers = dict.fromkeys(tasks.values(), 0)
+        for task in tasks.values():
+            for dependency in task.reads:
+                self.readers[dependency] += 1
+
+    def release(self, task):
+        if not self.cleanup:
+            return
+        for dependency in task.reads:
+            self.readers[dependency] -= 1
+            if not self.readers[dependency]:
+                self.discard(self.outputs[dependency])
+        if not self.readers[task]:
+            self.discard(self.outputs[task])
+
+    def discard(self, path):
+        if path in self.keep or path.parent != self.temp_dir:
+            return
+        logs.logger.info(f'Removing `{path.name}`, no longer needed')
+        self.delete(path)
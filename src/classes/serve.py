@@ -0,0 +1,254 @@
+import argparse
+import pathlib
+import socketserver
+import sys
+import tempfile
+import time
+import urllib.parse
+
+# NOTE: Run as a script, `http.py` next to this file (the HTTP wordlists) would shadow the standard library package
+CLASSES_DIR = pathlib.Path(__file__).resolve().parent
+sys.path = [path for path in sys.path if pathlib.Path(path or '.').resolve() != CLASSES_DIR]
+import http.server  # noqa: E402
+sys.path.insert(0, str(CLASSES_DIR))
+
+import exclusion  # noqa: E402
+import expander  # noqa: E402
+import frames  # noqa: E402
+import passwords  # noqa: E402
+import recipes  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+CLASSES = (
+    'OrganizationNamePasswords',
+    'OrganizationKeywordsPasswords',
+)
+# NOTE: Candidates written to a client at once
+BATCH_WORDS = 1 << 16
+
+
+class Recorder:
+
+    # NOTE: Mixed into a class to record its merges as a dry run does, nothing is run so no binaries are needed
+    dry_run = True
+
+    def check_which(self, name):
+        return
+
+
+def templates(name, base_dir, min_length):
+    # NOTE: The merge of a class as a recipe manifest, along with its keyword lists (replaced by those of every request)
+    cls = getattr(passwords, name, None)
+    if cls is None:
+        raise Exception(f'Class not found: `{name}`. Aborting')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        builder = type(name, (Recorder, cls), {})(base_dir, temp_dir, temp_dir, min_length, 1, '1%', 'hashcat', 'combinator.bin', 'rli2.bin')
+        builder.wordlists_process()
+        builder.process()
+        merges = [builder.manifest_of(*merge) for merge in builder.merges]
+    if len(merges) != 1:
+        raise Exception(f'Class `{name}` merges {len(merges)} lists, only the classes merging a single one can be served. Aborting')
+    return tuple(builder.wordlists or ()), merges[0]
+
+
+def uses(item, names):
+    # NOTE: Whether an expression reads any of the given lists
+    if 'rules' in item:
+        return uses(item['wordlist'], names)
+    if 'wordlist' in item:
+        return item['wordlist'] in names
+    return uses(item['left'], names) or uses(item['right'], names)
+
+
+def load_excluded(path):
+    # NOTE: An exact exclusion index (e.g. `tmp/passwords-all.exact`) is mapped as it is, a list is read into a set
+    path = pathlib.Path(path)
+    if path.is_dir():
+        index = exclusion.ExactIndex(path)
+        for number in range(1 << index.SHARD_BITS):
+            index.shard(number)
+        return index
+    path = frames.find(path)
+    if frames.indexed(path):
+        return {word for batch in frames.Reader(path).batches() for word in batch}
+    if not path.is_file():
+        raise Exception(f'Path {path} does not exist. Aborting')
+    return {word for batch in recipes.read_batches(path) for word in batch}
+
+
+class Components(expander.Expander):
+
+    # NOTE: The bits, compiled rules and whatever does not depend on the keywords, loaded once and only read by the requests
+    def __init__(self, base_dir, keywords):
+        self.keywords = set(keywords)
+        self.compiled = dict()
+        super().__init__({'inputs': [], 'min_length': 0}, base_dir)
+
+    def rules(self, name):
+        if name not in self.compiled:
+            self.compiled[name] = super().rules(name)
+        return self.compiled[name]
+
+    def preload(self, item):
+        if not uses(item, self.keywords):
+            self.node(item)
+        elif 'rules' in item:
+            self.rules(item['rules'])
+            self.preload(item['wordlist'])
+        elif 'combination' in item:
+            self.preload(item['left'])
+            self.preload(item['right'])
+
+
+class Session(expander.Expander):
+
+    # NOTE: A single request, only the expressions reading its keywords are generated, the rest comes from the components
+    def __init__(self, manifest, components, keywords):
+        self.components = components
+        self.keywords = expander.Lines(keywords)
+        super().__init__(manifest, components.base_dir)
+
+    def rules(self, name):
+        return self.components.rules(name)
+
+    def load(self, name):
+        if name in self.components.keywords:
+            return self.keywords
+        return self.components.load(name)
+
+    def node(self, item):
+        if uses(item, self.components.keywords):
+            return super().node(item)
+        return self.components.node(item)
+
+
+class Service:
+
+    def __init__(self, names, base_dir, min_length, excluded=()):
+        self.templates = dict()
+        keywords = set()
+        for name in names:
+            lists, self.templates[name] = templates(name, base_dir, min_length)
+            keywords.update(lists)
+        self.components = Components(base_dir, keywords)
+        for manifest in self.templates.values():
+            for item in manifest['inputs']:
+                self.components.preload(item)
+        self.excluded = [load_excluded(path) for path in excluded]
+
+    def generate(self, name, keywords, min_length=None):
+        manifest = self.templates[name]
+        if min_length is not None:
+            manifest = dict(manifest, min_length=min_length)
+        session = Session(manifest, self.components, keywords)
+        words = set(session.candidates(0, len(session)))
+        for excluded in self.excluded:
+            words = {word for word in words if word not in excluded}
+        # NOTE: Same order as the lists merged with `sort -u` (`LC_ALL=C`)
+        return sorted(words)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    # NOTE: `GET /` lists the classes, `GET /<class>?keyword=...` (repeated) or `POST /<class>` with a keyword per line
+    # returns the list, `min_length` may be given in the query string of both
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/':
+            self.write_words(200, [name.encode() for name in self.server.service.templates])
+            return
+        keywords = urllib.parse.parse_qs(url.query, encoding='latin-1').get('keyword', [])
+        self.respond(url, [keyword.encode('latin-1') for keyword in keywords])
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self.send_error(411)
+            return
+        self.respond(url, self.rfile.read(int(length)).splitlines())
+
+    def respond(self, url, keywords):
+        started = time.monotonic()
+        name = url.path.strip('/')
+        if name not in self.server.service.templates:
+            self.send_error(404, f'Unknown class `{name}`')
+            return
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            min_length = int(query['min_length'][0]) if 'min_length' in query else None
+        except ValueError:
+            self.send_error(400, 'Invalid `min_length`')
+            return
+        keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        if not keywords:
+            self.send_error(400, 'No keywords given')
+            return
+        words = self.server.service.generate(name, keywords, min_length)
+        if self.write_words(200, words):
+            self.log_message('%s: %d keywords, %d candidates in %.1f ms', name, len(keywords), len(words), (time.monotonic() - started) * 1000)
+
+    def write_words(self, code, words):
+        self.send_response(code)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(sum(len(word) + 1 for word in words)))
+        self.end_headers()
+        try:
+            for start in range(0, len(words), BATCH_WORDS):
+                self.wfile.write(b'\n'.join(words[start:start + BATCH_WORDS]) + b'\n')
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+        return True
+
+    def log_message(self, format, *args):
+        # NOTE: Clients of a Unix socket have no address
+        print(f'[{self.log_date_time_string()}] {format % args}', file=sys.stderr)
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='serve',
+        description='Serve per-target password lists over HTTP, generated in memory from the keywords of every request',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('-c', '--class', dest='classes', action='append', help=f'Class to serve, may be repeated [Default: {", ".join(CLASSES)}]')
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-n', '--min-length', type=int, default=4, help='Minimal length for a password (unless given in a request)')
+    parser.add_argument('-x', '--exclude', action='append', default=[], help='Leave out the words of this list or exact exclusion index (e.g. `tmp/passwords-all.exact`), may be repeated')
+    parser.add_argument('-s', '--socket', help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('-H', '--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('-p', '--port', type=int, default=8000, help='Port to listen on')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    started = time.monotonic()
+    service = Service(parsed.classes or CLASSES, pathlib.Path(parsed.base_dir).absolute(), parsed.min_length, parsed.exclude)
+    print(f'Loaded {", ".join(service.templates)} in {time.monotonic() - started:.1f}s', file=sys.stderr)
+    if parsed.socket:
+        pathlib.Path(parsed.socket).unlink(missing_ok=True)
+        server = UnixServer(parsed.socket, Handler)
+        print(f'Serving on {parsed.socket}', file=sys.stderr)
+    else:
+        server = http.server.ThreadingHTTPServer((parsed.host, parsed.port), Handler)
+        print(f'Serving on http://{parsed.host}:{parsed.port}', file=sys.stderr)
+    server.service = service
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if parsed.socket:
+            pathlib.Path(parsed.socket).unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import os
+
+
+# NOTE: `wordz` has a fixed set of CLI options, so the build scripts pass the extra ones through the environment
+PREFIX = 'BRUTAS_'
+
+
+def get(name, default=None):
+    return os.environ.get(PREFIX + name, default)
+
+
+def flag(name, default=False):
+    value = get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'on', 'true', 'yes')
+
+
+def size(value):
+    value = str(value).strip().upper().rstrip('B')
+    units = 'KMGT'
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * 1024 ** (units.index(value[-1]) + 1))
+    return int(float(value or 0))
+
+
+STREAMING = flag('STREAMING')
+RULES = get('RULES', 'hashcat')
+CACHE = flag('CACHE')
+JOBS = int(get('JOBS', 1))
+EXCLUSION = get('EXCLUSION', '')
+DEDUP = get('DEDUP', 'sort')
+COMPRESS = get('COMPRESS', '')
+EXCLUSION_CAPACITY = int(float(get('EXCLUSION_CAPACITY', 1e9)))
+EXCLUSION_ERROR = float(get('EXCLUSION_ERROR', 0.01))
+MANIFEST = flag('MANIFEST')
+PLAN = get('PLAN', '')
+REPORT = get('REPORT', '')
+REPORT_COUNTS = flag('REPORT_COUNTS')
+MAX_TEMP = size(get('MAX_TEMP', 0))
+POLICY = get('POLICY', '')
+CLEANUP = flag('CLEANUP') or MAX_TEMP > 0
+PAIR_FILTER = flag('PAIR_FILTER')
+TARGETS = get('TARGETS', '')
+DOMAIN = get('DOMAIN', '')
+PERMUTATIONS = int(get('PERMUTATIONS', 0))
+PROVENANCE = flag('PROVENANCE')
+BUDGET = get('BUDGET', '')
+YIELDS = get('YIELDS', '')
+DRY_RUN = flag('DRY_RUN')
+JOURNAL = flag('JOURNAL')
+LANGUAGES = get('LANGUAGES', '')
@@ -0,0 +1,215 @@
+import argparse
+import bisect
+import collections
+import csv
+import mmap
+import pathlib
+import re
+import struct
+import sys
+
+
+BASE_DIR = pathlib.Path(__file__).parents[2]
+SOURCES = 'wordlists/http/files/bigquery/github'
+EXTENSIONS = (
+    'wordlists/http/files/extensions/basic.txt',
+    'wordlists/http/files/extensions/extended.txt',
+)
+PREFIX_LEN = 6
+EXT_LEN = 3
+KEY_LEN = PREFIX_LEN + EXT_LEN
+# NOTE: Short name prefix and extension (NUL padded), offset of the full name and its number of occurrences
+RECORD = struct.Struct(f'>{PREFIX_LEN}s{EXT_LEN}sII')
+# NOTE: Spaces and dots are dropped, anything not allowed in 8.3 names becomes an underscore
+TABLE = str.maketrans({' ': None, '.': None, **dict.fromkeys('+,;=[]', '_')})
+NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def clean(part):
+    part = part.upper().translate(TABLE)
+    return part if part.isascii() else NON_ASCII.sub('_', part)
+
+
+def short_name(name):
+    base, dot, ext = name.rpartition('.')
+    if not dot:
+        base, ext = name, ''
+    elif not clean(base):
+        base, ext = ext, ''
+    return clean(base)[:PREFIX_LEN], clean(ext)[:EXT_LEN]
+
+
+def read_csv(path):
+    # NOTE: `count,filename` rows, names with commas are quoted
+    with open(path, newline='', encoding='utf-8', errors='replace') as fil:
+        for row in csv.reader(fil):
+            if len(row) == 2 and row[0].isdigit() and row[1] and '\n' not in row[1] and '\r' not in row[1]:
+                yield int(row[0]), row[1]
+
+
+def read_counts(paths):
+    counts = collections.Counter()
+    for path in paths:
+        for count, name in read_csv(path):
+            counts[name] += count
+    return counts
+
+
+def sources(base_dir):
+    return sorted(pathlib.Path(base_dir, SOURCES).glob('*.csv'))
+
+
+def key(prefix, ext):
+    return prefix.encode().ljust(PREFIX_LEN, b'\0') + ext.encode().ljust(EXT_LEN, b'\0')
+
+
+def build(paths, destination):
+    counts = read_counts(paths)
+    entries = sorted((key(*short_name(name)), -count, name) for name, count in counts.items())
+    destination = pathlib.Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    offset = 0
+    with open(destination.with_suffix('.idx'), 'wb') as records, open(destination.with_suffix('.names'), 'wb') as names:
+        for entry, count, name in entries:
+            name = name.encode()
+            records.write(RECORD.pack(entry[:PREFIX_LEN], entry[PREFIX_LEN:], offset, -count))
+            names.write(name + b'\n')
+            offset += len(name) + 1
+    return len(entries)
+
+
+def parse(query):
+    # NOTE: `TEXTFI~1.ZIP` matches the prefix exactly, `TEXT*` and `TEXTFI~1.Z*` match anything starting with it
+    base, dot, ext = query.upper().rpartition('.')
+    if not dot:
+        base, ext = ext, None
+    exact = '~' in base
+    prefix = base.split('~')[0].rstrip('*')
+    if ext is not None:
+        ext = ext.rstrip('?')
+        if ext.endswith('*'):
+            return prefix, exact, ext[:-1], False
+    return prefix, exact, ext, ext is not None
+
+
+class Keys:
+
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records) // RECORD.size
+
+    def __getitem__(self, position):
+        start = position * RECORD.size
+        return self.records[start:start + KEY_LEN]
+
+
+class Index:
+
+    # NOTE: Both files are mapped, a lookup is a binary search over the fixed size records
+    def __init__(self, path):
+        path = pathlib.Path(path)
+        with open(path.with_suffix('.idx'), 'rb') as records, open(path.with_suffix('.names'), 'rb') as names:
+            self.records = mmap.mmap(records.fileno(), 0, access=mmap.ACCESS_READ)
+            self.names = mmap.mmap(names.fileno(), 0, access=mmap.ACCESS_READ)
+        self.keys = Keys(self.records)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def span(self, prefix, exact, ext, exact_ext):
+        prefix = prefix.encode()
+        if exact:
+            prefix = prefix.ljust(PREFIX_LEN, b'\0')
+            if ext is not None:
+                prefix += ext.encode().ljust(EXT_LEN, b'\0') if exact_ext else ext.encode()
+        return bisect.bisect_left(self.keys, prefix), bisect.bisect_left(self.keys, prefix + b'\xff')
+
+    def lookup(self, query, limit=None):
+        prefix, exact, ext, exact_ext = parse(query)
+        wanted = None if ext is None else ext.encode()
+        if wanted is not None and exact_ext:
+            wanted = wanted.ljust(EXT_LEN, b'\0')
+        found = list()
+        start, stop = self.span(prefix, exact, ext, exact_ext)
+        for position in range(start, stop):
+            _, found_ext, offset, count = RECORD.unpack_from(self.records, position * RECORD.size)
+            if wanted is None or found_ext.startswith(wanted):
+                found.append((count, self.names[offset:self.names.find(b'\n', offset)].decode()))
+        found.sort(key=lambda item: -item[0])
+        return found[:limit] if limit else found
+
+
+def discovery(counts, extensions, top=None):
+    # NOTE: Names ranked by the occurrences of their stem, each with its own extensions first, then the given ones
+    stems = collections.Counter()
+    own = collections.defaultdict(collections.Counter)
+    for name, count in counts.items():
+        stem, dot, ext = name.rpartition('.')
+        if not dot or not stem:
+            stem, ext = name, None
+        stems[stem] += count
+        if ext is not None:
+            own[stem]['.' + ext] += count
+    for stem, _ in stems.most_common(top):
+        seen = set()
+        for ext in [ext for ext, _ in own[stem].most_common()] + extensions:
+            if ext not in seen:
+                seen.add(ext)
+                yield stem + ext
+
+
+def read_extensions(paths):
+    extensions = list()
+    for path in paths:
+        for line in pathlib.Path(path).read_text().splitlines():
+            line = line.strip()
+            if line and line not in extensions:
+                extensions.append(line)
+    return extensions
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='shortnames',
+        description='Look up IIS short names (8.3, e.g. `TEXTFI~1.ZIP`) in the BigQuery GitHub file names',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('-b', '--base-dir', default=BASE_DIR, help='Base directory path')
+    parser.add_argument('-i', '--index', default=SOURCES, help='Index path (without the `.idx`/`.names` suffixes), relative to the base directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help='Build the index from the CSV files')
+    query = commands.add_parser('query', help='Print the full names matching short names, most frequent first')
+    query.add_argument('names', nargs='+', help='Short names, e.g. `TEXTFI~1.ZIP`, `TEXT*` or `TEXTFI~1.Z*`')
+    query.add_argument('-l', '--limit', type=int, help='Maximal number of names per short name')
+    query.add_argument('-c', '--counts', action='store_true', help='Print the number of occurrences too')
+    ranked = commands.add_parser('discovery', help='Write a ranked file discovery list, names combined with extensions')
+    ranked.add_argument('-e', '--extensions', nargs='*', default=EXTENSIONS, help='Extension lists, relative to the base directory')
+    ranked.add_argument('-t', '--top', type=int, help='Number of most frequent names')
+    ranked.add_argument('-o', '--output', help='Output path, stdout if omitted')
+    return parser
+
+
+def main():
+    parsed = get_parser().parse_args()
+    path = pathlib.Path(parsed.base_dir, parsed.index)
+    if parsed.command == 'build':
+        total = build(sources(parsed.base_dir), path)
+        print(f'{total} names indexed: {path.with_suffix(".idx")}')
+    elif parsed.command == 'query':
+        index = Index(path)
+        for name in parsed.names:
+            for count, found in index.lookup(name, parsed.limit):
+                print(f'{count}\t{found}' if parsed.counts else found)
+    else:
+        extensions = read_extensions(pathlib.Path(parsed.base_dir, extension) for extension in parsed.extensions)
+        counts = read_counts(sources(parsed.base_dir))
+        output = open(parsed.output, 'w') if parsed.output else sys.stdout
+        with output:
+            for name in discovery(counts, extensions, parsed.top):
+                output.write(name + '\n')
+
+
+if __name__ == '__main__':
+    main()
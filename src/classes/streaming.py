@@ -0,0 +1,135 @@
+import contextlib
+import os
+import signal
+import subprocess
+
+from wordz import logs
+
+import dedup
+import provenance
+import recipes
+import report
+import settings
+
+
+class Streaming:
+
+    # NOTE: Merges fed with the candidates generated in memory, the lists only merged are never written
+    streaming = settings.STREAMING
+
+    def saved(self, destination, record, elapsed):
+        stats = self.policy.stats
+        # NOTE: What generating everything and filtering afterwards would have cost, at the pace of this merge
+        generated = record['lines_in'] + stats['filtered']
+        record['policy_pruned'] = stats['pruned']
+        record['policy_filtered'] = stats['filtered']
+        record['policy_saved_bytes'] = stats['pruned_bytes'] + stats['filtered_bytes']
+        record['policy_saved_seconds'] = round(elapsed * stats['pruned'] / generated, 3) if generated else 0.0
+        logs.logger.info(
+            f'Policy saved {report.human(record["policy_saved_bytes"])}B and ~{record["policy_saved_seconds"]:.1f}s on `{destination.name}`: '
+            f'{stats["pruned"]:,} candidates never generated, {stats["filtered"]:,} filtered out'
+        )
+
+    def merge_streaming(self, destination, wordlists, compare=None):
+        logs.logger.info(f'Merging: {destination}')
+        self.ensure_path(destination)
+        # NOTE: The same artifact is often listed both as an expression and by its name, stream it only once
+        unique = dict()
+        for words in wordlists:
+            self.refresh(words)
+            if words.destination.is_file() and words.destination.stat().st_size == 0:
+                raise Exception(f'Wordlist {words} is empty, something is not right. Aborting')
+            listed = unique.get(words.destination)
+            if listed is None or isinstance(listed, recipes.Wordlist):
+                unique[words.destination] = words
+        self.delete(destination)
+        if self.provenance:
+            # NOTE: Of the candidates generated more than once the first one is kept (a stable sort), so is its recipe
+            index = provenance.path(destination)
+            provenance.write_header(index, [self.expression(words) for words in unique.values()])
+            cmd = f"{self.sort_snippet} -s -t '{provenance.SEPARATOR}' -k1,1 -u"
+            if compare:
+                cmd += f" | join -t '{provenance.SEPARATOR}' -v 1 - {compare}"
+            cmd += f' | {provenance.splitter(destination, index)}'
+        elif self.hashed:
+            cmd = self.deduplicate(destination)
+            if compare:
+                cmd += f' -c {compare}'
+            cmd += self.sink(destination)
+        else:
+            cmd = f'{self.sort_snippet} -u'
+            if compare:
+                cmd += f' | {self.comm_ver} -23 - {compare}'
+            cmd += self.sink(destination)
+        try:
+            if self.hashed and destination in self.steps and dedup.partitioned(self.work_dir(destination, self.steps[destination][0])):
+                # NOTE: Nothing is streamed again, so nothing is counted either
+                logs.logger.info(f'Resuming `{destination.name}` from the candidates partitioned by a previous run')
+                self.run_shell(f'{cmd} < /dev/null', pipefail=True)
+                streamed = (0, 0)
+            else:
+                streamed = self.stream(unique.values(), cmd, policy=self.policy, tagged=self.provenance)
+        except Exception:
+            self.drop(destination)
+            raise
+        if compare:
+            self.checkpoint(destination)
+            self.append_merged(destination, compare)
+            if not self.hashed:
+                self.sort(compare)
+        return streamed
+
+    def stream(self, wordlists, cmd, min_length=None, policy=None, tagged=False):
+        # NOTE: Tagged candidates carry the position of their wordlist, the sizes are counted without the tags
+        if min_length is None:
+            min_length = int(self.min_length)
+        logs.logger.debug(f' $ {cmd}')
+        lines, size = 0, 0
+        # NOTE: A session of its own, so the whole pipeline can be killed and not only the shell running it
+        with subprocess.Popen(['bash', '-o', 'pipefail', '-c', cmd], stdin=subprocess.PIPE, start_new_session=True) as process:
+            try:
+                for position, words in enumerate(wordlists):
+                    logs.logger.info(f'Streaming `{words.name}`')
+                    end = f'{provenance.SEPARATOR}{position}\n'.encode() if tagged else b'\n'
+                    for batch in words.batches(policy):
+                        batch = [word for word in batch if len(word) >= min_length]
+                        if batch:
+                            chunk = end.join(batch) + end
+                            process.stdin.write(chunk)
+                            lines += len(batch)
+                            size += len(chunk) - (len(end) - 1) * len(batch)
+            except BrokenPipeError:
+                # NOTE: The command stopped reading before the end, so it has failed (its exit code tells why)
+                broken = True
+                with contextlib.suppress(BrokenPipeError):
+                    process.stdin.close()
+            except BaseException:
+                # NOTE: Closing the input would let the command write out a list of whatever was streamed so far
+                os.killpg(process.pid, signal.SIGKILL)
+                raise
+            else:
+                broken = False
+                process.stdin.close()
+        if process.returncode or broken:
+            raise Exception(f'Command `{cmd}` failed with exit code {process.returncode}. Aborting')
+        return lines, size
+
+    def written(self):
+        # NOTE: Without streaming everything is written, otherwise only what is referenced by name (and what it needs)
+        if not self.streaming:
+            return list(self.recipes.values())
+        referenced = list()
+        queue = [words for _, wordlists, _ in self.merges for words in wordlists]
+        queue.extend(self.recipes.values())
+        while queue:
+            recipe = queue.pop()
+            queue.extend(recipe.inputs)
+            if isinstance(recipe, recipes.Wordlist) and recipe.destination in self.recipes:
+                referenced.append(self.recipes[recipe.destination])
+        written = dict()
+        while referenced:
+            recipe = referenced.pop()
+            if recipe.destination not in written and not isinstance(recipe, recipes.Wordlist):
+                written[recipe.destination] = recipe
+                referenced.extend(recipe.inputs)
+        return [recipe for recipe in self.recipes.values() if recipe.destination in written]
@@ -0,0 +1,108 @@
+import recipes
+
+
+# NOTE: Casing of the first word, casing of the following ones and the separator list put between them
+STYLES = {
+    'lowercase': ('lowercase', 'lowercase', None),
+    'dash': ('lowercase', 'lowercase', 'src/bits/separators-dash.txt'),
+    'underscore': ('lowercase', 'lowercase', 'src/bits/separators-underscore.txt'),
+    'camelcase': ('capitalize', 'capitalize', None),
+    'lowercamelcase': ('lowercase', 'capitalize', None),
+}
+
+
+class Style:
+
+    # NOTE: Words are carried along with their lemmas, these are empty without an index (nothing is filtered then)
+    def __init__(self, name, first, rest, separators, index=None):
+        self.name = name
+        self.first = first
+        self.rest = rest
+        self.separators = separators
+        self.index = index
+
+    def lemmas(self, word):
+        return (self.index.lemma(word.decode('latin-1')),) if self.index else ()
+
+    def compatible(self, left, right):
+        return not any(other in self.index.conflicts(lemma) for lemma in left for other in right)
+
+    # NOTE: A tree is a part name, a 1-tuple for the list on its own or a pair combined as `right(left, right)`
+    def leaf(self, part, first, last):
+        words = self.first[part] if first else self.rest[part]
+        if last or not self.separators:
+            return [(word, self.lemmas(word)) for word in words]
+        return [(word + separator, self.lemmas(word)) for word in words if len(word) <= recipes.LEN_MAX for separator in self.separators]
+
+    def render(self, tree, first=True, last=True):
+        if isinstance(tree, str):
+            return self.leaf(tree, first, last), 0
+        heads, tails, dropped = self.sides(tree, first, last)
+        rendered = list()
+        for head, left in heads:
+            for tail, right in tails:
+                if self.compatible(left, right):
+                    rendered.append((head + tail, left + right))
+                else:
+                    dropped += 1
+        return rendered, dropped
+
+    def sides(self, tree, first, last):
+        # NOTE: The combinator skips any word longer than `LEN_MAX` on either side, at every level of nesting
+        heads, dropped_heads = self.render(tree[0], first, False)
+        tails, dropped_tails = self.render(tree[1], False, last)
+        heads = [(head, lemmas) for head, lemmas in heads if len(head) <= recipes.LEN_MAX]
+        tails = [(tail, lemmas) for tail, lemmas in tails if len(tail) <= recipes.LEN_MAX]
+        # NOTE: Pairs dropped below this level would have been combined with every word on the other side
+        return heads, tails, dropped_heads * len(tails) + dropped_tails * len(heads)
+
+    def product(self, tree):
+        # NOTE: Every candidate is a head followed by a tail, only the heads are iterated in Python
+        if len(tree) == 1:
+            return [(b'', ())], self.leaf(tree[0], True, True), 0
+        return self.sides(tree, True, True)
+
+    def excluded(self, lemmas, positions):
+        if not self.index:
+            return []
+        found = set()
+        for lemma in lemmas:
+            for other in self.index.conflicts(lemma):
+                found.update(positions.get(other, ()))
+        return sorted(found)
+
+
+def chunk(head, tails, excluded, min_length):
+    # NOTE: Tails are joined run by run between the excluded ones
+    pieces = list()
+    dropped = 0
+    start = 0
+    for stop in excluded + [len(tails)]:
+        run = tails[start:stop]
+        if len(head) < min_length:
+            run = [tail for tail in run if len(head) + len(tail) >= min_length]
+        if run:
+            pieces.append(head + (b'\n' + head).join(run) + b'\n')
+        if stop < len(tails) and len(head) + len(tails[stop]) >= min_length:
+            dropped += 1
+        start = stop + 1
+    return b''.join(pieces), dropped
+
+
+def render(styles, trees, min_length):
+    # NOTE: Yields the chunks of every style side by side, head after head, so each pairing is visited once
+    for tree in trees:
+        products = list()
+        for style in styles:
+            heads, tails, dropped = style.product(tree)
+            positions = dict()
+            for position, (_, lemmas) in enumerate(tails):
+                for lemma in lemmas:
+                    positions.setdefault(lemma, []).append(position)
+            products.append((heads, [tail for tail, _ in tails], positions))
+            yield style, b'', dropped
+        for position in range(max(len(heads) for heads, _, _ in products)):
+            for style, (heads, tails, positions) in zip(styles, products):
+                if position < len(heads):
+                    head, lemmas = heads[position]
+                    yield (style, *chunk(head, tails, style.excluded(lemmas, positions), min_length))
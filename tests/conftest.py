@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# NOTE: The modules of `src/classes` import each other by name, appended so that `http.py` does not shadow the standard library
+sys.path.append(str(pathlib.Path(__file__).parents[1] / 'src' / 'classes'))
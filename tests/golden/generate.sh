@@ -0,0 +1,13 @@
+#!/usr/bin/env bash
+
+# NOTE: One word at a time, with a small input hashcat interleaves the words with the rules in an order depending on the device
+cd "$(dirname "$0")" || exit 1
+for rule in ../../src/rules/*.rule; do
+    output="$(basename "$rule" .rule).txt"
+    : > "$output"
+    while IFS= read -r word; do
+        printf '%s\n' "$word" > word.tmp
+        hashcat --stdout --session=golden -r "$rule" word.tmp >> "$output"
+    done < sample.txt
+done
+rm -f word.tmp
@@ -0,0 +1,95 @@
+import pathlib
+
+import pytest
+
+pytest.importorskip('wordz')
+
+import budget  # noqa: E402
+import budgeting  # noqa: E402
+import mangling  # noqa: E402
+import recipes  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+MONTHS = BASE_DIR / 'src/bits/months.txt'
+SEPARATORS = BASE_DIR / 'src/bits/separators.txt'
+REPEAT = BASE_DIR / 'src/rules/repeat.rule'
+
+
+class Sizes(budgeting.Budgeting):
+
+    # NOTE: Estimates only need the registered recipes, none of these is written
+    def __init__(self):
+        self.recipes = dict()
+        self.sizes = dict()
+
+
+def lines(path):
+    return [word for batch in recipes.read_batches(path) for word in batch]
+
+
+def wordlist(path):
+    return recipes.Wordlist(path, pathlib.Path)
+
+
+def size(words):
+    return len(words), sum(map(len, words))
+
+
+@pytest.mark.parametrize('method', [recipes.RIGHT, recipes.LEFT, recipes.BOTH], ids=['right', 'left', 'both'])
+def test_combination_estimate_is_exact(tmp_path, method):
+    months, separators = lines(MONTHS), lines(SEPARATORS)
+    recipe = recipes.Combination(method, wordlist(MONTHS), wordlist(SEPARATORS), tmp_path)
+    if method == recipes.RIGHT:
+        expected = [left + right for left in months for right in separators]
+    elif method == recipes.LEFT:
+        expected = [right + left for right in separators for left in months]
+    else:
+        expected = [right + left + tail for right in separators for left in months for tail in separators]
+    assert Sizes().estimate(recipe) == size(expected)
+
+
+def test_rules_estimate_counts_distinct_outputs_per_word(tmp_path):
+    # NOTE: A list shorter than the sample is taken as a whole, what the words have in common is not noticed
+    words = tmp_path / 'words.txt'
+    words.write_bytes(b'abc\nAbc\nxyz\n')
+    recipe = recipes.Rules(wordlist(words), REPEAT, tmp_path, 'hashcat', True)
+    compiled = mangling.load(REPEAT)
+    outputs = [output for word in lines(words) for output in set(rule(word) for rule in compiled)]
+    assert Sizes().estimate(recipe) == size(outputs) == (11, 66)
+    assert len(set(outputs)) == 8
+
+
+def test_missing_list(tmp_path):
+    with pytest.raises(Exception, match='does not exist'):
+        Sizes().estimate(wordlist(tmp_path / 'missing.txt'))
+
+
+@pytest.mark.parametrize('spec, limits', [
+    ('lines=500M', (500 * 10 ** 6, None)),
+    ('bytes=10G', (None, 10 * 1024 ** 3)),
+    ('hours=1,rate=30G', (108 * 10 ** 12, None)),
+    ('lines=1T,hours=1,rate=30G', (10 ** 12, None)),
+])
+def test_parse(spec, limits):
+    parsed = budget.Budget.parse(spec)
+    assert (parsed.lines, parsed.size) == limits
+
+
+@pytest.mark.parametrize('spec', ['hours=1', 'rate=30G', 'lines=1M,speed=2'])
+def test_parse_errors(spec):
+    with pytest.raises(Exception, match='Aborting'):
+        budget.Budget.parse(spec)
+
+
+def test_select_by_yield():
+    # NOTE: The best yields first, whatever no longer fits is skipped and the unmeasured ones get the average yield
+    candidates = [budget.Candidate(name, None, lines, lines * 9, position) for position, (name, lines) in enumerate([
+        ('low', 100), ('high', 300), ('unmeasured', 200), ('big', 1000), ('tied', 300),
+    ])]
+    measured = {'low': (1, 100), 'high': (30, 300), 'big': (50, 1000), 'tied': (30, 300)}
+    chosen, skipped = budget.select(candidates, measured, budget.Budget('lines=900', lines=900))
+    assert [candidate.expression for candidate in chosen] == ['high', 'tied', 'unmeasured', 'low']
+    assert [candidate.expression for candidate in skipped] == ['big']
+    assert chosen[2].score == pytest.approx(111 / 1700)
+    assert not chosen[2].describe()['measured']
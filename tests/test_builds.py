@@ -0,0 +1,281 @@
+import contextlib
+import json
+import pathlib
+import shutil
+
+import pytest
+
+pytest.importorskip('wordz')
+
+import builder  # noqa: E402
+import frames  # noqa: E402
+import journal  # noqa: E402
+import passwords  # noqa: E402
+import policy  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+# NOTE: `hashcat` is not needed, the rules are applied by the built-in engine
+pytestmark = pytest.mark.skipif(
+    not all(shutil.which(name) for name in ('combinator.bin', 'rli2.bin')),
+    reason='hashcat-utils binaries not found',
+)
+
+
+class Fixture(builder.Builder):
+
+    # NOTE: A small tier of `src/keywords` lists (combined, mangled, reused by name and merged against a compare set),
+    # built eagerly unless a test switches a mode on
+    streaming = False
+    rules_engine = 'builtin'
+    jobs = 1
+    caching = False
+    exclusion = ''
+    dedup = 'sort'
+    compress = ''
+    manifest = False
+    plan_dir = ''
+    report_dir = ''
+    report_counts = False
+    cleanup = False
+    max_temp = 0
+    policy_spec = ''
+    provenance = False
+    dry_run = False
+    journaling = False
+
+    def setup(self):
+        if not self.temp('passwords-all.txt').is_file():
+            self.sort(self.base('wordlists/passwords/1-xxs.txt'), self.temp('passwords-all.txt'))
+        self.rule(self.base('src/keywords/lang/no.txt'), self.base('src/rules/simple.rule'))
+
+    def process(self):
+        keywords = self.base('src/keywords/lang/no.txt')
+        separators = self.base('src/bits/separators.txt')
+        self.merge(
+            self.output('small.txt'),
+            [
+                keywords,
+                self.rule(keywords, self.base('src/rules/capitalize.rule')),
+                self.right(keywords, self.base('src/bits/years-current.txt')),
+                self.left(self.base('src/bits/months.txt'), separators),
+            ],
+            self.temp('passwords-all.txt'),
+        )
+        self.merge(
+            self.output('large.txt'),
+            [
+                self.right(self.temp('simple-lang-no.txt'), self.base('src/bits/numbers-basic.txt')),
+                self.both(self.base('src/bits/months.txt'), separators),
+                self.temp('simple-lang-no.txt'),
+            ],
+            self.temp('passwords-all.txt'),
+        )
+
+
+class Killed(Fixture):
+
+    # NOTE: Dies at the end of a step, once its output is written (a rule only in part) and before it is journaled as done
+    victim = None
+
+    def measure(self, kind, name, inputs=(), output=None):
+        if name != self.victim:
+            return super().measure(kind, name, inputs, output)
+        return self.kill(kind, output)
+
+    @contextlib.contextmanager
+    def kill(self, kind, output):
+        yield dict()
+        if kind == 'rule':
+            with open(output, 'r+b') as fil:
+                fil.truncate(output.stat().st_size // 2)
+        raise RuntimeError('killed')
+
+
+class Failing(Fixture):
+
+    # NOTE: Deduplication writes part of the list (whatever the arguments) and dies, e.g. on a full disk
+    def deduplicate(self, destination):
+        return "sh -c 'echo partial; exit 1' --"
+
+
+class Uncompared(Fixture):
+
+    # NOTE: Merged without a compare set, the attacks `hashcat` generates are kept when long enough
+    def process(self):
+        keywords = self.base('src/keywords/lang/no.txt')
+        self.merge(
+            self.output('uncompared.txt'),
+            [
+                self.rule(self.base('src/keywords/lang/de.txt'), self.base('src/rules/capitalize.rule')),
+                self.right(keywords, self.base('src/bits/years-current.txt')),
+                self.rule(keywords, self.base('src/rules/capitalize.rule')),
+            ],
+        )
+
+
+class Languages(Fixture, passwords.Passwords):
+
+    # NOTE: The keywords of a few languages (`lang_dir`, with `all.txt` combining them) and the rules of the password tiers,
+    # built either for the combined keywords or per language (`languages`) and merged
+    rules = ('src/rules/simple.rule', 'src/rules/capitalize.rule')
+    languages = ''
+
+    def setup(self):
+        if not self.temp('passwords-all.txt').is_file():
+            self.sort(self.base('wordlists/passwords/1-xxs.txt'), self.temp('passwords-all.txt'))
+        self.wordlists_process()
+        if self.partitioned:
+            self.languages_process()
+
+    def process(self):
+        self.merge(
+            self.output('lang.txt'),
+            [
+                self.temp('simple-lang-all.txt'),
+                self.temp('capitalize-lang-all.txt'),
+                self.right(self.temp('simple-lang-all.txt'), self.base('src/bits/years-current.txt')),
+            ],
+            self.temp('passwords-all.txt'),
+        )
+
+
+def build(directory, cls=Fixture, rli2='rli2.bin', **modes):
+    # NOTE: The lists written and the compare set, a directory built before is built again (e.g. to resume)
+    temp_dir, output_dir = directory / 'tmp', directory / 'out'
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    instance = type(cls.__name__, (cls,), modes)(BASE_DIR, temp_dir, output_dir, 4, 1, '64M', 'hashcat', 'combinator.bin', rli2)
+    instance.run()
+    written = {path.name: path.read_bytes() for path in sorted(output_dir.iterdir()) if path.is_file()}
+    written['passwords-all.txt'] = (temp_dir / 'passwords-all.txt').read_bytes()
+    return written
+
+
+@pytest.fixture(scope='module')
+def eager(tmp_path_factory):
+    return build(tmp_path_factory.mktemp('eager'))
+
+
+def test_streaming_matches_eager(tmp_path, eager):
+    assert build(tmp_path, streaming=True) == eager
+
+
+@pytest.mark.parametrize('streaming', [False, True], ids=['written', 'streamed'])
+def test_scheduled_matches_eager(tmp_path, eager, streaming):
+    assert build(tmp_path, jobs=2, streaming=streaming) == eager
+
+
+def test_cached_matches_eager(tmp_path, eager):
+    # NOTE: Built again in the same directories, the lists cached by the first build are reused unless their key is stale
+    assert build(tmp_path, caching=True) == eager
+    (tmp_path / 'tmp/passwords-all.txt').unlink()
+    (tmp_path / 'tmp/simple-lang-no+numbers-basic.txt').write_bytes(b'stale\n')
+    (tmp_path / 'tmp/cache/simple-lang-no+numbers-basic.txt.key').write_text('stale')
+    assert build(tmp_path, caching=True) == eager
+
+
+@pytest.mark.parametrize('exclusion', ['exact', 'bloom'])
+def test_exclusion_matches_eager(tmp_path, eager, exclusion):
+    # NOTE: The compare set is left as it is, the words merged go to its index instead
+    written = build(tmp_path, exclusion=exclusion, exclusion_capacity=1000000, exclusion_error=1e-9)
+    del written['passwords-all.txt']
+    assert written == {name: words for name, words in eager.items() if name != 'passwords-all.txt'}
+
+
+def test_policy_matches_filtered_eager(tmp_path, eager):
+    # NOTE: Whatever the policy prunes from the combinations is what filtering the eager lists would leave out
+    spec = 'length=6:12,classes=2,required=digit,banned=-'
+    written = build(tmp_path, policy_spec=spec)
+    check = policy.Policy.parse(spec).check
+    for name in ('small.txt', 'large.txt'):
+        assert written[name] == b''.join(word + b'\n' for word in eager[name].split(b'\n')[:-1] if check(word))
+
+
+@pytest.mark.parametrize('victim', ['simple-lang-no.txt', 'large.txt'])
+@pytest.mark.parametrize(
+    'modes',
+    [{}, {'jobs': 2}, {'streaming': True}, {'streaming': True, 'dedup': 'hash'}, {'exclusion': 'exact'}],
+    ids=['eager', 'jobs', 'streaming', 'hash', 'exclusion'],
+)
+def test_journal_resumes_after_kill(tmp_path, victim, modes):
+    expected = build(tmp_path / 'expected', journaling=True, **modes)
+    # NOTE: Scheduled steps die in a worker, the build then fails on its own
+    with pytest.raises(Exception, match='killed|failed'):
+        build(tmp_path / 'killed', Killed, journaling=True, victim=victim, **modes)
+    assert build(tmp_path / 'killed', journaling=True, **modes) == expected
+
+
+def test_failed_merge_is_not_journaled(tmp_path, eager):
+    # NOTE: `false` in place of `rli2` fails the first merge against the compare set, after its list is written
+    with pytest.raises(Exception, match='failed with exit code'):
+        build(tmp_path, rli2='false', journaling=True)
+    records = [json.loads(line) for line in (tmp_path / 'tmp/journal.jsonl').read_text().splitlines()]
+    assert not [record for record in records if record['output'].endswith('small.txt') and record['state'] == journal.DONE]
+    assert build(tmp_path, journaling=True) == eager
+
+
+@pytest.mark.parametrize('compress', ['', 'zstd'], ids=['plain', 'compressed'])
+@pytest.mark.parametrize('streaming', [False, True], ids=['written', 'streamed'])
+def test_failed_dedup_leaves_no_list(tmp_path, compress, streaming):
+    if compress and not frames.zstandard and not shutil.which('zstd'):
+        pytest.skip('zstd not found')
+    with pytest.raises(Exception, match='failed with exit code'):
+        build(tmp_path, Failing, dedup='hash', compress=compress, streaming=streaming)
+    assert not any((tmp_path / 'out').iterdir())
+
+
+@pytest.mark.skipif(not frames.zstandard and not shutil.which('zstd'), reason='zstd not found')
+@pytest.mark.parametrize('streaming', [False, True], ids=['written', 'streamed'])
+def test_compressed_matches_eager(tmp_path, eager, streaming):
+    written = build(tmp_path, compress='zstd', streaming=streaming)
+    assert sorted(written) == ['large.txt.zst', 'large.txt.zst.frames', 'passwords-all.txt', 'small.txt.zst', 'small.txt.zst.frames']
+    assert written['passwords-all.txt'] == eager['passwords-all.txt']
+    for name in ('small.txt', 'large.txt'):
+        assert b''.join(word + b'\n' for batch in frames.Reader(tmp_path / 'out' / f'{name}.zst').batches() for word in batch) == eager[name]
+
+
+def test_plan_matches_eager(tmp_path, eager):
+    # NOTE: Both tiers are excluded against the compare set, so their plans are filtered plain lists giving the merged words
+    build(tmp_path, plan_dir=str(tmp_path / 'plan'))
+    for name in ('small', 'large'):
+        steps = [line.split() for line in (tmp_path / f'plan/{name}.sh').read_text().splitlines() if line.startswith('hashcat')]
+        assert all(step[:3] == ['hashcat', '-a', '0'] and step[-1].startswith('words/') for step in steps)
+        words = {word for step in steps for word in (tmp_path / 'plan' / step[-1]).read_bytes().splitlines()}
+        assert words == set(eager[f'{name}.txt'].splitlines())
+
+
+def test_plan_keeps_generated_attacks(tmp_path):
+    build(tmp_path, Uncompared, plan_dir=str(tmp_path / 'plan'))
+    steps = [line.split()[:4] for line in (tmp_path / 'plan/uncompared.sh').read_text().splitlines() if line.startswith('hashcat')]
+    # NOTE: Some of the keywords are shorter than the minimal length, so the rule applied to them is filtered as a plain list
+    assert steps == [['hashcat', '-a', '0', '-r'], ['hashcat', '-a', '1', '"$@"'], ['hashcat', '-a', '0', '"$@"']]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_languages_match_combined(tmp_path, jobs):
+    # NOTE: `all.txt` is written the way `Passwords.setup` does, as the unique sorted keywords of every language
+    lang_dir = tmp_path / 'lang'
+    lang_dir.mkdir()
+    for language in ('de', 'no', 'pl'):
+        shutil.copyfile(BASE_DIR / f'src/keywords/lang/{language}.txt', lang_dir / f'{language}.txt')
+    words = {word for path in lang_dir.iterdir() for word in path.read_bytes().splitlines()}
+    (lang_dir / 'all.txt').write_bytes(b''.join(word + b'\n' for word in sorted(words)))
+    modes = {'lang_dir': str(lang_dir), 'wordlists': (str(lang_dir / 'all.txt'),), 'jobs': jobs}
+    combined = build(tmp_path / 'combined', Languages, **modes)
+    partitioned = build(tmp_path / 'partitioned', Languages, languages='all', **modes)
+    assert partitioned == combined
+    for name in ('simple-lang-all.txt', 'capitalize-lang-all.txt'):
+        assert (tmp_path / 'partitioned/tmp' / name).read_bytes() == (tmp_path / 'combined/tmp' / name).read_bytes()
+    assert (tmp_path / 'partitioned/tmp/lang/pl/simple-lang-pl.txt').is_file()
+
+
+def test_dry_run_writes_no_lists(tmp_path, eager, caplog):
+    caplog.set_level('INFO')
+    written = build(tmp_path, dry_run=True)
+    assert sorted(written) == ['passwords-all.txt']
+    assert not (tmp_path / 'tmp/simple-lang-no+numbers-basic.txt').exists()
+    # NOTE: The summary projects the words every merge adds, close to what the eager build wrote
+    rows = {row.split()[0].rsplit('/', 1)[-1]: row.split() for row in (record.getMessage() for record in caplog.records) if '/out/' in row}
+    for name in ('small.txt', 'large.txt'):
+        assert int(rows[name][3].replace(',', '')) == pytest.approx(eager[name].count(b'\n'), rel=0.05)
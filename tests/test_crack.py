@@ -0,0 +1,26 @@
+import sys
+
+import pytest
+
+import crack
+
+
+WORDS = ['password', 'zażółć', 'pass\tword']
+
+
+@pytest.fixture
+def hashes(tmp_path):
+    # NOTE: NTLM of the passwords as Windows stores them, plus a word that is not UTF-8
+    lines = [crack.md4(word.encode('utf-16le')).hex() for word in WORDS]
+    lines.append(crack.md4('caf\xe9'.encode('utf-16le')).hex())
+    (tmp_path / 'hashes.txt').write_text('\n'.join(lines) + '\n')
+    (tmp_path / 'tier.txt').write_bytes(b''.join(word.encode() + b'\n' for word in WORDS) + b'caf\xe9\n')
+    return tmp_path
+
+
+def test_ntlm_of_utf8_candidates(monkeypatch, capsysbinary, hashes):
+    assert crack.md4('password'.encode('utf-16le')).hex() == '8846f7eaee8fb117ad06bdd830b7586c'
+    monkeypatch.setattr(sys, 'argv', ['crack', '-m', 'ntlm', '-j', '1', '-w', str(hashes / 'tier.txt'), str(hashes / 'hashes.txt')])
+    crack.main()
+    hits = sorted(line.split(b':', 1)[1] for line in capsysbinary.readouterr().out.splitlines())
+    assert hits == sorted([b'password', 'zażółć'.encode(), b'$HEX[7061737309776f7264]', b'$HEX[636166e9]'])
@@ -0,0 +1,57 @@
+import pathlib
+import sys
+
+import pytest
+
+import dedup
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+WORDLISTS = [str(BASE_DIR / 'src/keywords/lang' / name) for name in ('pl.txt', 'de.txt', 'it.txt', 'int-basic.txt')]
+COMPARE = str(BASE_DIR / 'src/keywords/lang/fr.txt')
+
+
+def lines(*paths):
+    return [line.rstrip(b'\r\n') for path in paths for line in pathlib.Path(path).read_bytes().splitlines()]
+
+
+def run(monkeypatch, capsysbinary, *args):
+    monkeypatch.setattr(sys, 'argv', ['dedup', '-j', '2', '-n', '4', '-c', COMPARE, *args, *WORDLISTS])
+    dedup.main()
+    return capsysbinary.readouterr().out
+
+
+# NOTE: With 21000 bytes for two workers the largest buckets of these lists are split once more
+@pytest.mark.parametrize('memory', ['1G', '21000B'], ids=['buckets', 'split'])
+def test_dedup(monkeypatch, capsysbinary, tmp_path, memory):
+    output = run(monkeypatch, capsysbinary, '-t', str(tmp_path), '-m', memory).split(b'\n')[:-1]
+    compared = set(lines(COMPARE))
+    assert len(output) == len(set(output))
+    assert set(output) == {word for word in lines(*WORDLISTS) if len(word) >= 4 and word not in compared}
+    assert not any(tmp_path.iterdir())
+
+
+def test_resume_after_kill(monkeypatch, capsysbinary, tmp_path):
+    expected = run(monkeypatch, capsysbinary, '-t', str(tmp_path))
+    work = tmp_path / 'work'
+    calls = []
+    original = dedup.dedup
+
+    def killed(task):
+        # NOTE: Runs in the (forked) workers, a bucket fails in the middle of its output
+        calls.append(task)
+        if len(calls) == 50:
+            with open(task[2], 'ab') as fil:
+                fil.write(b'partial\n')
+            raise RuntimeError('killed')
+        return original(task)
+
+    monkeypatch.setattr(dedup, 'dedup', killed)
+    with pytest.raises(RuntimeError):
+        run(monkeypatch, capsysbinary, '-w', str(work))
+    capsysbinary.readouterr()
+    assert pathlib.Path(work, 'words', dedup.COMPLETE).is_file()
+    assert any(work.glob('*.done'))
+    monkeypatch.setattr(dedup, 'dedup', original)
+    assert run(monkeypatch, capsysbinary, '-w', str(work)) == expected
+    assert not work.exists()
@@ -0,0 +1,61 @@
+import pathlib
+
+import pytest
+
+import expander
+import mangling
+import recipes
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+MANIFEST = {
+    'min_length': 6,
+    'inputs': [
+        {'wordlist': 'src/bits/months.txt'},
+        {'combination': 'right', 'left': {'wordlist': 'src/keywords/lang/no.txt'}, 'right': {'wordlist': 'src/bits/years-current.txt'}},
+        {
+            'combination': 'both',
+            'left': {'rules': 'src/rules/capitalize.rule', 'wordlist': {'wordlist': 'src/bits/months.txt'}},
+            'right': {'wordlist': 'src/bits/separators.txt'},
+        },
+    ],
+}
+
+
+def lines(name):
+    return [word for batch in recipes.read_batches(BASE_DIR / name) for word in batch]
+
+
+@pytest.fixture(scope='module')
+def keyspace():
+    return expander.Expander(MANIFEST, BASE_DIR)
+
+
+def test_candidates_of_the_manifest(keyspace):
+    months, separators = lines('src/bits/months.txt'), lines('src/bits/separators.txt')
+    capitalized = sorted(set(mangling.apply(mangling.load(BASE_DIR / 'src/rules/capitalize.rule'), months)))
+    expected = months + [left + right for left in lines('src/keywords/lang/no.txt') for right in lines('src/bits/years-current.txt')]
+    expected += [right + left + tail for right in separators for left in capitalized for tail in separators]
+    assert list(keyspace.candidates(0, len(keyspace))) == [word for word in expected if len(word) >= 6]
+
+
+@pytest.mark.parametrize('count', [1, 3, 8, 1000])
+def test_shards_concatenate_to_the_keyspace(keyspace, count):
+    shards = [expander.get_range(len(keyspace), 0, None, f'{number}/{count}') for number in range(1, count + 1)]
+    assert shards[0][0] == 0 and shards[-1][1] == len(keyspace)
+    assert all(previous[1] == current[0] for previous, current in zip(shards, shards[1:]))
+    words = [word for start, stop in shards for word in keyspace.candidates(start, stop)]
+    assert words == list(keyspace.candidates(0, len(keyspace)))
+
+
+def test_skip_and_limit_count_positions(keyspace):
+    size = len(keyspace)
+    ranges = [expander.get_range(size, skip, 997, None) for skip in range(0, size, 997)]
+    assert [word for start, stop in ranges for word in keyspace.candidates(start, stop)] == list(keyspace.candidates(0, size))
+    assert expander.get_range(size, 10, 5, '2/4') == (size // 4 + 10, size // 4 + 15)
+
+
+@pytest.mark.parametrize('shard', ['0/4', '5/4', '1', 'a/b'])
+def test_invalid_shards(shard):
+    with pytest.raises(ValueError):
+        expander.get_range(100, 0, None, shard)
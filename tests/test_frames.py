@@ -0,0 +1,64 @@
+import pathlib
+import shutil
+
+import pytest
+
+import frames
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+CODECS = [
+    pytest.param(name, marks=pytest.mark.skipif(
+        not (frames.zstandard if name == 'zstd' else frames.lz4) and not shutil.which(name), reason=f'{name} not found',
+    ))
+    for name in frames.CODECS
+]
+
+
+@pytest.fixture(scope='module')
+def words():
+    return [line + b'\n' for line in (BASE_DIR / 'src/keywords/lang/pl.txt').read_bytes().splitlines()]
+
+
+@pytest.fixture(params=CODECS)
+def compressed(request, tmp_path, words):
+    destination = frames.path(tmp_path / 'pl.txt', request.param)
+    writer = frames.Writer(destination, frames.Codec(request.param), frame_lines=1000)
+    for start in range(0, len(words), 777):
+        writer.write(words[start:start + 777])
+    writer.close()
+    return destination
+
+
+def test_round_trip(compressed, words):
+    reader = frames.Reader(compressed)
+    assert len(reader) == len(words)
+    assert reader.size == sum(len(word) for word in words)
+    assert [word for batch in reader.batches() for word in batch] == [word.rstrip(b'\n') for word in words]
+
+
+@pytest.mark.parametrize('start, stop', [(0, 1), (999, 1001), (1000, 2000), (2500, 4321), (6000, 10 ** 6), (7000, 7000)])
+def test_lines_from_anywhere(compressed, words, start, stop):
+    assert [word for batch in frames.Reader(compressed).batches(start, stop) for word in batch] == [word.rstrip(b'\n') for word in words[start:stop]]
+
+
+def test_ranges_cover_the_list(compressed, words):
+    reader = frames.Reader(compressed)
+    ranges = reader.ranges(2)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(words)
+    assert all(previous[1] == current[0] and current[0] % 2000 == 0 for previous, current in zip(ranges, ranges[1:]))
+
+
+def test_found_by_the_plain_name(compressed):
+    plain = compressed.with_suffix('')
+    assert frames.find(plain) == compressed
+    assert frames.stem(compressed) == 'pl'
+
+
+@pytest.mark.parametrize('name', list(frames.CODECS))
+def test_missing_codec(monkeypatch, name):
+    monkeypatch.setattr(frames, 'zstandard', None)
+    monkeypatch.setattr(frames, 'lz4', None)
+    monkeypatch.setattr(frames.shutil, 'which', lambda command: None)
+    with pytest.raises(Exception, match='command found'):
+        frames.Codec(name)
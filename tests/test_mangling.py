@@ -0,0 +1,29 @@
+import pathlib
+
+import pytest
+
+import mangling
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+GOLDEN_DIR = pathlib.Path(__file__).with_name('golden')
+RULES = sorted(pathlib.Path(BASE_DIR, 'src/rules').glob('*.rule'))
+
+
+def lines(path):
+    return pathlib.Path(path).read_bytes().split(b'\n')[:-1]
+
+
+@pytest.mark.parametrize('rule', RULES, ids=lambda rule: rule.stem)
+def test_rules_match_hashcat(rule):
+    # NOTE: `golden/<rule>.txt` is written by `golden/generate.sh` with `hashcat --stdout`
+    assert mangling.apply(mangling.load(rule), lines(GOLDEN_DIR / 'sample.txt')) == lines(GOLDEN_DIR / f'{rule.stem}.txt')
+
+
+def test_subdomains_reproduce_dns_extended():
+    # NOTE: `wordlists/dns/extended.txt` is the basic list followed by `hashcat --stdout` on the sorted basic keywords
+    basic = lines(BASE_DIR / 'wordlists/dns/basic.txt')
+    extended = lines(BASE_DIR / 'wordlists/dns/extended.txt')
+    keywords = sorted(lines(BASE_DIR / 'src/keywords/dns/basic.txt'))
+    assert extended[:len(basic)] == basic
+    assert mangling.apply(mangling.load(BASE_DIR / 'src/rules/subdomains.rule'), keywords) == extended[len(basic):]
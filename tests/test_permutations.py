@@ -0,0 +1,40 @@
+import pathlib
+
+import pytest
+
+import permutations
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+HOSTS = [b'api-dev.example.com', b'www.example.com', b'web01.eu.example.com']
+
+
+@pytest.fixture(scope='module')
+def names():
+    return list(permutations.load(BASE_DIR, permutations.Target(HOSTS)).generate())
+
+
+def test_words_before_single_characters(names):
+    position = {name: number for number, name in enumerate(names)}
+    assert len(position) == len(names) and not set(HOSTS) & set(names)
+    assert position[b'api.example.com'] < position[b'www-dev.example.com'] < position[b'www-a.example.com'] < position[b'ewww.example.com']
+    assert max(position[b'web02.eu.example.com'], position[b'www.stg.example.com']) < position[b'www1.example.com']
+
+
+def test_limit_takes_the_first_names(names):
+    target = permutations.Target(HOSTS)
+    assert list(permutations.load(BASE_DIR, target).generate(100, relative=True)) == [name[:-len(b'.example.com')] for name in names[:100]]
+
+
+@pytest.mark.parametrize('hosts, domain', [
+    ([b'www.example.com'], b'example.com'),
+    ([b'a.eu.example.co.uk', b'b.eu.example.co.uk'], b'eu.example.co.uk'),
+    ([b'a.eu.example.com', b'eu.example.com'], b'example.com'),
+])
+def test_apex(hosts, domain):
+    assert permutations.apex(hosts) == domain
+
+
+def test_apex_without_a_shared_domain():
+    with pytest.raises(ValueError):
+        permutations.apex([b'example.com', b'example.org'])
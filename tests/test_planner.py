@@ -0,0 +1,82 @@
+import pathlib
+
+import pytest
+
+pytest.importorskip('wordz')
+
+import expander  # noqa: E402
+import planner  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+MONTHS = {'wordlist': 'src/bits/months.txt'}
+SEPARATORS = {'wordlist': 'src/bits/separators.txt'}
+YEARS = {'wordlist': 'src/bits/years-current.txt'}
+KEYWORDS = {'wordlist': 'src/keywords/lang/no.txt'}
+MIN_LENGTH = 3
+
+
+def right(left, right):
+    return {'combination': 'right', 'left': left, 'right': right}
+
+
+def candidates(item):
+    return list(expander.Expander({'inputs': [item], 'min_length': 0}, BASE_DIR).keyspace.iterate(0, 10 ** 9))
+
+
+def expected(items, seen=(), compared=()):
+    # NOTE: Every candidate long enough, counted once more for each one no earlier expression generates (distinct),
+    # and that neither an earlier merge into the compare set nor the compare set itself holds (new)
+    kept, distinct, new = 0, 0, 0
+    earlier = set()
+    for item in items:
+        words = [word for word in candidates(item) if word is not None and len(word) >= MIN_LENGTH]
+        kept += len(words)
+        distinct += sum(word not in earlier for word in words)
+        new += sum(word not in earlier and word not in seen and word not in compared for word in words)
+        earlier.update(candidates(item))
+    return kept, distinct, new, earlier
+
+
+@pytest.fixture
+def compare(tmp_path):
+    path = tmp_path / 'passwords-all.txt'
+    path.write_bytes(b''.join(word + b'\n' for word in sorted([b'010', b'1!', b'12#', b'1221', b'1999', b'password'])))
+    return path
+
+
+@pytest.mark.parametrize('lookup', [None, planner.Sorted], ids=['search', 'sorted'])
+def test_enumerated_merges_are_exact(compare, lookup):
+    # NOTE: Expressions smaller than the samples are enumerated, `months+years-current` and `months+months` share words
+    estimator = planner.Planner(BASE_DIR, MIN_LENGTH, lookup)
+    compared = set(compare.read_bytes().splitlines())
+    first = [MONTHS, right(MONTHS, SEPARATORS), right(MONTHS, YEARS), right(MONTHS, MONTHS)]
+    second = [right(MONTHS, YEARS), right(SEPARATORS, MONTHS)]
+    kept, distinct, new, seen = expected(first, compared=compared)
+    estimate = estimator.merge('first.txt', first, compare)
+    assert estimate.raw == sum(len(candidates(item)) for item in first)
+    assert (estimate.kept, estimate.distinct) == (kept, distinct)
+    assert abs(estimate.new - new) <= 1
+    assert estimate.new < estimate.distinct < estimate.kept
+    assert estimate.size == pytest.approx(estimate.new * estimate.kept_bytes / estimate.kept, abs=estimate.kept_bytes / estimate.kept)
+    # NOTE: The words of the first merge went into the compare set, the second one repeats part of them
+    kept, distinct, new, _ = expected(second, seen, compared)
+    estimate = estimator.merge('second.txt', second, compare)
+    assert (estimate.kept, estimate.distinct) == (kept, distinct)
+    assert abs(estimate.new - new) <= 1
+    assert 0 < estimate.new < estimate.distinct
+
+
+def test_sampled_merge(tmp_path):
+    # NOTE: Bigger than the probes, the shares of distinct words are estimated from a sample. Half of the tails are months,
+    # so about half of the last expression repeats the second one
+    tails = tmp_path / 'tails.txt'
+    tails.write_bytes(b'1\n2\n3\n10\nx\ny\nz\nw\n')
+    items = [right(KEYWORDS, YEARS), right(KEYWORDS, MONTHS), right(KEYWORDS, {'wordlist': str(tails)})]
+    kept, distinct, _, _ = expected(items)
+    estimate = planner.Planner(BASE_DIR, MIN_LENGTH).merge('sampled.txt', items)
+    assert estimate.raw == sum(len(candidates(item)) for item in items)
+    assert estimate.kept == pytest.approx(kept)
+    assert distinct < kept
+    assert estimate.distinct == pytest.approx(distinct, rel=0.02)
+    assert estimate.new == estimate.distinct
@@ -0,0 +1,56 @@
+import json
+import multiprocessing
+import os
+import pathlib
+
+import pytest
+
+pytest.importorskip('wordz')
+
+import report  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+KEYWORDS = BASE_DIR / 'src/keywords/lang/no.txt'
+
+
+def step(instance, output, kind):
+    # NOTE: What a forked job does, the record is appended to the JSON lines file of the build
+    with instance.step(kind, output.name, [KEYWORDS], output) as record:
+        output.write_bytes(KEYWORDS.read_bytes() * 2)
+        record['removed_by_compare'] = 1
+
+
+def forked(instance, output, kind='rule'):
+    process = multiprocessing.get_context('fork').Process(target=step, args=(instance, output, kind))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    return process.pid
+
+
+@pytest.mark.parametrize('counts', [False, True], ids=['default', 'counts'])
+def test_forked_record(tmp_path, counts):
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    instance = report.Report(tmp_path / 'reports', 'Fixture', temp_dir, counts)
+    pid = forked(instance, temp_dir / 'rule.txt')
+    forked(instance, temp_dir / 'merged.txt', 'merge')
+    rule, merge = [json.loads(line) for line in instance.journal.read_text().splitlines()]
+    lines = KEYWORDS.read_bytes().count(b'\n')
+    assert rule['kind'] == 'rule' and rule['name'] == 'rule.txt' and rule['depth'] == 0
+    assert rule['pid'] == pid != os.getpid()
+    assert rule['removed_by_compare'] == 1
+    assert (rule['bytes_in'], rule['bytes_out']) == (KEYWORDS.stat().st_size, 2 * KEYWORDS.stat().st_size)
+    assert rule['wall'] >= 0 and rule['cpu'] >= 0 and rule['peak_rss'] > 0
+    # NOTE: Without counts only the lines written by merges are counted, and the temporary directory is not walked
+    if counts:
+        assert (rule['lines_in'], rule['lines_out'], rule['temp']) == (lines, 2 * lines, 2 * KEYWORDS.stat().st_size)
+    else:
+        assert (rule['lines_in'], rule['lines_out'], rule['temp']) == (None, None, None)
+    assert merge['lines_out'] == 2 * lines
+    instance.write()
+    assert not instance.journal.exists()
+    written = json.loads(instance.path.read_text())
+    assert [record['name'] for record in written['steps']] == ['rule.txt', 'merged.txt']
+    assert (written['peak_temp'] is None) is not counts
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import time
+
+import pytest
+
+import scheduler
+
+
+def test_failed_task_stops_the_commands_of_the_others(tmp_path):
+    pids = tmp_path / 'pids'
+
+    def sleeping():
+        # NOTE: A command running in the background of the worker, as `sort` does in a pipeline
+        subprocess.run(f'sleep 60 & echo $! > {pids}; wait', shell=True)
+
+    def failing():
+        while not pids.is_file() or not pids.read_text().strip():
+            time.sleep(0.01)
+        raise RuntimeError('failed')
+
+    graph = scheduler.Scheduler(2)
+    graph.add('sleeping', sleeping)
+    graph.add('failing', failing)
+    started = time.monotonic()
+    with pytest.raises(Exception, match='`failing` failed'):
+        graph.run()
+    assert time.monotonic() - started < 30
+    pid = int(pids.read_text())
+    for _ in range(100):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail(f'`sleep` ({pid}) is still running')
+
+
+def test_dependencies_run_first(tmp_path):
+    order = tmp_path / 'order'
+    graph = scheduler.Scheduler(2)
+    first = graph.add('first', lambda: order.open('a').write('first\n'))
+    second = graph.add('second', lambda: order.open('a').write('second\n'))
+    second.dependencies.add(first)
+    graph.run([second])
+    assert order.read_text() == 'first\nsecond\n'
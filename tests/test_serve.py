@@ -0,0 +1,78 @@
+import pathlib
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytest.importorskip('wordz')
+
+import mangling  # noqa: E402
+import recipes  # noqa: E402
+import serve  # noqa: E402
+
+
+BASE_DIR = pathlib.Path(__file__).parents[1]
+BITS = ('extra-basic', 'functional', 'months', 'numbers-basic', 'years-current')
+KEYWORDS = [b'acme', b'Globex', b'initech']
+
+
+def lines(path):
+    return [word for batch in recipes.read_batches(path) for word in batch]
+
+
+def expected(keywords, min_length=4, excluded=()):
+    # NOTE: What `OrganizationNamePasswords` merges: the keywords through `simple.rule`, alone and with every bit on
+    # either side, unique and sorted
+    mangled = set(mangling.apply(mangling.load(BASE_DIR / 'src/rules/simple.rule'), keywords))
+    words = set(mangled)
+    for name in BITS:
+        for bit in lines(BASE_DIR / f'src/bits/{name}.txt'):
+            words.update(bit + word for word in mangled)
+            words.update(word + bit for word in mangled)
+    return sorted(word for word in words if len(word) >= min_length and word not in excluded)
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    excluded = tmp_path_factory.mktemp('serve') / 'excluded.txt'
+    excluded.write_bytes(b'Acme1\nacme!\n')
+    instance = serve.http.server.ThreadingHTTPServer(('127.0.0.1', 0), serve.Handler)
+    instance.service = serve.Service(['OrganizationNamePasswords'], BASE_DIR, 4, [excluded])
+    thread = threading.Thread(target=instance.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{instance.server_address[1]}'
+    instance.shutdown()
+    instance.server_close()
+
+
+def fetch(url, data=None):
+    with urllib.request.urlopen(url, data) as response:
+        return response.read().split(b'\n')[:-1]
+
+
+def test_get(server):
+    query = '&'.join(f'keyword={keyword.decode()}' for keyword in KEYWORDS)
+    assert fetch(f'{server}/OrganizationNamePasswords?{query}') == expected(KEYWORDS, excluded={b'Acme1', b'acme!'})
+
+
+def test_post(server):
+    # NOTE: Blank and repeated keywords are ignored
+    body = b'\n'.join(KEYWORDS + [b'', b'acme']) + b'\n'
+    words = fetch(f'{server}/OrganizationNamePasswords?min_length=6', body)
+    assert words == expected(KEYWORDS, 6)
+
+
+def test_classes(server):
+    assert fetch(f'{server}/') == [b'OrganizationNamePasswords']
+
+
+@pytest.mark.parametrize('path, code', [
+    ('/OrganizationKeywordsPasswords?keyword=acme', 404),
+    ('/OrganizationNamePasswords', 400),
+    ('/OrganizationNamePasswords?keyword=acme&min_length=x', 400),
+])
+def test_errors(server, path, code):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(f'{server}{path}')
+    assert error.value.code == code